@@ -0,0 +1,51 @@
+import subprocess
+import sys
+
+from docopt import docopt
+
+from torque import shell
+from torque.commands.sb import SandboxesCommand
+from torque.parsers import grammar
+from torque.parsers.command_input_parsers import CommandInputParser
+from torque.parsers.global_input_parser import GlobalInputParser
+
+
+def test_cold_start_help(benchmark):
+    def run_help():
+        subprocess.run([sys.executable, "-m", "torque", "--help"], check=True, stdout=subprocess.DEVNULL)
+
+    benchmark.pedantic(run_help, rounds=5, warmup_rounds=1)
+
+
+def test_global_input_parser(benchmark):
+    argv = ["--space=demo", "--token=token", "--disable-version-check", "sb", "list", "--count=50"]
+
+    def parse():
+        parser = GlobalInputParser(docopt(shell.__doc__, argv=argv, options_first=True))
+        return parser.command, parser.command_args
+
+    assert benchmark(parse) == ("sb", ["list", "--count=50"])
+
+
+def test_command_input_parser(benchmark):
+    argv = ["sb", "list", "--filter=all", "--count=50", "--output=json"]
+
+    def parse():
+        args = docopt(SandboxesCommand.__doc__, argv=argv)
+        return CommandInputParser(args), GlobalInputParser(args)
+
+    input_parser, global_input_parser = benchmark(parse)
+    assert input_parser.sandbox_list.count == 50
+    assert global_input_parser.output_json
+
+
+def test_command_input_parser_compiled_grammar(benchmark):
+    argv = ["sb", "list", "--filter=all", "--count=50", "--output=json"]
+
+    def parse():
+        args = grammar.docopt(SandboxesCommand.__doc__, argv=argv)
+        return CommandInputParser(args), GlobalInputParser(args)
+
+    input_parser, global_input_parser = benchmark(parse)
+    assert input_parser.sandbox_list.count == 50
+    assert global_input_parser.output_json
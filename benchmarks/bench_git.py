@@ -0,0 +1,101 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from git import Repo
+
+from torque.branch import branch_utils
+from torque.utils import BlueprintRepo
+
+from .conftest import BLUEPRINTS_COUNT
+
+
+def test_blueprint_repo_init(benchmark, large_blueprint_repo):
+    repo = benchmark(BlueprintRepo, large_blueprint_repo)
+
+    assert len(repo.blueprints) == BLUEPRINTS_COUNT
+
+
+def test_blueprint_yaml_load(benchmark, large_blueprint_repo):
+    repo = BlueprintRepo(large_blueprint_repo)
+
+    def load_all():
+        return [repo.get_blueprint_default_inputs(name) for name in repo.blueprints]
+
+    assert len(benchmark(load_all)) == BLUEPRINTS_COUNT
+
+
+def test_blueprint_yaml_load_from_git_objects(benchmark, large_blueprint_repo):
+    repo = BlueprintRepo(large_blueprint_repo)
+
+    def load_all():
+        return [repo.get_blueprint_default_inputs(name, "refs/remotes/origin/master") for name in repo.blueprints]
+
+    assert len(benchmark(load_all)) == BLUEPRINTS_COUNT
+    repo.close()
+
+
+@pytest.mark.parametrize("module", ["git", "torque.utils"])
+def test_import_time(benchmark, module):
+    """Import of GitPython itself vs the blueprint repo, which no longer imports it"""
+
+    def run_import():
+        subprocess.run([sys.executable, "-c", f"import {module}"], check=True)
+
+    benchmark.pedantic(run_import, rounds=10, warmup_rounds=1)
+
+
+def git_python_branch_state(repo: Repo):
+    branch = repo.active_branch
+    remote_ref = next(ref for ref in repo.remote().refs if ref.remote_head == branch.name)
+    return repo.head.is_detached, branch.commit == remote_ref.commit
+
+
+def blueprint_repo_branch_state(repo: BlueprintRepo):
+    return repo.is_repo_detached(), repo.is_current_branch_synced()
+
+
+@pytest.mark.parametrize(
+    "repo_class,branch_state",
+    [(Repo, git_python_branch_state), (BlueprintRepo, blueprint_repo_branch_state)],
+    ids=["gitpython", "refs"],
+)
+def test_branch_state(benchmark, large_blueprint_repo, repo_class, branch_state):
+    """Detached HEAD, active branch and remote refs, as checked before every sb start"""
+    repo = repo_class(large_blueprint_repo)
+
+    assert benchmark(branch_state, repo) == (False, True)
+    repo.close()
+
+
+@pytest.fixture
+def dirty_repo(large_blueprint_repo):
+    cwd = os.getcwd()
+    os.chdir(large_blueprint_repo)
+    yield BlueprintRepo(large_blueprint_repo)
+    os.chdir(cwd)
+
+
+def test_switch_to_temp_branch(benchmark, dirty_repo):
+    temp_branches = []
+
+    def make_dirty():
+        # undo the previous round, then change a blueprint and add an untracked file
+        if temp_branches:
+            branch_utils.revert_from_local_temp_branch(dirty_repo, "master", True)
+            branch_utils.delete_temp_local_branch(dirty_repo, temp_branches[-1])
+            branch_utils.delete_temp_remote_branch(dirty_repo, temp_branches[-1])
+        with open(os.path.join("blueprints", "bp-0000.yaml"), "a") as bp_file:
+            bp_file.write("# local change\n")
+        with open("untracked.txt", "w") as untracked:
+            untracked.write("untracked")
+
+    def switch():
+        temp_branches.append(branch_utils.switch_to_temp_branch(dirty_repo, "master"))
+
+    benchmark.pedantic(switch, setup=make_dirty, rounds=5)
+
+    branch_utils.revert_from_local_temp_branch(dirty_repo, "master", True)
+    assert dirty_repo.active_branch.name == "master"
+    assert dirty_repo.is_dirty(untracked_files=True)
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from torque.services.json_codec import available_codecs, get_codec
+from torque.testing.fake_api import FakeSandbox
+
+SANDBOXES_COUNT = 5000
+CHUNK_SIZE = 16 * 1024
+CODECS = list(available_codecs())
+
+
+@pytest.fixture(scope="module")
+def listing() -> bytes:
+    """Body of a large sandbox listing, as the API sends it"""
+    sandboxes = [
+        FakeSandbox(f"{i:012x}", f"sandbox-{i}", f"blueprint-{i % 40}", "user@example.com", 0, 0, inputs={"size": "s"})
+        for i in range(SANDBOXES_COUNT)
+    ]
+    return json.dumps([sandbox.to_json() for sandbox in sandboxes]).encode()
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_decode_listing(benchmark, listing, name):
+    codec = available_codecs()[name]
+
+    assert len(benchmark(codec.loads, listing)) == SANDBOXES_COUNT
+
+
+def test_decode_listing_incrementally(benchmark, listing):
+    codec = get_codec()
+    chunks = [listing[i : i + CHUNK_SIZE] for i in range(0, len(listing), CHUNK_SIZE)]
+
+    assert benchmark(lambda: sum(1 for _ in codec.iter_list(chunks))) == SANDBOXES_COUNT
+
+
+def test_first_item_of_listing(benchmark, listing):
+    """Time until the first sandbox of the listing can be shown"""
+    codec = get_codec()
+    chunks = [listing[i : i + CHUNK_SIZE] for i in range(0, len(listing), CHUNK_SIZE)]
+
+    assert benchmark(lambda: next(codec.iter_list(chunks)))["details"]["id"] == "000000000000"
+
+
+@pytest.mark.parametrize("pretty", [True, False], ids=["pretty", "compact"])
+def test_encode_output(benchmark, listing, pretty):
+    codec = get_codec()
+    documents = json.loads(listing)
+
+    assert benchmark(codec.dumps, documents, pretty=pretty)
@@ -0,0 +1,29 @@
+import io
+from unittest.mock import Mock, patch
+
+import pytest
+
+from torque.parsers.global_input_parser import GlobalInputParser
+from torque.sandboxes import Sandbox
+from torque.services.output_formatter import OutputFormatter
+
+ITEMS_COUNT = 10000
+
+
+@pytest.fixture(scope="module")
+def sandboxes() -> list:
+    manager = Mock()
+    return [Sandbox(manager, f"{i:012x}", f"sandbox-{i}", f"blueprint-{i % 40}") for i in range(ITEMS_COUNT)]
+
+
+@pytest.mark.parametrize("output", [None, "json", "ndjson"])
+def test_output_formatter(benchmark, sandboxes, output):
+    formatter = OutputFormatter(GlobalInputParser({"--output": output}))
+
+    def render():
+        stream = io.StringIO()
+        with patch("sys.stdout", stream):
+            formatter.yield_output(True, sandboxes)
+        return stream
+
+    assert benchmark(render).getvalue()
@@ -0,0 +1,31 @@
+import time
+from unittest.mock import Mock
+
+from torque.client import TorqueClient
+from torque.sandboxes import SandboxesManager
+from torque.services.waiter import Waiter
+
+LAUNCH_TIME = 0.3
+
+
+def test_waiter_detection_latency(benchmark, fake_torque_server, monkeypatch):
+    """Time from the sandbox becoming Active on the API to the waiter noticing it"""
+    monkeypatch.setattr(Waiter, "POLL_INTERVAL", 0.1)
+    api = fake_torque_server.api
+    api.launch_time = LAUNCH_TIME
+    api.add_blueprint("demo", "web")
+    manager = SandboxesManager(TorqueClient(space="demo", token="token"))
+    command = Mock(global_input_parser=Mock(output_json=True))
+    context_branch = Mock(temp_branch_exists=False)
+    latencies = []
+
+    def wait():
+        sandbox_id = manager.start("bench", "web")
+        timed_out = Waiter.wait_for_sandbox_to_launch(command, manager, sandbox_id, 1, context_branch, True)
+        active_at = api.sandboxes["demo"][sandbox_id].created_at + LAUNCH_TIME
+        latencies.append(time.time() - active_at)
+        return timed_out
+
+    assert benchmark.pedantic(wait, rounds=5) is False
+    benchmark.extra_info["detection_latency_max_s"] = round(max(latencies), 3)
+    benchmark.extra_info["poll_interval_s"] = Waiter.POLL_INTERVAL
@@ -0,0 +1,86 @@
+"""
+pytest-benchmark suite of the CLI hot paths.
+
+    $ python -m pytest benchmarks                                   # run
+    $ python -m pytest benchmarks --benchmark-save=baseline         # store new baseline in benchmarks/baselines
+    $ python -m pytest benchmarks --benchmark-compare --benchmark-compare-fail=median:25%
+"""
+
+import os
+
+import pytest
+import yaml
+from git import Repo
+
+from torque.testing import FakeTorqueApi, FakeTorqueServer
+
+BASELINES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+BLUEPRINTS_COUNT = 300
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # keep baselines in the repo (next to the suite) regardless of the working directory
+    if config.getoption("benchmark_storage", None) == "file://./.benchmarks":
+        config.option.benchmark_storage = f"file://{BASELINES_DIR}"
+
+
+@pytest.fixture
+def fake_torque_api():
+    return FakeTorqueApi(seed=0)
+
+
+@pytest.fixture
+def fake_torque_server(fake_torque_api, monkeypatch):
+    """Local fake Torque API server. TORQUE_HOSTNAME points to it for the duration of the test"""
+    with FakeTorqueServer(fake_torque_api) as server:
+        monkeypatch.setenv("TORQUE_HOSTNAME", server.hostname)
+        yield server
+
+
+def generate_blueprint(index: int) -> dict:
+    return {
+        "spec_version": 2,
+        "description": f"Generated blueprint {index}",
+        "inputs": [{f"input_{i}": {"display_style": "normal", "default_value": f"value_{i}"}} for i in range(10)],
+        "outputs": {"url": {"value": "{{ .grains.app.outputs.url }}"}},
+        "grains": {
+            f"app_{i}": {
+                "kind": "terraform",
+                "spec": {
+                    "source": {"store": "repo", "path": f"terraform/app_{i}"},
+                    "host": {"name": "eks"},
+                    "inputs": [{"size": "{{ .inputs.input_0 }}"}],
+                    "outputs": ["url"],
+                },
+            }
+            for i in range(5)
+        },
+    }
+
+
+def init_repo(path: str, remote_path: str) -> Repo:
+    Repo.init(remote_path, bare=True)
+    repo = Repo.init(path)
+    repo.git.symbolic_ref("HEAD", "refs/heads/master")
+    repo.config_writer().set_value("user", "name", "bench").release()
+    repo.config_writer().set_value("user", "email", "bench@example.com").release()
+    repo.create_remote("origin", remote_path)
+    return repo
+
+
+@pytest.fixture(scope="session")
+def large_blueprint_repo(tmp_path_factory) -> str:
+    """Committed git repo with BLUEPRINTS_COUNT blueprints and a local bare 'origin' remote"""
+    root = tmp_path_factory.mktemp("large_repo")
+    path = str(root / "repo")
+    repo = init_repo(path, str(root / "origin.git"))
+
+    os.makedirs(os.path.join(path, "blueprints"))
+    for i in range(BLUEPRINTS_COUNT):
+        with open(os.path.join(path, "blueprints", f"bp-{i:04d}.yaml"), "w") as bp_file:
+            yaml.safe_dump(generate_blueprint(i), bp_file)
+    repo.git.add(".")
+    repo.git.commit("-m", "Generated blueprints")
+    repo.git.push("origin", "master")
+    return path
@@ -0,0 +1,54 @@
+"""
+Compares rendering of a 10k-row sandbox table by tabulate (previous implementation of
+OutputFormatter.format_table) and by the built-in TableRenderer.
+
+Usage: python -m benchmarks.table_rendering [--rows=<N>] [--repeat=<N>]
+"""
+
+import argparse
+import timeit
+from unittest.mock import Mock
+
+import tabulate
+
+from torque.sandboxes import Sandbox
+from torque.view.table_renderer import TableRenderer
+
+
+def generate_sandboxes(count: int) -> list:
+    manager = Mock()
+    return [Sandbox(manager, f"{i:012x}", f"sandbox-{i}-feature-branch", f"blueprint-{i % 40}") for i in range(count)]
+
+
+def render_with_tabulate(sandboxes: list) -> str:
+    return tabulate.tabulate([sb.table_serialize() for sb in sandboxes], headers="keys")
+
+
+def render_with_table_renderer(sandboxes: list) -> str:
+    return TableRenderer(fit_terminal=False).render(sandboxes)
+
+
+def render_streaming(sandboxes: list) -> int:
+    return sum(1 for _ in TableRenderer(fit_terminal=False).render_lines(iter(sandboxes)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    sandboxes = generate_sandboxes(args.rows)
+    assert render_with_tabulate(sandboxes) == render_with_table_renderer(sandboxes)
+
+    for name, func in [
+        ("tabulate", render_with_tabulate),
+        ("TableRenderer", render_with_table_renderer),
+        ("TableRenderer (stream)", render_streaming),
+    ]:
+        best = min(timeit.repeat(lambda: func(sandboxes), number=1, repeat=args.repeat))
+        print(f"{name:<24} {args.rows} rows: {best * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
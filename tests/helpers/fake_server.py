@@ -0,0 +1,34 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from torque.testing import FakeTorqueApi, FakeTorqueServer
+
+
+class FakeTorqueServerTestCase(unittest.TestCase):
+    """Test case with a local fake Torque API server.
+
+    For the duration of each test TORQUE_HOSTNAME points to the server and TORQUE_CACHE_DIR to a temporary directory
+    (self.cache_dir). The fake API (self.api) can be populated in setUp of the subclass after calling super().
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+
+        self.api = self.create_api()
+        self.server = FakeTorqueServer(self.api).start()
+        self.addCleanup(self.server.stop)
+
+        self.patch_environ({"TORQUE_HOSTNAME": self.server.hostname, "TORQUE_CACHE_DIR": self.cache_dir.name})
+
+    def create_api(self) -> FakeTorqueApi:
+        return FakeTorqueApi(seed=0)
+
+    def patch_environ(self, values: dict) -> None:
+        """Set environment variables until the end of the test"""
+        environ = mock.patch.dict(os.environ, values)
+        environ.start()
+        self.addCleanup(environ.stop)
@@ -26,6 +26,30 @@ class TestBlueprintJsonLoad(unittest.TestCase):
     def test_bp_has_no_errors(self):
         self.assertFalse(self.blueprint.errors)
 
+    def test_detail_is_the_whole_document(self):
+        self.assertIs(self.blueprint.detail_serialize(), self.blueprint.raw)
+        self.assertEqual(self.blueprint.detail_serialize()["source"]["branch"], "master")
+
+
+class TestBlueprintFields(unittest.TestCase):
+    def test_only_requested_fields_and_attributes_are_kept(self):
+        # arrange
+        json_obj = {
+            "details": {"blueprint_name": "web", "url": "http://example.com", "inputs": [{"name": "size"}]},
+            "source": {"branch": "master", "commit": "abc"},
+        }
+
+        # act
+        blueprint = Blueprint.json_deserialize(mock.Mock(), json_obj, fields=[["source", "branch"]])
+
+        # assert
+        self.assertEqual(
+            blueprint.raw,
+            {"details": {"blueprint_name": "web", "url": "http://example.com"}, "source": {"branch": "master"}},
+        )
+        self.assertEqual((blueprint.name, blueprint.url), ("web", "http://example.com"))
+        self.assertEqual(blueprint.json_serialize(), {"source": {"branch": "master"}})
+
 
 class TestBlueprintSerialize(unittest.TestCase):
     def test_bp_serialize(self):
@@ -0,0 +1,146 @@
+import gzip
+import json
+import os
+import time
+import unittest
+
+from tests.helpers.fake_server import FakeTorqueServerTestCase
+from torque.client import TorqueClient
+from torque.exceptions import CassetteError
+from torque.models.blueprints import BlueprintsManager
+from torque.sandboxes import SandboxesManager
+from torque.services.cassette import CassettePlayer, CassetteRecorder, request_key
+from torque.testing import FakeTorqueApi
+
+
+class TestCassette(FakeTorqueServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.cache_dir.name, "cassette.ndjson")
+        self.api.populate("demo", blueprints=2, sandboxes=5)
+
+    def create_api(self) -> FakeTorqueApi:
+        return FakeTorqueApi(seed=0, latency=0.05)
+
+    def record(self, path: str, action):
+        client = TorqueClient(space="demo", token="secret-token")
+        client.cassette = CassetteRecorder(path)
+        try:
+            return action(client)
+        finally:
+            client.cassette.close()
+
+    def replay(self, path: str, action, speed: float = 0):
+        # nothing listens on the host, all responses must come from the cassette
+        self.patch_environ({"TORQUE_HOSTNAME": "http://127.0.0.1:9"})
+        client = TorqueClient(space="demo", token="token")
+        client.cassette = CassettePlayer(path, speed)
+        return action(client)
+
+    def test_replay_returns_recorded_responses(self):
+        # arrange
+        def action(client):
+            sandboxes = SandboxesManager(client).list(filter_opt="all")
+            return [(sb.sandbox_id, sb.sandbox_status) for sb in sandboxes], BlueprintsManager(client).get(
+                "blueprint-001"
+            )
+
+        recorded, recorded_bp = self.record(self.path, action)
+
+        # act
+        replayed, replayed_bp = self.replay(self.path, action)
+
+        # assert
+        self.assertEqual(replayed, recorded)
+        self.assertEqual(replayed_bp.name, recorded_bp.name)
+
+    def test_streamed_listing_is_replayed(self):
+        # arrange
+        def action(client):
+            return [sandbox.sandbox_id for sandbox in SandboxesManager(client).list_items(filter_opt="all")]
+
+        recorded = self.record(self.path, action)
+
+        # act
+        replayed = self.replay(self.path, action)
+
+        # assert
+        self.assertEqual(len(recorded), 5)
+        self.assertEqual(replayed, recorded)
+
+    def test_repeated_requests_are_replayed_in_order(self):
+        # arrange
+        self.api.launch_time = 0.2
+        self.api.latency = 0
+
+        def action(client):
+            manager = SandboxesManager(client)
+            sandbox_id = manager.start("sb", "blueprint-000")
+            statuses = [manager.get(sandbox_id).sandbox_status]
+            time.sleep(0.25)
+            statuses.append(manager.get(sandbox_id).sandbox_status)
+            return statuses + [manager.get(sandbox_id).sandbox_status]
+
+        recorded = self.record(self.path, action)
+
+        # act
+        replayed = self.replay(self.path, action)
+
+        # assert
+        self.assertEqual(recorded, ["Launching", "Active", "Active"])
+        self.assertEqual(replayed, recorded)
+
+    def test_replay_speed(self):
+        # arrange
+        self.record(self.path, lambda client: SandboxesManager(client).list())
+
+        # act
+        start_time = time.perf_counter()
+        self.replay(self.path, lambda client: SandboxesManager(client).list(), speed=1)
+        original_speed = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        self.replay(self.path, lambda client: SandboxesManager(client).list())
+        instant = time.perf_counter() - start_time
+
+        # assert
+        self.assertGreaterEqual(original_speed, 0.05)
+        self.assertLess(instant, 0.05)
+
+    def test_unknown_request_raises(self):
+        # arrange
+        self.record(self.path, lambda client: SandboxesManager(client).list())
+
+        # act & assert
+        with self.assertRaisesRegex(CassetteError, "No recorded interaction for GET"):
+            self.replay(self.path, lambda client: BlueprintsManager(client).list())
+
+    def test_gzip_cassette_without_secrets(self):
+        # arrange
+        path = os.path.join(self.cache_dir.name, "cassette.ndjson.gz")
+
+        # act
+        self.record(path, lambda client: client.login("account", "user@example.com", "p4ssw0rd"))
+
+        # assert
+        with gzip.open(path, "rt") as cassette_file:
+            content = cassette_file.read()
+        self.assertNotIn("p4ssw0rd", content)
+        self.assertNotIn("secret-token", content)
+        self.assertEqual(json.loads(content.splitlines()[1])["path"], "/api/accounts/account/login")
+
+    def test_request_key_is_host_independent(self):
+        self.assertEqual(
+            request_key("GET", "https://portal.qtorque.io/api/spaces/s/environments", {"skip": 0, "count": 25}),
+            request_key("GET", "http://127.0.0.1:8765/api/spaces/s/environments?count=25", {"skip": 0}),
+        )
+
+    def test_invalid_cassette(self):
+        with open(self.path, "w") as cassette_file:
+            cassette_file.write("not json")
+
+        with self.assertRaises(CassetteError):
+            CassettePlayer(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
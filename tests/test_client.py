@@ -3,6 +3,8 @@ import unittest
 from unittest import mock
 
 from torque.client import TorqueClient
+from torque.sandboxes import SandboxesManager
+from torque.testing import FakeTorqueApi, FakeTorqueServer
 
 
 class TestClient(unittest.TestCase):
@@ -21,6 +23,12 @@ class TestClient(unittest.TestCase):
         expected = "https://example.com/api/"
         self.assertEqual(client.base_url, expected)
 
+    @mock.patch.dict(os.environ, {"TORQUE_HOSTNAME": "http://127.0.0.1:8765"})
+    def test_custom_url_with_scheme(self):
+        client = TorqueClient()
+        expected = "http://127.0.0.1:8765/api/"
+        self.assertEqual(client.base_url, expected)
+
     def test_request_wrong_method(self):
         endpoint = "blueprints/"
         with self.assertRaises(ValueError):
@@ -29,6 +37,26 @@ class TestClient(unittest.TestCase):
     def test_if_account_provided_client_base_url_includes_it(self):
         self.assertEqual(self.client_with_account.base_url, "https://portal.qtorque.io/api/")
 
+    def test_warm_up_opens_connection_without_request(self):
+        # arrange
+        api = FakeTorqueApi(seed=0)
+        with FakeTorqueServer(api) as server:
+            client = TorqueClient(torque_host=server.hostname, space="demo", token="token")
+            pools = client.session.get_adapter(client.base_url).poolmanager.pools
+
+            def connections() -> int:
+                return sum(pools[key].num_connections for key in pools.keys())
+
+            # act
+            client.warm_up()
+            warmed_up = connections()
+            SandboxesManager(client).list(filter_opt="all")
+
+        # assert
+        self.assertEqual(len(api.requests), 1)
+        self.assertEqual(warmed_up, 1)
+        self.assertEqual(connections(), 1)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -4,11 +4,14 @@ from unittest.mock import Mock, patch
 
 from docopt import DocoptExit
 
+from tests.helpers.fake_server import FakeTorqueServerTestCase
 from torque.commands.base import BaseCommand
+from torque.commands.bench import BenchCommand
 from torque.commands.bp import BlueprintsCommand
 from torque.commands.configure import ConfigureCommand
 from torque.commands.sb import SandboxesCommand
-from torque.exceptions import ConfigFileMissingError
+from torque.exceptions import BadBlueprintRepo, ConfigFileMissingError
+from torque.models.connection import TorqueConnection
 
 
 class TestBaseCommand(unittest.TestCase):
@@ -40,8 +43,12 @@ class TestBaseCommand(unittest.TestCase):
 class TestBlueprintCommand(unittest.TestCase):
     def test_base_help_usage_line(self):
         expected_usage = """usage:
-        torque (bp | blueprint) list [--output=json | --output=json --detail]
-        torque (bp | blueprint) get <name> [--output=json | --output=json --detail]
+        torque (bp | blueprint) list [--output=json | --output=json --detail] [--fields=<fields>] [--query=<query>]
+        torque (bp | blueprint) get <name> [--output=json | --output=json --detail] [--fields=<fields>]
+                                           [--query=<query>]
+        torque (bp | blueprint) validate (<blueprint_name>... | --all) [--branch <branch> [--commit <commitId>]]
+                                                                         [--parallel <N>] [--output=json]
+        torque (bp | blueprint) validate --changed [--parallel <N>] [--output=json]
         torque (bp | blueprint) [--help]"""
 
         with self.assertRaises(DocoptExit) as ctx:
@@ -53,13 +60,97 @@ class TestBlueprintCommand(unittest.TestCase):
         args = "bp get test".split()
         command = BlueprintsCommand(command_args=args)
 
-        for action in ["list", "get"]:
+        for action in ["list", "get", "validate"]:
             self.assertIn(action, command.get_actions_table())
 
-    # def test_do_validate_commit_only(self):
-    #     args = "bp validate test --commit abc123".split()
-    #     command = BlueprintsCommand(command_args=args)
-    #     self.assertRaises(DocoptExit, command.do_validate)
+    def test_do_validate_commit_only(self):
+        args = "bp validate test --commit abc123".split()
+        command = BlueprintsCommand(command_args=args)
+        self.assertRaises(DocoptExit, command.do_validate)
+
+    @patch("torque.commands.bp.BlueprintValidationCache")
+    @patch("torque.commands.bp.ContextBranch")
+    @patch("torque.commands.bp.get_and_check_folder_based_repo")
+    def test_do_validate_changed_skips_cached(self, get_repo, context_branch, validation_cache):
+        # arrange
+        repo = get_repo.return_value
+        repo.blueprints = {"bp1": "bp1.yaml", "bp2": "bp2.yaml"}
+        repo.get_blueprint_content_hash.side_effect = lambda name: f"{name}-hash"
+        cache = validation_cache.return_value
+        cache.is_valid.side_effect = lambda name, content_hash: name == "bp1"
+        context_branch.return_value.__enter__.return_value.validation_branch = "main"
+        command = BlueprintsCommand("bp validate --changed".split(), Mock(space="space", token="token"))
+        command.manager = Mock()
+        command.manager.validate.return_value = Mock(errors=[])
+        command.info = Mock()
+
+        # act
+        success, report = command.do_validate()
+
+        # assert
+        self.assertTrue(success)
+        command.manager.validate.assert_called_once_with(blueprint="bp2", branch="main", commit=None)
+        cache.store.assert_called_once_with("bp2", "bp2-hash", [])
+        cache.save.assert_called_once()
+        self.assertEqual([row["cached"] for row in report], [True, False])
+
+    @patch("torque.commands.bp.BlueprintValidationCache")
+    @patch("torque.commands.bp.ContextBranch")
+    @patch("torque.commands.bp.get_and_check_folder_based_repo")
+    def test_do_validate_changed_reports_errors(self, get_repo, context_branch, validation_cache):
+        # arrange
+        repo = get_repo.return_value
+        repo.blueprints = {"bp1": "bp1.yaml"}
+        validation_cache.return_value.is_valid.return_value = False
+        command = BlueprintsCommand("bp validate --changed".split(), Mock(space="space", token="token"))
+        command.manager = Mock()
+        command.manager.validate.return_value = Mock(errors=[{"message": "bad input"}])
+        command.info = Mock()
+
+        # act
+        success, report = command.do_validate()
+
+        # assert
+        self.assertFalse(success)
+        self.assertEqual(report[0]["errors"], "bad input")
+
+    @patch("torque.commands.bp.ContextBranch")
+    @patch("torque.commands.bp.get_and_check_folder_based_repo")
+    def test_do_validate_all_sets_up_branch_once(self, get_repo, context_branch):
+        # arrange
+        get_repo.return_value.blueprints = {"bp1": "bp1.yaml", "bp2": "bp2.yaml", "bp3": "bp3.yaml"}
+        context_branch.return_value.__enter__.return_value.validation_branch = "tmp-branch"
+        command = BlueprintsCommand("bp validate --all --output=json".split(), Mock(space="space", token="token"))
+        command.manager = Mock()
+        command.manager.validate.side_effect = lambda blueprint, branch, commit: Mock(
+            errors=["broken"] if blueprint == "bp2" else []
+        )
+
+        # act
+        success, report = command.do_validate()
+
+        # assert
+        self.assertFalse(success)
+        context_branch.assert_called_once_with(get_repo.return_value, None)
+        self.assertEqual(command.manager.validate.call_count, 3)
+        self.assertEqual(report["summary"], {"total": 3, "valid": 2, "invalid": 1})
+        self.assertEqual(report["blueprints"][1], {"name": "bp2", "valid": False, "errors": ["broken"]})
+
+    @patch("torque.commands.bp.ContextBranch")
+    @patch("torque.commands.bp.get_and_check_folder_based_repo")
+    def test_do_validate_many_names_reports_failed_requests(self, get_repo, context_branch):
+        # arrange
+        command = BlueprintsCommand("bp validate bp1 bp2 --output=json".split(), Mock(space="space", token="token"))
+        command.manager = Mock()
+        command.manager.validate.side_effect = Exception("server error")
+
+        # act
+        success, report = command.do_validate()
+
+        # assert
+        self.assertFalse(success)
+        self.assertEqual([item["name"] for item in report["blueprints"]], ["bp1", "bp2"])
+        self.assertEqual(report["blueprints"][0]["errors"], ["Validation request failed"])
 
     def test_do_list(self):
         args = "bp list".split()
@@ -71,9 +162,14 @@ class TestSandboxCommand(unittest.TestCase):
         expected_usage = """usage:
         torque (sb | sandbox) start <blueprint_name> [options] [--output=json]
         torque (sb | sandbox) status <sandbox_id> [--output=json]
-        torque (sb | sandbox) get <sandbox_id> [--output=json | --output=json --detail]
+        torque (sb | sandbox) get <sandbox_id> [--output=json | --output=json --detail] [--fields=<fields>]
+                                               [--query=<query>]
         torque (sb | sandbox) end <sandbox_id>
-        torque (sb | sandbox) list [--filter={all|my|auto}] [--show-ended] [--count=<N>] [--output=json]
+        torque (sb | sandbox) list [--filter={all|my|auto}] [--show-ended] [--status=<status>] [--count=<N>]
+                                   [--output=json] [--fields=<fields>] [--query=<query>] [--cached] [--since=<time>]
+        torque (sb | sandbox) search <text> [--show-ended] [--count=<N>] [--since=<time>] [--output=json]
+        torque (sb | sandbox) watch [<sandbox_ids>...] [--filter={all|my|auto}] [--show-ended] [--status=<status>]
+                                    [--count=<N>] [--interval=<seconds>] [--table] [--output=ndjson]
         torque (sb | sandbox) [--help]"""
 
         with self.assertRaises(DocoptExit) as ctx:
@@ -84,7 +180,7 @@ class TestSandboxCommand(unittest.TestCase):
     def test_actions_table(self):
         args = "sb start test".split()
         command = SandboxesCommand(command_args=args)
-        expected_actions = ["start", "end", "status", "list", "get"]
+        expected_actions = ["start", "end", "status", "list", "get", "search", "watch"]
         for action in command.get_actions_table():
             self.assertIn(action, expected_actions)
 
@@ -119,12 +215,135 @@ class TestSandboxCommand(unittest.TestCase):
         func = "do_start"
         self.validate_command_input(line, func)
 
+    def test_watch_not_number_interval(self):
+        self.validate_command_input("sb watch --interval abc", "do_watch")
+
+    def test_watch_negative_interval(self):
+        self.validate_command_input("sb watch --interval=-1", "do_watch")
+
     def test_start_commit_without_branch(self):
         line = "sb start test --commit abc"
         func = "do_start"
         self.validate_command_input(line, func)
 
 
+class TestSandboxStart(FakeTorqueServerTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.api.add_blueprint("demo", "web", inputs={"size": "small", "region": "eu"})
+
+    @patch("torque.commands.sb.get_and_check_folder_based_repo", side_effect=BadBlueprintRepo("not a repo"))
+    def test_start_without_local_repo_uses_blueprint_defaults(self, repo_mock):
+        # arrange
+        command = SandboxesCommand(
+            command_args="sb start web --inputs region=us -o json".split(),
+            connection=TorqueConnection("demo", "token", None),
+        )
+
+        # act
+        success, sandbox_id = command.do_start()
+
+        # assert
+        self.assertTrue(success)
+        self.assertEqual(self.api.sandboxes["demo"][sandbox_id].inputs, {"size": "small", "region": "us"})
+        paths = [path.split("?")[0] for _, path in self.api.requests]
+        self.assertEqual(paths, ["/api/spaces/demo/catalog/web", "/api/spaces/demo/sandbox"])
+
+    @patch("torque.commands.sb.get_and_check_folder_based_repo", side_effect=BadBlueprintRepo("not a repo"))
+    def test_start_of_unknown_blueprint_fails_before_starting(self, repo_mock):
+        command = SandboxesCommand(
+            command_args="sb start missing -o json".split(), connection=TorqueConnection("demo", "token", None)
+        )
+
+        self.assertEqual(command.do_start(), (False, None))
+        self.assertEqual(len(self.api.requests), 1)
+
+    def test_start_uses_defaults_of_the_launched_revision(self):
+        # arrange
+        repo = Mock(
+            **{"remote.return_value.name": "origin", "get_blueprint_default_inputs.return_value": {"size": "xl"}}
+        )
+        command = SandboxesCommand(
+            command_args="sb start web -o json".split(), connection=TorqueConnection("demo", "token", None)
+        )
+
+        # act
+        with patch("torque.commands.sb.get_and_check_folder_based_repo", return_value=repo), patch(
+            "torque.commands.sb.ContextBranch"
+        ) as context_branch_class:
+            context_branch = context_branch_class.return_value
+            context_branch.temp_working_branch = None
+            context_branch.working_branch = context_branch.validation_branch = "feature"
+            success, sandbox_id = command.do_start()
+
+        # assert
+        self.assertTrue(success)
+        repo.get_blueprint_default_inputs.assert_called_once_with("web", "refs/remotes/origin/feature")
+        self.assertEqual(self.api.sandboxes["demo"][sandbox_id].inputs, {"size": "xl"})
+        self.assertNotIn("/api/spaces/demo/catalog/web", [path for _, path in self.api.requests])
+        repo.close.assert_called_once_with()
+
+    def test_temp_branch_is_removed_when_start_fails(self):
+        # arrange
+        repo = Mock(**{"get_blueprint_default_inputs.side_effect": BadBlueprintRepo("no such blueprint")})
+        command = SandboxesCommand(
+            command_args="sb start missing -o json".split(), connection=TorqueConnection("demo", "token", None)
+        )
+
+        # act
+        with patch("torque.commands.sb.get_and_check_folder_based_repo", return_value=repo), patch(
+            "torque.commands.sb.ContextBranch"
+        ) as context_branch_class:
+            context_branch = context_branch_class.return_value
+            context_branch.temp_working_branch = "torque-temp-feature"
+            result = command.do_start()
+
+        # assert
+        self.assertEqual(result, (False, None))
+        context_branch.__exit__.assert_called_once_with(None, None, None)
+        repo.close.assert_called_once_with()
+        self.assertNotIn("/api/spaces/demo/sandbox", [path for _, path in self.api.requests])
+
+    def test_launched_revision(self):
+        repo = Mock(**{"remote.return_value.name": "origin"})
+        synced = Mock(temp_working_branch=None, working_branch="feature")
+        with_local_changes = Mock(temp_working_branch="torque-temp-feature", working_branch="feature")
+
+        self.assertEqual(SandboxesCommand._launched_revision(repo, synced, None), "refs/remotes/origin/feature")
+        self.assertEqual(
+            SandboxesCommand._launched_revision(repo, with_local_changes, None), "refs/heads/torque-temp-feature"
+        )
+        self.assertEqual(SandboxesCommand._launched_revision(repo, synced, "fb88a5e"), "fb88a5e")
+
+
+class TestBenchCommand(unittest.TestCase):
+    def test_actions_table(self):
+        command = BenchCommand(command_args=["bench", "--local"])
+        self.assertEqual(list(command.get_actions_table()), ["bench"])
+
+    def test_wrong_mix(self):
+        command = BenchCommand(command_args=["bench", "--mix=list=1,update=1"])
+        self.assertRaises(DocoptExit, command.do_bench)
+
+    def test_start_requires_blueprint(self):
+        command = BenchCommand(command_args=["bench", "--mix=start=1"], connection=Mock(space="space", token="token"))
+        self.assertRaises(DocoptExit, command.do_bench)
+
+    def test_local_bench(self):
+        # arrange
+        command = BenchCommand(
+            command_args=["bench", "--local", "--mix=list,get,start,end", "--requests=20", "--output=json"]
+        )
+
+        # act
+        success, report = command.do_bench()
+
+        # assert
+        self.assertTrue(success)
+        self.assertEqual(report["summary"]["operations"] + report["summary"]["skipped"], 20)
+        self.assertEqual(report["summary"]["error_rate"], 0)
+
+
 class TestConfigureCommand(unittest.TestCase):
     def test_base_help_usage_line(self):
         expected_usage = """usage:
@@ -187,6 +406,24 @@ class TestConfigureCommand(unittest.TestCase):
         # assert
         self.assertFalse(result)
 
+    @patch("torque.commands.configure.TorqueClient")
+    @patch("torque.commands.configure.TorqueConfigProvider")
+    @patch("torque.commands.configure.GlobalInputParser")
+    def test_configure_login_does_not_use_cached_token(self, global_input_parser, config_provider, client):
+        # arrange
+        args = "configure set --login -P dev -a account -s space -e me@example.com -p secret".split()
+        command = ConfigureCommand(args)
+        client.return_value.__enter__.return_value.longtoken.return_value = "longtoken"
+
+        # act
+        command.do_configure()
+
+        # assert
+        client.assert_called_once_with(
+            account="account", email="me@example.com", password="secret", use_cached_token=False
+        )
+        config_provider.return_value.save_profile.assert_called_once_with("dev", "longtoken", "space", "account")
+
     @patch("torque.commands.configure.TorqueConfigProvider")
     @patch("torque.commands.configure.GlobalInputParser")
     def test_configure_test(self, global_input_parser, config_provider):
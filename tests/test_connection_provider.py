@@ -125,6 +125,55 @@ class TestTorqueConnectionProvider(unittest.TestCase):
         with self.assertRaises(DocoptExit):
             self.connection_provider.get_connection()
 
+    @patch("torque.services.connection.TorqueConfigProvider")
+    def test_get_connections_of_all_complete_profiles(self, config_provider):
+        # arrange
+        self.input_parser_mock.all_profiles = True
+        config_provider.return_value.load_all.return_value = {
+            "dev": TestTorqueConnectionProviderHelper.build_connection_dict("acme", "dev-space", "t1"),
+            "broken": {TorqueConfigKeys.TOKEN: "t2"},
+            "prod": TestTorqueConnectionProviderHelper.build_connection_dict(None, "prod-space", "t3"),
+        }
+
+        # act
+        connections = self.connection_provider.get_connections()
+
+        # assert
+        config_provider.return_value.load_all.assert_called_once_with()
+        self.assertEqual(
+            [(c.profile, c.space, c.token, c.account) for c in connections],
+            [("dev", "dev-space", "t1", "acme"), ("prod", "prod-space", "t3", None)],
+        )
+
+    @patch("torque.services.connection.TorqueConfigProvider")
+    def test_get_connections_of_listed_profiles(self, config_provider):
+        # arrange
+        self.input_parser_mock.all_profiles = False
+        self.input_parser_mock.profiles = ["prod", "dev"]
+        config_provider.return_value.load_all.return_value = {
+            "dev": TestTorqueConnectionProviderHelper.build_connection_dict(None, "dev-space", "t1"),
+            "prod": TestTorqueConnectionProviderHelper.build_connection_dict(None, "prod-space", "t3"),
+        }
+
+        # act
+        connections = self.connection_provider.get_connections()
+
+        # assert
+        self.assertEqual([connection.space for connection in connections], ["prod-space", "dev-space"])
+
+    @patch("torque.services.connection.TorqueConfigProvider")
+    def test_get_connections_unknown_profile(self, config_provider):
+        # arrange
+        self.input_parser_mock.all_profiles = False
+        self.input_parser_mock.profiles = ["dev", "qa"]
+        config_provider.return_value.load_all.return_value = {
+            "dev": TestTorqueConnectionProviderHelper.build_connection_dict(None, "dev-space", "t1"),
+        }
+
+        # act & assert
+        with self.assertRaises(DocoptExit):
+            self.connection_provider.get_connections()
+
 
 class TestTorqueConnectionProviderHelper:
     @staticmethod
@@ -0,0 +1,127 @@
+import time
+import unittest
+
+from tests.helpers.fake_server import FakeTorqueServerTestCase
+from torque.client import TorqueClient
+from torque.models.blueprints import BlueprintsManager
+from torque.sandboxes import SandboxesManager
+from torque.testing.fake_api import ACTIVE, ACTIVE_WITH_ERROR, ENDED, LAUNCHING, TERMINATING
+
+
+class TestFakeTorqueServer(FakeTorqueServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.api.add_blueprint("demo", "web", inputs={"size": "small"})
+        self.api.add_blueprint("demo", "broken", errors=["Missing input"])
+        self.client = TorqueClient(space="demo", token="token")
+        self.sandboxes = SandboxesManager(self.client)
+        self.blueprints = BlueprintsManager(self.client)
+
+    def test_clients_use_server_from_environment(self):
+        self.assertEqual(self.client.base_url, f"{self.server.hostname}/api/")
+
+    def test_sandbox_lifecycle(self):
+        # arrange
+        self.api.launch_time = 0.2
+
+        # act
+        sandbox_id = self.sandboxes.start("my-sb", "web", inputs={"size": "large"})
+        launching = self.sandboxes.get(sandbox_id).sandbox_status
+        time.sleep(0.25)
+        active = self.sandboxes.get(sandbox_id).sandbox_status
+        self.sandboxes.end(sandbox_id)
+        ended = self.sandboxes.get(sandbox_id).sandbox_status
+
+        # assert
+        self.assertEqual(launching, LAUNCHING)
+        self.assertEqual(active, ACTIVE)
+        self.assertEqual(ended, ENDED)
+        self.assertEqual(self.sandboxes.get(sandbox_id).name, "my-sb")
+
+    def test_sandbox_of_invalid_blueprint_is_active_with_error(self):
+        sandbox_id = self.sandboxes.start("my-sb", "broken")
+
+        self.assertEqual(self.sandboxes.get(sandbox_id).sandbox_status, ACTIVE_WITH_ERROR)
+
+    def test_list_pages(self):
+        # arrange
+        self.api.populate("demo", blueprints=3, sandboxes=60)
+
+        # act
+        pages = list(self.sandboxes.list_pages(count=50, page_size=20))
+
+        # assert
+        self.assertEqual([len(page) for page in pages], [20, 20, 10])
+        self.assertEqual(len({sb.sandbox_id for page in pages for sb in page}), 50)
+
+    def test_list_items_match_list_pages(self):
+        # arrange
+        self.api.populate("demo", blueprints=3, sandboxes=60)
+
+        # act
+        items = list(self.sandboxes.list_items(count=50, page_size=20))
+
+        # assert
+        pages = self.sandboxes.list_pages(count=50, page_size=20)
+        self.assertEqual([sb.sandbox_id for sb in items], [sb.sandbox_id for page in pages for sb in page])
+        self.assertEqual(len(self.api.requests), 6)
+
+    def test_list_filters_by_status(self):
+        # arrange
+        for _ in range(30):
+            self.api.add_sandbox("demo", "web", status=ENDED)
+        self.api.add_sandbox("demo", "web", status=ACTIVE)
+
+        # act
+        active = [sb for page in self.sandboxes.list_pages(count=25, show_ended=False) for sb in page]
+
+        # assert
+        self.assertEqual([sb.sandbox_status for sb in active], [ACTIVE])
+        self.assertEqual(len(self.api.requests), 1)
+
+    def test_blueprints(self):
+        self.assertEqual(sorted(bp.name for bp in self.blueprints.list()), ["broken", "web"])
+        self.assertEqual(self.blueprints.get_detailed("web")["details"]["inputs"][0]["default_value"], "small")
+        self.assertEqual(self.blueprints.validate("web").errors, [])
+        self.assertEqual(self.blueprints.validate("broken").errors, [{"message": "Missing input"}])
+
+    def test_injected_errors(self):
+        # arrange
+        self.api.fail_next(503, path="catalog")
+
+        # act & assert
+        with self.assertRaisesRegex(Exception, "Injected error 503"):
+            self.blueprints.get("web")
+        self.assertEqual(self.blueprints.get("web").name, "web")
+
+    def test_throttling(self):
+        # arrange
+        self.api.rate_limit = 2
+
+        # act
+        statuses = [
+            self.client.session.get(f"{self.client.base_url}spaces/demo/blueprints").status_code for _ in range(4)
+        ]
+
+        # assert
+        self.assertEqual(statuses, [200, 200, 429, 429])
+        self.assertEqual(self.api.throttled, 2)
+
+    def test_unknown_sandbox(self):
+        with self.assertRaises(Exception):
+            self.sandboxes.get("unknown")
+
+    def test_missing_token_is_rejected(self):
+        response = self.client.session.get(
+            f"{self.client.base_url}spaces/demo/blueprints", headers={"Authorization": None}
+        )
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_add_sandbox_with_status(self):
+        for status in (LAUNCHING, ACTIVE, ACTIVE_WITH_ERROR, TERMINATING, ENDED):
+            self.assertEqual(self.api.add_sandbox("demo", "web", status=status).status, status)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import io
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+from docopt import DocoptExit, docopt
+
+from torque import shell
+from torque.parsers import grammar
+from torque.parsers.grammar import GrammarStore, grammar_key
+
+COMMAND_ARGVS = {
+    "sb": [
+        ["sb", "list"],
+        ["sandbox", "list", "--filter=all", "--count", "5", "-o", "json"],
+        ["sb", "list", "--cached", "--since=1h", "--status=Active,Ended", "--show-ended"],
+        ["sb", "status", "abc"],
+        ["sb", "status", "list"],
+        ["sb", "start", "bp", "-d", "30", "--inputs", "a=b", "--wait=10"],
+        ["sb", "start", "other", "--branch=dev", "--commit", "1234"],
+        ["sb", "end", "x"],
+        ["sb", "get", "x", "--detail", "-o", "json"],
+        ["sb", "search", "a", "b", "c"],
+        ["sb", "search", "a"],
+        ["sb", "bogus"],
+        ["sb", "list", "extra"],
+        ["sb", "start"],
+        ["sb", "list", "--unknown"],
+        ["sb", "list", "--count"],
+    ],
+    "bp": [
+        ["bp", "list"],
+        ["bp", "validate", "first", "second", "-b", "dev"],
+        ["bp", "validate", "--all"],
+        ["bp", "validate", "--changed", "--parallel", "4"],
+        ["bp", "get", "name", "-d"],
+        ["bp", "validate"],
+    ],
+    "configure": [
+        ["configure", "list"],
+        ["configure", "set", "--profile", "dev", "-t", "token", "-s", "space"],
+        ["configure", "remove", "dev"],
+        ["configure", "nope"],
+    ],
+}
+
+GLOBAL_ARGVS = [
+    ["sb", "list"],
+    ["--space=demo", "--token", "token", "sb", "status", "x", "--output=json"],
+    ["--trace", "--profile=dev", "bp", "validate", "--all"],
+    ["--record=a", "--replay=b", "sb"],
+    [],
+]
+
+
+def run(parse):
+    try:
+        return "ok", dict(parse())
+    except DocoptExit as e:
+        return "exit", str(e)
+
+
+class TestGrammar(unittest.TestCase):
+    def setUp(self) -> None:
+        self.grammars_dir = tempfile.TemporaryDirectory()
+        self.store = GrammarStore([Path(self.grammars_dir.name)])
+
+    def tearDown(self) -> None:
+        self.grammars_dir.cleanup()
+
+    def assert_same_as_docopt(self, doc, argv, **kwargs):
+        expected = run(lambda: docopt(doc, argv=argv, **kwargs))
+        # once to learn the shape of argv and once more from the stored plan
+        for store in (self.store, GrammarStore([Path(self.grammars_dir.name)])):
+            self.assertEqual(run(lambda: store.get(doc).parse(argv, **kwargs)), expected, argv)
+
+    def test_commands_parse_like_docopt(self):
+        for command, argvs in COMMAND_ARGVS.items():
+            for argv in argvs:
+                self.assert_same_as_docopt(shell.commands_table[command].__doc__, argv)
+
+    def test_global_arguments_parse_like_docopt(self):
+        for argv in GLOBAL_ARGVS:
+            self.assert_same_as_docopt(shell.__doc__, argv, options_first=True, version="1.0")
+
+    def test_values_of_known_shape_come_from_argv(self):
+        # arrange
+        doc = shell.commands_table["sb"].__doc__
+        self.store.get(doc).parse(["sb", "start", "first", "-d", "10"])
+
+        # act
+        args = GrammarStore([Path(self.grammars_dir.name)]).get(doc).parse(["sb", "start", "second", "-d", "20"])
+
+        # assert
+        self.assertEqual(args["<blueprint_name>"], "second")
+        self.assertEqual(args["--duration"], "20")
+        self.assertTrue(args["start"])
+
+    def test_grammar_is_stored_by_docstring_hash(self):
+        # act
+        self.store.get(shell.__doc__).parse(["sb", "list"], options_first=True)
+
+        # assert
+        path = Path(self.grammars_dir.name) / f"{grammar_key(shell.__doc__)}.json"
+        self.assertTrue(path.exists())
+        self.assertNotEqual(grammar_key(shell.__doc__), grammar_key(shell.__doc__ + " "))
+
+    def test_stored_grammar_is_not_parsed_again(self):
+        # arrange
+        self.store.get(shell.__doc__)
+
+        # act
+        with mock.patch.object(grammar, "_compile") as compile_mock:
+            GrammarStore([Path(self.grammars_dir.name)]).get(shell.__doc__)
+
+        # assert
+        compile_mock.assert_not_called()
+
+    def test_precompiled_grammar_is_read_but_not_written(self):
+        # arrange
+        package_dir = Path(self.grammars_dir.name) / "package"
+        user_dir = Path(self.grammars_dir.name) / "user"
+        GrammarStore([package_dir]).get(shell.__doc__)
+        precompiled = (package_dir / f"{grammar_key(shell.__doc__)}.json").read_text()
+
+        # act
+        with mock.patch.object(grammar, "_compile") as compile_mock:
+            GrammarStore([user_dir, package_dir]).get(shell.__doc__).parse(["sb", "list"], options_first=True)
+
+        # assert
+        compile_mock.assert_not_called()
+        self.assertEqual((package_dir / f"{grammar_key(shell.__doc__)}.json").read_text(), precompiled)
+        self.assertTrue((user_dir / f"{grammar_key(shell.__doc__)}.json").exists())
+
+    def test_grammars_are_saved_to_the_user_cache_only(self):
+        with mock.patch.dict("os.environ", {"TORQUE_CACHE_DIR": self.grammars_dir.name}):
+            directories = GrammarStore()._get_directories()
+
+        self.assertEqual(directories, [Path(self.grammars_dir.name) / "grammars", grammar.GRAMMARS_DIR])
+
+    def test_help_and_version(self):
+        for argv in (["--help"], ["--version"]):
+            output = io.StringIO()
+            with redirect_stdout(output), self.assertRaises(SystemExit):
+                self.store.get(shell.__doc__).parse(argv, options_first=True, version="1.0")
+            self.assertTrue(output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
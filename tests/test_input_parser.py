@@ -3,6 +3,8 @@ import unittest
 from unittest import mock
 from unittest.mock import Mock
 
+from docopt import DocoptExit
+
 from torque.parsers.global_input_parser import GlobalInputParser
 
 
@@ -249,3 +251,21 @@ class TestGlobalInputParser(unittest.TestCase):
 
         # assert
         self.assertIsNone(config_path)
+
+    def test_get_replay_speed(self):
+        # arrange
+        args = {"--replay": "cassette.ndjson", "--replay-speed": "2.5"}
+        input_parser = GlobalInputParser(args)
+
+        # act
+        speed = input_parser.replay_speed
+
+        # assert
+        self.assertEqual(speed, 2.5)
+        self.assertEqual(GlobalInputParser({}).replay_speed, 0)
+
+    def test_get_replay_speed_raises_on_wrong_value(self):
+        for speed in ("fast", "-1"):
+            input_parser = GlobalInputParser({"--replay-speed": speed})
+            with self.assertRaises(DocoptExit):
+                _ = input_parser.replay_speed
@@ -0,0 +1,100 @@
+import json
+import unittest
+from unittest import mock
+
+from torque.services import json_codec
+from torque.services.json_codec import JsonCodec, available_codecs, get_codec
+
+DOCUMENT = [
+    {"id": "1", "name": 'quoted " and escaped \\', "inputs": [{"name": "brackets", "value": "[{]},"}]},
+    {"id": "2", "name": "unicode é", "errors": []},
+    42,
+    "text",
+    None,
+]
+
+
+def split(data: bytes, size: int) -> list:
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+class TestJsonCodecs(unittest.TestCase):
+    def test_codecs_agree(self):
+        for name, codec in available_codecs().items():
+            with self.subTest(codec=name):
+                self.assertEqual(codec.loads(json.dumps(DOCUMENT).encode()), DOCUMENT)
+                self.assertEqual(json.loads(codec.dumps(DOCUMENT, pretty=True)), DOCUMENT)
+                self.assertEqual(json.loads(codec.dumps(DOCUMENT)), DOCUMENT)
+                self.assertNotIn("\n", codec.dumps(DOCUMENT))
+
+    def test_objects_are_converted_with_default(self):
+        obj = mock.Mock(json_serialize=mock.Mock(return_value={"id": "1"}))
+
+        for name, codec in available_codecs().items():
+            with self.subTest(codec=name):
+                self.assertEqual(codec.dumps([obj], default=lambda x: x.json_serialize()), '[{"id":"1"}]')
+
+    def test_output_does_not_depend_on_the_library(self):
+        document = {"name": "caf\u00e9/x", "size": 1e16, "items": [1.5, None]}
+
+        for name, codec in available_codecs().items():
+            with self.subTest(codec=name):
+                self.assertEqual(codec.dumps(document, pretty=True), json.dumps(document, indent=True))
+                self.assertEqual(codec.dumps(document), json.dumps(document, separators=(",", ":")))
+
+    def test_integers_out_of_64_bit_range(self):
+        for name, codec in available_codecs().items():
+            with self.subTest(codec=name):
+                self.assertEqual(codec.dumps({"size": 2**70}), '{"size":1180591620717411303424}')
+
+    def test_standard_library_is_always_available(self):
+        self.assertIsInstance(get_codec("json"), JsonCodec)
+        self.assertEqual(list(available_codecs())[-1], "json")
+
+    def test_unknown_library_falls_back_to_the_fastest(self):
+        self.assertEqual(get_codec("simdjson").name, next(iter(available_codecs())))
+
+    def test_without_optional_libraries(self):
+        with mock.patch.object(json_codec, "orjson", None), mock.patch.object(json_codec, "ujson", None):
+            self.assertEqual(get_codec().name, "json")
+
+
+class TestIncrementalListDecoding(unittest.TestCase):
+    def test_any_chunk_size(self):
+        data = json.dumps(DOCUMENT, indent=2).encode()
+
+        for name, codec in available_codecs().items():
+            for size in (1, 2, 5, 64, len(data)):
+                with self.subTest(codec=name, chunk_size=size):
+                    self.assertEqual(list(codec.iter_list(split(data, size))), DOCUMENT)
+
+    def test_items_are_decoded_before_the_rest_arrives(self):
+        # arrange
+        received = []
+
+        def chunks():
+            for chunk in (b'[{"id": "1"}, {"id"', b': "2"}', b"]"):
+                received.append(chunk)
+                yield chunk
+
+        # act
+        items = get_codec().iter_list(chunks())
+        first = next(items)
+
+        # assert
+        self.assertEqual(first, {"id": "1"})
+        self.assertEqual(len(received), 1)
+        self.assertEqual(list(items), [{"id": "2"}])
+
+    def test_empty_list(self):
+        self.assertEqual(list(get_codec().iter_list([b" [ ", b"]\n"])), [])
+
+    def test_invalid_documents(self):
+        for data in (b'{"id": "1"}', b'[{"id": "1"}', b""):
+            with self.subTest(data=data):
+                with self.assertRaises(ValueError):
+                    list(get_codec().iter_list([data]))
+
+
+if __name__ == "__main__":
+    unittest.main()
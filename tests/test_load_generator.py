@@ -0,0 +1,99 @@
+import unittest
+
+from tests.helpers.fake_server import FakeTorqueServerTestCase
+from torque.client import TorqueClient
+from torque.sandboxes import SandboxesManager
+from torque.services.load_generator import LoadGenerator, parse_mix
+from torque.testing.fake_api import ENDED
+
+
+class TestParseMix(unittest.TestCase):
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix("list=70, get=20,start"), {"list": 70, "get": 20, "start": 1})
+
+    def test_unknown_operation(self):
+        with self.assertRaisesRegex(ValueError, "Unknown operation 'update'"):
+            parse_mix("list=1,update=2")
+
+    def test_wrong_weight(self):
+        with self.assertRaises(ValueError):
+            parse_mix("list=many")
+        with self.assertRaises(ValueError):
+            parse_mix("list=0")
+
+
+class TestLoadGenerator(FakeTorqueServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.api.populate("demo", blueprints=2, sandboxes=10)
+        self.manager = SandboxesManager(TorqueClient(space="demo", token="token"))
+
+    def test_run_fixed_number_of_operations(self):
+        # arrange
+        generator = LoadGenerator(self.manager, {"list": 1, "get": 1}, concurrency=3, seed=1)
+
+        # act
+        report = generator.run(requests=30)
+
+        # assert
+        summary = report.summary()
+        self.assertEqual(summary["operations"], 30)
+        self.assertEqual(summary["error_rate"], 0)
+        self.assertEqual(sum(row["count"] for row in report.operations()), 30)
+        self.assertGreaterEqual(summary["http_requests"], 30)
+
+    def test_only_own_sandboxes_are_ended(self):
+        # arrange
+        existing = {sb_id: sb.ended_at for sb_id, sb in self.api.sandboxes["demo"].items()}
+        generator = LoadGenerator(self.manager, {"start": 1, "end": 1}, concurrency=2, blueprint="blueprint-000")
+
+        # act
+        generator.run(requests=20)
+
+        # assert
+        started = [sb for sb_id, sb in self.api.sandboxes["demo"].items() if sb_id not in existing]
+        self.assertTrue(started)
+        self.assertTrue(all(sb.status == ENDED for sb in started))
+        self.assertEqual({sb_id: self.api.sandboxes["demo"][sb_id].ended_at for sb_id in existing}, existing)
+
+    def test_started_sandboxes_have_unique_names(self):
+        # arrange
+        existing = set(self.api.sandboxes["demo"])
+        generators = [LoadGenerator(self.manager, {"start": 1}, concurrency=2, blueprint="blueprint-000") for _ in "ab"]
+
+        # act
+        for generator in generators:
+            generator.run(requests=4)
+
+        # assert
+        names = [sb.name for sb_id, sb in self.api.sandboxes["demo"].items() if sb_id not in existing]
+        self.assertEqual(len(names), 8)
+        self.assertEqual(len(set(names)), 8)
+
+    def test_errors_and_throttling_are_reported(self):
+        # arrange
+        self.api.rate_limit = 5
+        generator = LoadGenerator(self.manager, {"list": 1}, concurrency=1)
+
+        # act
+        report = generator.run(requests=10)
+
+        # assert
+        summary = report.summary()
+        self.assertEqual(summary["throttled"], 5)
+        self.assertEqual(summary["throttle_rate"], 0.5)
+        self.assertEqual(summary["error_rate"], 0.5)
+
+    def test_rate_limits_operations(self):
+        # arrange
+        generator = LoadGenerator(self.manager, {"list": 1}, concurrency=4, rate=50)
+
+        # act
+        report = generator.run(duration=0.2)
+
+        # assert
+        self.assertLessEqual(report.summary()["operations"], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
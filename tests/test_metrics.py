@@ -0,0 +1,75 @@
+import unittest
+from unittest.mock import Mock
+
+from torque.client import TorqueClient
+from torque.services.metrics import RequestMetrics, endpoint_template, percentile
+
+
+class TestEndpointTemplate(unittest.TestCase):
+    def test_sandbox_url(self):
+        url = "https://portal.qtorque.io/api/spaces/my_space/environments/abc123?x=1"
+
+        self.assertEqual(endpoint_template(url), "spaces/{space}/environments/{id}")
+
+    def test_catalog_url(self):
+        url = "https://portal.qtorque.io/api/spaces/my_space/catalog/my-bp"
+
+        self.assertEqual(endpoint_template(url), "spaces/{space}/catalog/{name}")
+
+    def test_collection_url(self):
+        url = "https://portal.qtorque.io/api/spaces/my_space/validations/blueprints"
+
+        self.assertEqual(endpoint_template(url), "spaces/{space}/validations/blueprints")
+
+
+class TestRequestMetrics(unittest.TestCase):
+    def test_percentile(self):
+        values = [float(i) for i in range(1, 101)]
+
+        self.assertEqual(percentile(values, 50), 50.0)
+        self.assertEqual(percentile(values, 95), 95.0)
+        self.assertEqual(percentile(values, 99), 99.0)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_records_are_grouped_by_endpoint_template(self):
+        # arrange
+        metrics = RequestMetrics()
+
+        # act
+        for i in range(10):
+            metrics.record("GET", f"https://host/api/spaces/s/environments/id{i}", 200, 0.01 * (i + 1), 100)
+        metrics.record("GET", "https://host/api/spaces/s/environments/id0", 404, 0.5, 10)
+        metrics.record_retry("GET", "https://host/api/spaces/s/environments/id0")
+
+        # assert
+        summary = metrics.summary()
+        self.assertEqual(len(summary), 1)
+        self.assertEqual(summary[0]["count"], 11)
+        self.assertEqual(summary[0]["status_codes"], {"200": 10, "404": 1})
+        self.assertEqual(summary[0]["retries"], 1)
+        self.assertEqual(summary[0]["bytes_received"], 1010)
+        self.assertEqual(summary[0]["p50_ms"], 60.0)
+        self.assertEqual(summary[0]["p99_ms"], 500.0)
+        self.assertEqual(sum(summary[0]["histogram"].values()), 11)
+        self.assertIn("spaces/{space}/environments/{id}", metrics.render())
+
+
+class TestClientMetrics(unittest.TestCase):
+    def test_request_is_recorded(self):
+        # arrange
+        session = Mock()
+        session.request.return_value = Mock(status_code=200, content=b"[]", request=Mock(body=None))
+        client = TorqueClient(space="space", token="token", session=session)
+
+        # act
+        client.request("spaces/space/environments", params={"count": 5})
+
+        # assert
+        summary = client.metrics.summary()
+        self.assertEqual(summary[0]["endpoint"], "spaces/{space}/environments")
+        self.assertEqual(summary[0]["bytes_received"], 2)
+        self.assertEqual(client.metrics.total_requests, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
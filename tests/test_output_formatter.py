@@ -0,0 +1,64 @@
+import io
+import json
+import unittest
+from unittest.mock import Mock
+
+from torque.parsers.global_input_parser import GlobalInputParser
+from torque.services.output_formatter import OutputFormatter
+
+
+class TestNdjsonOutput(unittest.TestCase):
+    def setUp(self) -> None:
+        self.formatter = OutputFormatter(GlobalInputParser({"--output": "ndjson"}))
+        self.stream = io.StringIO()
+
+    def test_one_compact_object_per_line(self):
+        # arrange
+        items = [Mock(json_serialize=Mock(return_value={"id": str(i), "name": f"sb{i}"})) for i in range(3)]
+
+        # act
+        self.formatter.write_ndjson(items, self.stream)
+
+        # assert
+        lines = self.stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[0], '{"id":"0","name":"sb0"}')
+
+    def test_items_are_flushed_as_they_arrive(self):
+        # arrange
+        written = []
+
+        def generate():
+            for i in range(2):
+                yield {"id": i}
+                written.append(self.stream.getvalue())
+
+        # act
+        self.formatter.write_ndjson(generate(), self.stream)
+
+        # assert
+        self.assertEqual(written, ['{"id":0}\n', '{"id":0}\n{"id":1}\n'])
+
+    def test_single_object_is_single_line(self):
+        self.formatter.write_ndjson({"status": "Active"}, self.stream)
+
+        self.assertEqual(json.loads(self.stream.getvalue()), {"status": "Active"})
+
+    def test_ndjson_is_machine_readable_output(self):
+        input_parser = GlobalInputParser({"--output": "ndjson"})
+
+        self.assertTrue(input_parser.output_json)
+        self.assertTrue(input_parser.output_ndjson)
+
+
+class TestTableOutput(unittest.TestCase):
+    def test_generator_is_rendered_as_table(self):
+        formatter = OutputFormatter(GlobalInputParser({}))
+
+        result = formatter.format_output(iter([{"name": "a"}, {"name": "b"}]))
+
+        self.assertEqual(result, "name\n------\na\nb")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import io
+import json
+import os
+import unittest
+from unittest import mock
+
+from docopt import DocoptExit
+
+from tests.helpers.fake_server import FakeTorqueServerTestCase
+from torque import shell
+from torque.parsers.global_input_parser import GlobalInputParser
+from torque.parsers.grammar import docopt
+from torque.services.profile_runner import SpaceRow
+from torque.testing.fake_api import ACTIVE
+
+CONFIG = """
+[dev]
+token = dev-token
+space = dev-space
+
+[prod]
+token = prod-token
+space = prod-space
+
+[incomplete]
+space = other-space
+"""
+
+
+class TestSpaceRow(unittest.TestCase):
+    def test_labels_serialized_item(self):
+        item = mock.Mock(json_serialize=mock.Mock(return_value={"id": "1"}), table_serialize=mock.Mock(return_value={}))
+
+        self.assertEqual(SpaceRow("dev", item).json_serialize(), {"space": "dev", "id": "1"})
+        self.assertEqual(SpaceRow("dev", "Valid").table_serialize(), {"space": "dev", "output": "Valid"})
+
+
+class TestRunCommandForProfiles(FakeTorqueServerTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.api.populate("dev-space", blueprints=1, sandboxes=0)
+        self.api.populate("prod-space", blueprints=1, sandboxes=0)
+        self.sandboxes = {
+            "dev-space": [self.api.add_sandbox("dev-space", "blueprint-000", status=ACTIVE) for _ in range(2)],
+            "prod-space": [self.api.add_sandbox("prod-space", "blueprint-000", status=ACTIVE)],
+        }
+
+        config_path = os.path.join(self.cache_dir.name, "config")
+        with open(config_path, "w") as config_file:
+            config_file.write(CONFIG)
+        self.patch_environ({"TORQUE_CONFIG_PATH": config_path})
+
+    def run_command(self, argv: list) -> (bool, str):
+        args = docopt(shell.__doc__, options_first=True, argv=["--disable-version-check"] + argv)
+        with mock.patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            result = shell.run_command(GlobalInputParser(args), "0.0.0")
+        return result, stdout.getvalue()
+
+    def test_all_profiles_outputs_are_merged(self):
+        # act
+        result, output = self.run_command(["--all-profiles", "sb", "list", "--filter=all", "--output=json"])
+
+        # assert
+        self.assertTrue(result)
+        rows = json.loads(output)
+        self.assertEqual([row["space"] for row in rows], ["dev-space", "dev-space", "prod-space"])
+        self.assertEqual(
+            {row["id"] for row in rows}, {sb.sandbox_id for sandboxes in self.sandboxes.values() for sb in sandboxes}
+        )
+
+    def test_listed_profiles_table_has_space_column(self):
+        # act
+        result, output = self.run_command(["--profiles=prod", "sb", "list", "--filter=all"])
+
+        # assert
+        self.assertTrue(result)
+        header, _, row = output.splitlines()
+        self.assertTrue(header.startswith("space"))
+        self.assertTrue(row.startswith("prod-space"))
+        self.assertIn(("GET", "/api/spaces/prod-space/environments"), self.api.requests)
+        self.assertFalse([path for _, path in self.api.requests if "dev-space" in path])
+
+    def test_failure_of_one_profile_fails_the_command(self):
+        # arrange
+        sandbox_id = self.sandboxes["dev-space"][0].sandbox_id
+
+        # act
+        result, output = self.run_command(["--profiles=dev,prod", "sb", "status", sandbox_id])
+
+        # assert
+        self.assertFalse(result)
+        self.assertIn("dev-space", output)
+        self.assertIn(ACTIVE, output)
+
+    def test_errors_are_logged_with_the_space(self):
+        # act
+        with self.assertLogs(level="ERROR") as logs:
+            result, _ = self.run_command(["--profiles=dev,prod", "sb", "status", "nonexist"])
+
+        # assert
+        self.assertFalse(result)
+        errors = [record.getMessage() for record in logs.records if "not found" in record.getMessage()]
+        self.assertEqual(len(errors), 2)
+        self.assertTrue(errors[0].startswith("[dev-space] "))
+        self.assertTrue(errors[1].startswith("[prod-space] "))
+
+    def test_streaming_action_is_rejected(self):
+        with self.assertRaises(DocoptExit):
+            self.run_command(["--all-profiles", "sb", "watch"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+from unittest.mock import Mock
+
+from docopt import DocoptExit
+
+from torque.exceptions import QueryError
+from torque.parsers.global_input_parser import GlobalInputParser
+from torque.sandboxes import Sandbox
+from torque.services.output_formatter import OutputFormatter
+from torque.services.projection import Query, flatten, parse_fields, project_fields
+
+
+def sandbox_json(sandbox_id: str, name: str, status: str) -> dict:
+    return {
+        "details": {
+            "id": sandbox_id,
+            "computed_status": status,
+            "definition": {"metadata": {"name": name, "blueprint_name": "web"}, "grains": [{"name": "vpc"}]},
+        }
+    }
+
+
+class TestFieldsProjection(unittest.TestCase):
+    def test_parse_fields(self):
+        self.assertEqual(parse_fields("a, b.c"), [["a"], ["b", "c"]])
+
+    def test_parse_fields_empty_path(self):
+        with self.assertRaises(QueryError):
+            parse_fields("a,,b")
+
+    def test_project_nested_paths(self):
+        json_obj = sandbox_json("id1", "sb1", "Active")
+
+        result = project_fields(json_obj, parse_fields("details.id,details.definition.metadata.name"))
+
+        self.assertEqual(result, {"details": {"id": "id1", "definition": {"metadata": {"name": "sb1"}}}})
+
+    def test_project_lists_element_wise(self):
+        json_obj = sandbox_json("id1", "sb1", "Active")
+
+        result = project_fields(json_obj, parse_fields("details.definition.grains.name"))
+
+        self.assertEqual(result, {"details": {"definition": {"grains": [{"name": "vpc"}]}}})
+
+    def test_flatten(self):
+        self.assertEqual(flatten({"a": {"b": 1, "c": {"d": 2}}, "e": 3}), {"a.b": 1, "a.c.d": 2, "e": 3})
+
+    def test_sandbox_keeps_only_projection(self):
+        sandbox = Sandbox.json_deserialize(Mock(), sandbox_json("id1", "sb1", "Active"), parse_fields("details.id"))
+
+        self.assertEqual(sandbox.json_serialize(), {"details": {"id": "id1"}})
+        self.assertEqual(sandbox.table_serialize(), {"details.id": "id1"})
+
+    def test_invalid_fields_argument(self):
+        with self.assertRaises(DocoptExit):
+            _ = GlobalInputParser({"--fields": "a..b"}).fields
+
+
+class TestQuery(unittest.TestCase):
+    def setUp(self) -> None:
+        self.document = [
+            {"id": "1", "name": "first", "status": "Active", "count": 1, "tags": ["a", "b"]},
+            {"id": "2", "name": "second", "status": "Ended", "count": 5, "tags": ["c"]},
+        ]
+
+    def test_sub_expression_and_index(self):
+        self.assertEqual(Query("[0].tags[-1]").search(self.document), "b")
+
+    def test_list_projection(self):
+        self.assertEqual(Query("[*].name").search(self.document), ["first", "second"])
+
+    def test_filter_projection(self):
+        self.assertEqual(Query("[?status=='Active'].id").search(self.document), ["1"])
+        self.assertEqual(Query("[?count > `2`].id").search(self.document), ["2"])
+
+    def test_bare_filter_keeps_truthy_items(self):
+        document = [
+            {"name": "a", "enabled": True, "tags": ["x"], "count": 0},
+            {"name": "b", "enabled": False, "tags": [], "count": None},
+            {"name": "c", "tags": ""},
+        ]
+
+        self.assertEqual(Query("[?enabled].name").search(document), ["a"])
+        self.assertEqual(Query("[?tags].name").search(document), ["a"])
+        self.assertEqual(Query("[?count].name").search(document), ["a"])
+
+    def test_pipe_stops_projection(self):
+        self.assertEqual(Query("[*].name | [0]").search(self.document), "first")
+
+    def test_multi_select(self):
+        self.assertEqual(Query("[*].{n: name, s: status}").search(self.document)[1], {"n": "second", "s": "Ended"})
+        self.assertEqual(Query("[0].[id, name]").search(self.document), ["1", "first"])
+
+    def test_missing_key_is_none(self):
+        self.assertIsNone(Query("[0].missing.key").search(self.document))
+
+    def test_invalid_expression(self):
+        for expression in ["[?status=='Active'", "a.", "a $ b"]:
+            with self.assertRaises(QueryError):
+                Query(expression)
+
+    def test_query_applied_to_output(self):
+        # arrange
+        formatter = OutputFormatter(GlobalInputParser({"--output": "json", "--query": "[?status=='Active'].name"}))
+        sandboxes = [Mock(json_serialize=Mock(return_value=item)) for item in self.document]
+
+        # act
+        result = formatter.query.search(formatter.to_json_data(sandboxes))
+
+        # assert
+        self.assertEqual(result, ["first"])
+
+
+if __name__ == "__main__":
+    unittest.main()
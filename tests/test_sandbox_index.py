@@ -0,0 +1,308 @@
+import tempfile
+import unittest
+from unittest import mock
+
+from docopt import DocoptExit
+
+from tests.helpers.fake_server import FakeTorqueServerTestCase
+from torque.client import TorqueClient
+from torque.commands.sb import SandboxesCommand
+from torque.models.connection import TorqueConnection
+from torque.sandboxes import Sandbox, SandboxesManager
+from torque.services.sandbox_index import SandboxIndex, looks_like_sandbox_id, parse_since
+from torque.testing.fake_api import ACTIVE
+
+
+def make_sandbox(sandbox_id: str, name: str, blueprint: str, status: str = "Active", start_time: float = None):
+    sb = Sandbox(None, sandbox_id, name, blueprint)
+    sb.sandbox_status = status
+    sb.start_time = start_time
+    return sb
+
+
+class TestParseSince(unittest.TestCase):
+    def test_relative_time(self):
+        self.assertEqual(parse_since("30m", now=10000), 10000 - 1800)
+        self.assertEqual(parse_since("2d", now=200000), 200000 - 2 * 86400)
+
+    def test_iso_time(self):
+        self.assertEqual(parse_since("2021-05-01T10:00:00+00:00"), 1619863200)
+        self.assertEqual(parse_since("2021-05-01T10:00:00Z"), 1619863200)
+
+    def test_invalid_time(self):
+        with self.assertRaises(ValueError):
+            parse_since("yesterday")
+
+
+class TestSandboxIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.index = SandboxIndex("space", self.cache_dir.name)
+
+    def tearDown(self) -> None:
+        self.index.close()
+        self.cache_dir.cleanup()
+
+    def test_list_newest_first_without_ended(self):
+        # arrange
+        self.index.upsert(
+            [
+                make_sandbox("a1", "first", "web", start_time=100),
+                make_sandbox("b2", "second", "web", start_time=200),
+                make_sandbox("c3", "ended", "db", status="Ended", start_time=300),
+            ]
+        )
+
+        # act
+        rows = self.index.list()
+
+        # assert
+        self.assertEqual([row[0] for row in rows], ["b2", "a1"])
+        self.assertEqual(len(self.index.list(show_ended=True)), 3)
+
+    def test_upsert_updates_status_and_keeps_mine(self):
+        # arrange
+        self.index.upsert([make_sandbox("a1", "first", "web", status="Launching")], mine=True)
+
+        # act
+        self.index.upsert([make_sandbox("a1", "first", "web", status="Active")], mine=False)
+
+        # assert
+        rows = self.index.list(list_filter="my")
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0][3], "Active")
+
+    def test_set_status(self):
+        self.index.upsert([make_sandbox("a1", "first", "web")])
+
+        self.index.set_status("a1", "Ended")
+
+        self.assertEqual(self.index.list(), [])
+
+    def test_spaces_are_separated(self):
+        self.index.upsert([make_sandbox("a1", "first", "web")])
+
+        other = SandboxIndex("other", self.cache_dir.name)
+        self.addCleanup(other.close)
+
+        self.assertEqual(other.list(), [])
+
+    def test_search_matches_id_name_and_blueprint(self):
+        # arrange
+        self.index.upsert(
+            [
+                make_sandbox("abc123", "feature-login", "web", start_time=100),
+                make_sandbox("def456", "nightly", "database", start_time=200),
+                make_sandbox("ghi789", "100%_done", "web", start_time=300),
+            ]
+        )
+
+        # act & assert
+        self.assertEqual([row[0] for row in self.index.search("LOGIN")], ["abc123"])
+        self.assertEqual([row[0] for row in self.index.search("data")], ["def456"])
+        self.assertEqual([row[0] for row in self.index.search("WEB")], ["ghi789", "abc123"])
+        self.assertEqual([row[0] for row in self.index.search("%_")], ["ghi789"])
+
+    def test_since(self):
+        self.index.upsert(
+            [make_sandbox("old", "old", "web", start_time=100), make_sandbox("new", "new", "web", start_time=200)]
+        )
+
+        rows = self.index.list(since=150)
+
+        self.assertEqual([row[0] for row in rows], ["new"])
+
+    def test_to_sandboxes(self):
+        self.index.upsert([make_sandbox("a1", "first", "web", start_time="2021-05-01T10:00:00+00:00")])
+
+        sandboxes = self.index.to_sandboxes(None, self.index.list())
+
+        self.assertEqual(sandboxes[0].sandbox_id, "a1")
+        self.assertEqual(sandboxes[0].blueprint_name, "web")
+        self.assertEqual(sandboxes[0].start_time, "2021-05-01T10:00:00+00:00")
+
+    def test_resolve(self):
+        # arrange
+        self.index.upsert(
+            [
+                make_sandbox("abc123", "web-dev", "web", start_time=100),
+                make_sandbox("abd456", "web-dev", "web", status="Ended", start_time=50),
+                make_sandbox("xyz789", "nightly", "db", start_time=200),
+                make_sandbox("xyz", "short", "db", start_time=300),
+            ]
+        )
+
+        # act & assert
+        self.assertEqual([row[0] for row in self.index.resolve("xyz")], ["xyz"])
+        self.assertEqual([row[0] for row in self.index.resolve("abc")], ["abc123"])
+        self.assertEqual([row[0] for row in self.index.resolve("web-dev")], ["abc123"])
+        self.assertEqual([row[0] for row in self.index.resolve("ab")], ["abc123", "abd456"])
+        self.assertEqual(self.index.resolve("missing"), [])
+
+    def test_looks_like_sandbox_id(self):
+        self.assertTrue(looks_like_sandbox_id("0123456789ab"))
+        self.assertFalse(looks_like_sandbox_id("3f2a"))
+        self.assertFalse(looks_like_sandbox_id("feature-login"))
+
+    def test_stale_until_refreshed(self):
+        self.assertTrue(self.index.is_stale())
+
+        self.index._mark_refreshed()
+
+        self.assertFalse(self.index.is_stale())
+
+
+class TestSandboxIndexWithApi(FakeTorqueServerTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.api.populate("demo", blueprints=2, sandboxes=30)
+
+    def run_sb(self, args: str) -> SandboxesCommand:
+        return SandboxesCommand(command_args=args.split(), connection=TorqueConnection("demo", "token", None))
+
+    def test_refresh_pages_through_sandboxes(self):
+        # arrange
+        index = SandboxIndex("demo", self.cache_dir.name)
+        self.addCleanup(index.close)
+        manager = SandboxesManager(TorqueClient(space="demo", token="token"))
+
+        # act
+        total = index.refresh(manager)
+
+        # assert
+        self.assertGreaterEqual(total, 30)
+        self.assertEqual(len(index.list(show_ended=True, count=100)), 30)
+        self.assertIsNotNone(index.refreshed_at)
+
+    def test_cached_list_does_not_query_api_when_fresh(self):
+        # arrange
+        self.run_sb("sb list --cached").execute()
+        requests_before = len(self.api.requests)
+
+        # act
+        success, sandboxes = self.run_sb("sb list --cached --filter=all --count=5").do_list()
+
+        # assert
+        self.assertTrue(success)
+        self.assertEqual(len(sandboxes), 5)
+        self.assertEqual(len(self.api.requests), requests_before)
+
+    def test_search_after_list(self):
+        # arrange
+        success, sandboxes = self.run_sb("sb list --filter=all --show-ended").do_list()
+        name = sandboxes[0].name
+        requests_before = len(self.api.requests)
+
+        # act
+        with mock.patch.object(SandboxIndex, "refresh_in_background") as refresh:
+            success, found = self.run_sb(f"sb search {name} --show-ended").do_search()
+
+        # assert
+        self.assertTrue(success)
+        self.assertIn(sandboxes[0].sandbox_id, [sb.sandbox_id for sb in found])
+        self.assertEqual(len(self.api.requests), requests_before)
+        refresh.assert_called_once()
+
+    def test_end_updates_index(self):
+        # arrange
+        success, sandboxes = self.run_sb("sb list --filter=all").do_list()
+        sandbox_id = sandboxes[0].sandbox_id
+
+        # act
+        self.run_sb(f"sb end {sandbox_id}").do_end()
+
+        # assert
+        index = SandboxIndex("demo", self.cache_dir.name)
+        self.addCleanup(index.close)
+        self.assertEqual([row[3] for row in index.search(sandbox_id)], ["Terminating"])
+
+    def test_get_by_id_prefix_and_name(self):
+        # arrange
+        success, sandboxes = self.run_sb("sb list --filter=all").do_list()
+        sandbox = sandboxes[0]
+        requests_before = len(self.api.requests)
+
+        # act
+        by_prefix = self.run_sb(f"sb get {sandbox.sandbox_id[:6]}").do_get()
+        by_name = self.run_sb(f"sb status {sandbox.name}").do_status()
+
+        # assert
+        self.assertEqual(by_prefix[1].sandbox_id, sandbox.sandbox_id)
+        self.assertTrue(by_name[0])
+        # only the two gets, the references are resolved locally
+        self.assertEqual(len(self.api.requests), requests_before + 2)
+
+    def test_unknown_reference_is_resolved_with_one_list_query(self):
+        # arrange
+        sandbox_id = next(iter(self.api.sandboxes["demo"]))
+
+        # act
+        success, sandbox = self.run_sb(f"sb get {sandbox_id[:8]}").do_get()
+
+        # assert
+        self.assertTrue(success)
+        self.assertEqual(sandbox.sandbox_id, sandbox_id)
+        self.assertEqual(len(self.api.requests), 2)
+
+    def test_unknown_whole_id_is_requested_directly(self):
+        # arrange
+        sandbox_id = next(iter(self.api.sandboxes["demo"]))
+
+        # act
+        success, sandbox = self.run_sb(f"sb get {sandbox_id}").do_get()
+
+        # assert
+        self.assertTrue(success)
+        self.assertEqual(sandbox.sandbox_id, sandbox_id)
+        self.assertFalse([path for _, path in self.api.requests if path.endswith("/environments")])
+
+    def test_name_of_a_sandbox_gone_meanwhile_is_resolved_again(self):
+        # arrange
+        index = SandboxIndex("demo", self.cache_dir.name)
+        self.addCleanup(index.close)
+        index.upsert([make_sandbox("0123456789ab", "web", "blueprint-000")])
+        with index._connection:
+            index._connection.execute("UPDATE sandboxes SET updated_at = 0")
+        sandbox = self.api.add_sandbox("demo", "blueprint-000", name="web", status=ACTIVE)
+
+        # act
+        success, status = self.run_sb("sb status web").do_status()
+
+        # assert
+        self.assertTrue(success)
+        self.assertEqual(status, ACTIVE)
+        self.assertEqual([row[0] for row in index.resolve("web")], [sandbox.sandbox_id])
+
+    def test_recently_seen_name_is_not_checked(self):
+        # arrange
+        success, sandboxes = self.run_sb("sb list --filter=all").do_list()
+        requests_before = len(self.api.requests)
+
+        # act
+        self.run_sb(f"sb status {sandboxes[0].name}").do_status()
+
+        # assert
+        self.assertEqual(len(self.api.requests), requests_before + 1)
+
+    def test_ambiguous_reference(self):
+        # arrange
+        index = SandboxIndex("demo", self.cache_dir.name)
+        self.addCleanup(index.close)
+        index.upsert([make_sandbox("abc123", "one", "web"), make_sandbox("abc456", "two", "web")])
+
+        # act
+        with mock.patch.object(SandboxesCommand, "die", return_value=(False, None)) as die:
+            success, _ = self.run_sb("sb end abc").do_end()
+
+        # assert
+        self.assertFalse(success)
+        die.assert_called_once()
+        self.assertEqual(len(self.api.requests), 0)
+
+    def test_cached_auto_filter_is_not_supported(self):
+        with self.assertRaises(DocoptExit):
+            self.run_sb("sb list --cached --filter=auto").do_list()
+
+    def test_invalid_since(self):
+        with self.assertRaises(DocoptExit):
+            self.run_sb("sb list --since=yesterday").do_list()
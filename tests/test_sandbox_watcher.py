@@ -0,0 +1,179 @@
+import io
+import json
+import unittest
+from unittest import mock
+
+from tests.helpers.fake_server import FakeTorqueServerTestCase
+from torque.client import TorqueClient
+from torque.commands.sb import SandboxesCommand
+from torque.models.connection import TorqueConnection
+from torque.sandboxes import SandboxesManager
+from torque.services.sandbox_watcher import ADDED, CHANGED, REMOVED, WATCH_LIST_COUNT, SandboxWatcher
+from torque.testing import FakeTorqueApi
+from torque.testing.fake_api import ACTIVE, ENDED, LAUNCHING, TERMINATING
+from torque.view.sandbox_watch_view import LiveTableView, TransitionsView
+
+
+class TestSandboxWatcher(FakeTorqueServerTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.api.populate("demo", blueprints=2, sandboxes=0)
+        self.manager = SandboxesManager(TorqueClient(space="demo", token="token"))
+        self.sandboxes = [self.api.add_sandbox("demo", "blueprint-000", status=ACTIVE) for _ in range(3)]
+
+    def create_api(self) -> FakeTorqueApi:
+        return FakeTorqueApi(seed=0, end_time=60)
+
+    def list_requests(self) -> int:
+        return len([path for _, path in self.api.requests if path.endswith("/environments")])
+
+    def test_first_poll_reports_all_sandboxes(self):
+        # act
+        events = SandboxWatcher(self.manager, list_filter="all").poll()
+
+        # assert
+        self.assertEqual([event.event for event in events], [ADDED] * 3)
+        self.assertEqual({event.sandbox_id for event in events}, {sb.sandbox_id for sb in self.sandboxes})
+        self.assertEqual(self.list_requests(), 1)
+
+    def test_only_changes_are_reported(self):
+        # arrange
+        watcher = SandboxWatcher(self.manager, list_filter="all")
+        watcher.poll()
+        self.manager.end(self.sandboxes[0].sandbox_id)
+
+        # act
+        events = watcher.poll()
+
+        # assert
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].event, CHANGED)
+        self.assertEqual((events[0].previous_status, events[0].status), (ACTIVE, TERMINATING))
+
+    def test_sandbox_no_longer_listed_is_removed(self):
+        # arrange
+        watcher = SandboxWatcher(self.manager, list_filter="all", statuses=[ACTIVE])
+        watcher.poll()
+        self.manager.end(self.sandboxes[1].sandbox_id)
+
+        # act
+        events = watcher.poll()
+
+        # assert
+        self.assertEqual(
+            [(event.event, event.sandbox_id) for event in events], [(REMOVED, self.sandboxes[1].sandbox_id)]
+        )
+
+    def test_watched_ids_are_polled_with_one_request(self):
+        # arrange
+        watched = [self.sandboxes[2].sandbox_id, self.sandboxes[0].sandbox_id]
+        watcher = SandboxWatcher(self.manager, watched)
+
+        # act
+        events = watcher.poll() + watcher.poll()
+
+        # assert
+        self.assertEqual([event.sandbox_id for event in events], watched)
+        self.assertEqual(len(self.api.requests), 2)
+
+    def test_watched_id_not_listed_is_requested(self):
+        # arrange
+        old = self.api.add_sandbox("demo", "blueprint-001", status=ENDED)
+        old.created_at -= 3600
+        recent = [self.api.add_sandbox("demo", "blueprint-000", status=ACTIVE) for _ in range(WATCH_LIST_COUNT)]
+        watcher = SandboxWatcher(self.manager, [recent[-1].sandbox_id, old.sandbox_id])
+
+        # act
+        events = watcher.poll()
+
+        # assert
+        self.assertEqual([event.status for event in events], [ACTIVE, ENDED])
+        self.assertEqual(self.list_requests(), 1)
+        self.assertEqual(len(self.api.requests), 2)
+        self.assertIn(("GET", f"/api/spaces/demo/environments/{old.sandbox_id}"), self.api.requests)
+
+    def test_follow_ends_when_watched_sandboxes_are_settled(self):
+        # arrange
+        self.api.launch_time = 60
+        launching = self.api.add_sandbox("demo", "blueprint-000")
+        watcher = SandboxWatcher(
+            self.manager, [launching.sandbox_id], sleep=lambda _: setattr(launching, "created_at", 0)
+        )
+
+        # act
+        first = watcher.poll()
+        events = list(watcher.follow(interval=5))
+
+        # assert
+        self.assertEqual(first[0].status, LAUNCHING)
+        self.assertEqual([(event.previous_status, event.status) for event in events], [(LAUNCHING, ACTIVE)])
+        self.assertTrue(watcher.settled)
+
+
+class TestSandboxWatchViews(FakeTorqueServerTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.api.populate("demo", blueprints=1, sandboxes=0)
+        self.sandbox = self.api.add_sandbox("demo", "blueprint-000", name="web", status=ACTIVE)
+        manager = SandboxesManager(TorqueClient(space="demo", token="token"))
+        self.watcher = SandboxWatcher(manager, list_filter="all", show_ended=True)
+
+    def events(self):
+        events = self.watcher.poll()
+        self.sandbox.ended_at = self.sandbox.created_at
+        return events + self.watcher.poll()
+
+    def test_transitions(self):
+        stream = io.StringIO()
+        view = TransitionsView(stream)
+
+        for event in self.events():
+            view.show(event)
+
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].endswith(f"{self.sandbox.sandbox_id}  web  Active"))
+        self.assertTrue(lines[1].endswith(f"{self.sandbox.sandbox_id}  web  Active -> Ended"))
+
+    def test_live_table_rewrites_changed_row(self):
+        stream = io.StringIO()
+        view = LiveTableView(stream)
+
+        for event in self.events():
+            view.show(event)
+
+        header, separator, row, update = stream.getvalue().split("\n")
+        self.assertTrue(header.startswith("id"))
+        self.assertIn("Active", row)
+        self.assertTrue(update.startswith("\x1b[1A\r\x1b[2K"))
+        self.assertIn("Ended", update)
+
+
+class TestSandboxWatchCommand(FakeTorqueServerTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.api.populate("demo", blueprints=1, sandboxes=0)
+        self.sandbox = self.api.add_sandbox("demo", "blueprint-000", status=ACTIVE)
+
+    def test_watch_ids_as_ndjson(self):
+        # arrange
+        command = SandboxesCommand(
+            command_args=["sb", "watch", self.sandbox.sandbox_id[:6], "--output=ndjson"],
+            connection=TorqueConnection("demo", "token", None),
+        )
+
+        # act
+        with mock.patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            result = command.do_watch()
+
+        # assert
+        self.assertEqual(result, (True, None))
+        events = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["id"], self.sandbox.sandbox_id)
+        self.assertEqual(events[0]["event"], ADDED)
+        self.assertEqual(events[0]["status"], ACTIVE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,8 @@
 import unittest
+from unittest.mock import Mock
 
 from torque.client import TorqueClient
-from torque.sandboxes import SandboxesManager
+from torque.sandboxes import Sandbox, SandboxesManager
 
 
 class TestSandboxes(unittest.TestCase):
@@ -22,5 +23,160 @@ class TestSandboxes(unittest.TestCase):
         )
 
 
+class TestSandboxesPaging(unittest.TestCase):
+    def setUp(self) -> None:
+        self.sandboxes = SandboxesManager(TorqueClient(space="my_space"))
+        self.sandboxes.resource_obj = Mock()
+
+    def test_pages_until_count_reached(self):
+        # arrange
+        self.sandboxes._list = Mock(side_effect=lambda path, filter_params: [{}] * filter_params["count"])
+
+        # act
+        pages = list(self.sandboxes.list_pages(count=60, page_size=25))
+
+        # assert
+        self.assertEqual([len(page) for page in pages], [25, 25, 10])
+        skips = [call.kwargs["filter_params"]["skip"] for call in self.sandboxes._list.call_args_list]
+        self.assertEqual(skips, [0, 25, 50])
+
+    def test_stops_on_short_page(self):
+        # arrange
+        self.sandboxes._list = Mock(return_value=[{}] * 3)
+
+        # act
+        pages = list(self.sandboxes.list_pages(count=60, page_size=25))
+
+        # assert
+        self.assertEqual(len(pages), 1)
+        self.sandboxes._list.assert_called_once()
+
+    def test_pages_are_requested_lazily(self):
+        self.sandboxes._list = Mock(return_value=[{}] * 25)
+
+        pages = self.sandboxes.list_pages(count=100, page_size=25)
+        next(pages)
+
+        self.sandboxes._list.assert_called_once()
+
+
+def sandbox_json(index: int, status: str) -> dict:
+    return {
+        "details": {
+            "id": f"id{index}",
+            "computed_status": status,
+            "definition": {"metadata": {"name": f"sb{index}", "blueprint_name": "web"}},
+        }
+    }
+
+
+class TestSandboxesStatusFilter(unittest.TestCase):
+    def setUp(self) -> None:
+        self.sandboxes = SandboxesManager(TorqueClient(space="my_space"))
+        # every second sandbox is ended and the server ignores status filters
+        documents = [sandbox_json(i, "Ended" if i % 2 else "Active") for i in range(100)]
+        self.sandboxes._list = Mock(
+            side_effect=lambda path, filter_params: documents[
+                filter_params["skip"] : filter_params["skip"] + filter_params["count"]
+            ]
+        )
+
+    def test_filters_are_sent_to_server(self):
+        list(self.sandboxes.list_pages(count=10, show_ended=False))
+        list(self.sandboxes.list_pages(count=10, statuses=["Active", "Launching"]))
+
+        params = [call.kwargs["filter_params"] for call in self.sandboxes._list.call_args_list]
+        self.assertEqual(params[0]["show_ended"], "false")
+        self.assertEqual(params[-1]["status"], "Active,Launching")
+        self.assertNotIn("show_ended", params[-1])
+
+    def test_pages_until_count_matching_sandboxes(self):
+        # act
+        pages = list(self.sandboxes.list_pages(count=25, page_size=25, show_ended=False))
+
+        # assert
+        sandboxes = [sb for page in pages for sb in page]
+        self.assertEqual(len(sandboxes), 25)
+        self.assertTrue(all(sb.sandbox_status == "Active" for sb in sandboxes))
+        skips = [call.kwargs["filter_params"]["skip"] for call in self.sandboxes._list.call_args_list]
+        self.assertEqual(skips, [0, 25, 37, 43, 46, 48])
+
+    def test_status_filter_is_case_insensitive(self):
+        pages = list(self.sandboxes.list_pages(count=5, statuses=["ended"]))
+
+        self.assertEqual([sb.sandbox_id for page in pages for sb in page], ["id1", "id3", "id5", "id7", "id9"])
+
+    def test_stops_when_no_more_sandboxes(self):
+        pages = list(self.sandboxes.list_pages(count=25, statuses=["Launching"]))
+
+        self.assertEqual(sum(len(page) for page in pages), 0)
+
+
+class TestSandboxModel(unittest.TestCase):
+    def setUp(self) -> None:
+        self.sandbox_json = {
+            "details": {
+                "id": "id1",
+                "computed_status": "Active",
+                "definition": {"metadata": {"name": "sb1", "blueprint_name": "web", "owner_email": "me@example.com"}},
+            }
+        }
+
+    def test_attributes_are_read_from_document(self):
+        sandbox = Sandbox.json_deserialize(Mock(), self.sandbox_json)
+
+        self.assertEqual(
+            (sandbox.sandbox_id, sandbox.name, sandbox.blueprint_name, sandbox.sandbox_status, sandbox.owner),
+            ("id1", "sb1", "web", "Active", "me@example.com"),
+        )
+        self.assertIsNone(sandbox.start_time)
+
+    def test_document_is_kept_for_detailed_output(self):
+        sandbox = Sandbox.json_deserialize(Mock(), self.sandbox_json)
+
+        self.assertIs(sandbox.detail_serialize(), self.sandbox_json)
+        self.assertEqual(sandbox.json_serialize(), {"id": "id1", "name": "sb1", "blueprint_name": "web"})
+
+    def test_only_requested_fields_and_attributes_are_kept(self):
+        # arrange
+        self.sandbox_json["details"]["logs"] = "x" * 1024
+        self.sandbox_json["details"]["definition"]["inputs"] = [{"name": "size", "value": "large"}]
+
+        # act
+        sandbox = Sandbox.json_deserialize(Mock(), self.sandbox_json, fields=[["details", "id"]])
+
+        # assert
+        self.assertNotIn("logs", sandbox.raw["details"])
+        self.assertNotIn("inputs", sandbox.raw["details"]["definition"])
+        self.assertEqual((sandbox.name, sandbox.sandbox_status, sandbox.owner), ("sb1", "Active", "me@example.com"))
+        self.assertEqual(sandbox.json_serialize(), {"details": {"id": "id1"}})
+        self.assertEqual(sandbox.table_serialize(), {"details.id": "id1"})
+
+    def test_slotted(self):
+        sandbox = Sandbox(Mock(), "id1", "sb1", "web")
+
+        self.assertFalse(hasattr(sandbox, "__dict__"))
+        with self.assertRaises(AttributeError):
+            sandbox.unknown = 1
+
+    def test_attributes_can_be_set(self):
+        # arrange
+        sandbox = Sandbox(Mock(), "id1", "sb1", "web")
+
+        # act
+        sandbox.sandbox_status = "Launching"
+        sandbox.start_time = "2021-05-01T10:00:00+00:00"
+
+        # assert
+        self.assertEqual(sandbox.sandbox_status, "Launching")
+        self.assertEqual(sandbox.raw["details"]["definition"]["metadata"]["start_time"], "2021-05-01T10:00:00+00:00")
+
+    def test_incomplete_document(self):
+        del self.sandbox_json["details"]["computed_status"]
+
+        with self.assertRaises(NotImplementedError):
+            Sandbox.json_deserialize(Mock(), self.sandbox_json)
+
+
 if __name__ == "__main__":
     unittest.main()
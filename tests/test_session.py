@@ -0,0 +1,140 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from tests.helpers.fake_server import FakeTorqueServerTestCase
+from torque.client import TorqueClient
+from torque.sandboxes import SandboxesManager
+from torque.session import SessionRegistry, TorqueSession
+
+
+class TestSessionRegistry(unittest.TestCase):
+    def setUp(self) -> None:
+        self.registry = SessionRegistry()
+
+    def tearDown(self) -> None:
+        self.registry.close()
+
+    def test_session_per_host_and_profile(self):
+        # act
+        first = self.registry.get("https://a/api/", "dev")
+        same = self.registry.get("https://a/api/", "dev")
+        other_profile = self.registry.get("https://a/api/", "prod")
+        other_host = self.registry.get("https://b/api/", "dev")
+
+        # assert
+        self.assertIs(first, same)
+        self.assertIsNot(first, other_profile)
+        self.assertIsNot(first, other_host)
+        self.assertIsNot(first.get_adapter("https://a"), other_profile.get_adapter("https://a"))
+        self.assertEqual(len(self.registry), 3)
+
+    def test_close_by_profile(self):
+        # arrange
+        dev = self.registry.get("https://a/api/", "dev")
+        prod = self.registry.get("https://a/api/", "prod")
+
+        # act
+        self.registry.close(profile="dev")
+
+        # assert
+        self.assertTrue(dev.closed)
+        self.assertFalse(prod.closed)
+        self.assertIsNot(self.registry.get("https://a/api/", "dev"), dev)
+
+    def test_context_manager_closes_all(self):
+        with SessionRegistry() as registry:
+            session = registry.get("https://a/api/", "dev")
+
+        self.assertTrue(session.closed)
+        self.assertEqual(len(registry), 0)
+
+
+class TestClientSessions(unittest.TestCase):
+    def setUp(self) -> None:
+        self.registry = SessionRegistry()
+
+    def tearDown(self) -> None:
+        self.registry.close()
+
+    def test_clients_without_profile_do_not_share_sessions(self):
+        first = TorqueClient(space="a", token="token-a")
+        second = TorqueClient(space="b", token="token-b")
+
+        self.assertIsNot(first.session, second.session)
+        self.assertEqual(first.session.headers["Authorization"], "Bearer token-a")
+        self.assertEqual(second.session.headers["Authorization"], "Bearer token-b")
+
+    def test_clients_of_profile_share_session(self):
+        first = TorqueClient(space="a", token="token", profile="dev", registry=self.registry)
+        second = TorqueClient(space="a", token="token", profile="dev", registry=self.registry)
+
+        self.assertIs(first.session, second.session)
+
+    def test_close_keeps_registry_session_open(self):
+        # arrange
+        shared = TorqueClient(space="a", token="token", profile="dev", registry=self.registry)
+        own = TorqueClient(space="a", token="token")
+
+        # act
+        shared.close()
+        with own:
+            pass
+
+        # assert
+        self.assertFalse(shared.session.closed)
+        self.assertTrue(own.session.closed)
+
+    def test_provided_session_is_not_closed(self):
+        session = TorqueSession()
+
+        TorqueClient(space="a", token="token", session=session).close()
+
+        self.assertFalse(session.closed)
+
+
+class TestConcurrentClients(FakeTorqueServerTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.registry = SessionRegistry()
+        self.seen = []
+        handle = self.api.handle
+
+        def recording_handle(method, url, body, headers):
+            self.seen.append((url.split("/")[3], headers.get("authorization")))
+            return handle(method, url, body, headers)
+
+        self.api.handle = recording_handle
+
+    def tearDown(self) -> None:
+        self.registry.close()
+
+    def test_many_concurrent_clients_keep_their_credentials(self):
+        # arrange
+        def work(index: int) -> int:
+            profile = f"profile{index % 8}"
+            client = TorqueClient(
+                torque_host=self.server.hostname,
+                space=f"space{index % 8}",
+                token=f"token-{profile}",
+                profile=profile,
+                registry=self.registry,
+            )
+            manager = SandboxesManager(client)
+            for _ in range(5):
+                manager.list(filter_opt="all")
+            client.close()
+            return client.metrics.total_requests
+
+        # act
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            totals = list(executor.map(work, range(32)))
+
+        # assert
+        self.assertEqual(sum(totals), 160)
+        self.assertEqual(len(self.registry), 8)
+        for space, authorization in self.seen:
+            self.assertEqual(authorization, f"Bearer token-profile{space[len('space'):]}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,8 +11,10 @@ from torque.shell import BootstrapHelper
 class MainShellTest(unittest.TestCase):
     def setUp(self) -> None:
         self.main_doc = shell.__doc__
-        self.base_usage = """Usage: torque [--space=<space>] [--token=<token>] [--account=<account>] [--profile=<profile>] [--help] [--debug]
-               [--disable-version-check] <command> [<args>...]"""
+        self.base_usage = """Usage: torque [--space=<space>] [--token=<token>] [--account=<account>]
+               [--profile=<profile> | --profiles=<profiles> | --all-profiles] [--help] [--debug]
+               [--disable-version-check] [--trace] [--trace-file=<file>] [--stats]
+               [--record=<file> | --replay=<file> [--replay-speed=<x>]] <command> [<args>...]"""
 
     def test_show_base_usage_line(self):
         with self.assertRaises(DocoptExit) as ctx:
@@ -32,6 +34,13 @@ class MainShellTest(unittest.TestCase):
         input_parser = GlobalInputParser(args)
         self.assertTrue(shell.BootstrapHelper.is_help_message_requested(input_parser))
 
+    def test_local_bench_does_not_need_connection(self):
+        user_input = ["bench", "--local", "--requests=10"]
+        args = docopt(doc=self.main_doc, options_first=True, argv=user_input)
+        input_parser = GlobalInputParser(args)
+        self.assertTrue(shell.BootstrapHelper.is_local_bench_mode(input_parser))
+        self.assertFalse(shell.BootstrapHelper.should_get_connection_params(input_parser))
+
     def test_help_not_needed_with_command(self):
         user_input = ["sb", "start", "some_blueprint"]
         args = docopt(doc=self.main_doc, options_first=True, argv=user_input)
@@ -0,0 +1,77 @@
+import os
+import unittest
+from unittest.mock import patch
+
+import tabulate
+
+from torque.view.table_renderer import TableRenderer
+
+
+class TestTableRenderer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.rows = [
+            {"id": "a1b2", "name": "first-sandbox", "blueprint_name": "web", "count": 5, "enabled": True},
+            {"id": "c3d4", "name": "second", "blueprint_name": None, "count": 123, "enabled": False},
+        ]
+
+    def test_same_layout_as_tabulate(self):
+        expected = tabulate.tabulate(self.rows, headers="keys")
+
+        result = TableRenderer(fit_terminal=False).render(self.rows)
+
+        self.assertEqual(result, expected)
+
+    def test_columns_of_rows_with_different_keys(self):
+        rows = [{"details.id": "a1"}, {"details.id": "b2", "details.computed_status": "Active"}, {"name": "third"}]
+        expected = tabulate.tabulate(rows, headers="keys")
+
+        result = TableRenderer(fit_terminal=False).render(rows)
+
+        self.assertEqual(result, expected)
+        self.assertEqual(result.splitlines()[0].split(), ["details.id", "details.computed_status", "name"])
+
+    def test_stream_columns_are_taken_from_first_page(self):
+        rows = iter([{"id": "a1"}, {"id": "b2", "status": "Active"}, {"id": "c3", "name": "third"}])
+
+        lines = list(TableRenderer(fit_terminal=False).render_lines(rows, page_size=2))
+
+        self.assertEqual(lines[0].split(), ["id", "status"])
+        self.assertEqual(lines[-1], "c3")
+
+    def test_render_empty(self):
+        self.assertEqual(TableRenderer(fit_terminal=False).render([]), "")
+
+    def test_uses_table_serialize(self):
+        class Item:
+            def table_serialize(self):
+                return {"name": "item"}
+
+        result = TableRenderer(fit_terminal=False).render([Item()])
+
+        self.assertEqual(result, "name\n------\nitem")
+
+    def test_long_cells_are_truncated(self):
+        rows = [{"name": "x" * 50}]
+
+        result = TableRenderer(max_cell_width=10, fit_terminal=False).render(rows)
+
+        self.assertEqual(result.splitlines()[2], "xxxxxxx...")
+
+    def test_stream_widths_are_fixed_from_first_page(self):
+        rows = iter([{"name": "short"}, {"name": "much-longer-name"}])
+
+        lines = list(TableRenderer(fit_terminal=False).render_lines(rows, page_size=1))
+
+        self.assertEqual(lines, ["name", "------", "short", "muc..."])
+
+    @patch("torque.view.table_renderer.shutil.get_terminal_size", return_value=os.terminal_size((30, 24)))
+    def test_fit_terminal_width(self, get_terminal_size):
+        rows = [{"id": "1", "description": "d" * 60}]
+
+        result = TableRenderer(fit_terminal=True).render(rows)
+
+        self.assertTrue(all(len(line) <= 30 for line in result.splitlines()))
+
+
+if __name__ == "__main__":
+    unittest.main()
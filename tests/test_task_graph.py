@@ -0,0 +1,74 @@
+import threading
+import time
+import unittest
+
+from torque.services.task_graph import TaskGraph
+
+
+class TestTaskGraph(unittest.TestCase):
+    def test_task_runs_after_its_dependencies(self):
+        # arrange
+        done = []
+
+        def task(name: str):
+            def run():
+                time.sleep(0.02)
+                done.append(name)
+                return name
+
+            return run
+
+        # act
+        with TaskGraph("test") as graph:
+            graph.add("first", task("first"))
+            graph.add("second", task("second"))
+            graph.add("last", task("last"), after=["first", "second"])
+            result = graph.result("last")
+
+        # assert
+        self.assertEqual(result, "last")
+        self.assertEqual(done[-1], "last")
+
+    def test_independent_tasks_overlap(self):
+        # arrange
+        barrier = threading.Barrier(2, timeout=5)
+
+        # act
+        with TaskGraph("test") as graph:
+            graph.add("first", barrier.wait)
+            graph.add("second", barrier.wait)
+
+            # assert
+            self.assertEqual({graph.result("first"), graph.result("second")}, {0, 1})
+
+    def test_failure_is_raised_by_dependent_tasks(self):
+        # arrange
+        run = []
+
+        def fail():
+            raise ValueError("failed")
+
+        # act
+        with TaskGraph("test") as graph:
+            graph.add("failing", fail)
+            graph.add("dependent", lambda: run.append("dependent"), after=["failing"])
+
+            # assert
+            with self.assertRaisesRegex(ValueError, "failed"):
+                graph.result("dependent")
+        self.assertEqual(run, [])
+
+    def test_breakdown_reports_saved_time(self):
+        with TaskGraph("test") as graph:
+            graph.add("first", lambda: time.sleep(0.05))
+            graph.add("second", lambda: time.sleep(0.05))
+
+        breakdown = graph.breakdown()
+
+        self.assertRegex(breakdown.splitlines()[0], r"^test: \d+\.\d ms of work done in \d+\.\d ms, \d+\.\d ms saved$")
+        self.assertIn("first", breakdown)
+        self.assertIn("second", breakdown)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+import os
+import stat
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from requests import Response
+
+from tests.helpers.fake_server import FakeTorqueServerTestCase
+from torque.client import TorqueClient
+from torque.sandboxes import SandboxesManager
+from torque.services.token_cache import REFRESH_MARGIN, TokenCache
+
+
+class TestTokenCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache = TokenCache(self.cache_dir.name)
+
+    def tearDown(self) -> None:
+        self.cache_dir.cleanup()
+
+    def test_store_and_get(self):
+        # act
+        self.cache.store("host", "account", "Me@example.com", "token", expires_in=3600)
+
+        # assert
+        cached = TokenCache(self.cache_dir.name).get("host", "account", "me@example.com")
+        self.assertEqual(cached.access_token, "token")
+        self.assertTrue(cached.usable)
+        self.assertFalse(cached.expires_soon)
+        self.assertIsNone(self.cache.get("host", "other", "me@example.com"))
+
+    def test_file_is_private_and_has_no_emails(self):
+        self.cache.store("host", "account", "me@example.com", "token")
+
+        self.assertEqual(stat.S_IMODE(os.stat(self.cache.path).st_mode), 0o600)
+        with open(self.cache.path) as cache_file:
+            self.assertNotIn("me@example.com", cache_file.read())
+
+    def test_expiring_token(self):
+        cached = self.cache.store("host", "account", "me@example.com", "token", expires_in=REFRESH_MARGIN - 10)
+
+        self.assertTrue(cached.usable)
+        self.assertTrue(cached.expires_soon)
+
+    def test_remove(self):
+        self.cache.store("host", "account", "me@example.com", "token")
+
+        self.cache.remove("host", "account", "me@example.com")
+
+        self.assertIsNone(self.cache.get("host", "account", "me@example.com"))
+
+
+class TestClientTokenCache(FakeTorqueServerTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.cache = TokenCache(self.cache_dir.name)
+
+    def create_client(self) -> TorqueClient:
+        return TorqueClient(
+            torque_host=self.server.hostname,
+            space="demo",
+            account="account",
+            email="me@example.com",
+            password="secret",
+            token_cache=self.cache,
+        )
+
+    def logins(self) -> int:
+        return len([path for _, path in self.api.requests if path.endswith("/login")])
+
+    def test_second_client_uses_cached_token(self):
+        # act
+        first = self.create_client()
+        second = self.create_client()
+
+        # assert
+        self.assertEqual(self.logins(), 1)
+        self.assertEqual(first.token, second.token)
+        self.assertEqual(second.session.headers["Authorization"], f"Bearer {first.token}")
+
+    def test_expiring_token_is_refreshed_in_background(self):
+        # arrange
+        self.cache.store(self.server.hostname + "/api/", "account", "me@example.com", "old", REFRESH_MARGIN - 10)
+
+        # act
+        client = self.create_client()
+        token = client.token
+        client._refresh_thread.join(5)
+
+        # assert
+        self.assertEqual(token, "old")
+        self.assertEqual(self.logins(), 1)
+        self.assertNotEqual(client.token, "old")
+        self.assertEqual(client.session.headers["Authorization"], f"Bearer {client.token}")
+        self.assertEqual(
+            self.cache.get(self.server.hostname + "/api/", "account", "me@example.com").access_token, client.token
+        )
+
+    def test_explicit_login_does_not_use_cached_token(self):
+        # arrange
+        cached = self.create_client().token
+
+        # act
+        client = TorqueClient(
+            torque_host=self.server.hostname,
+            account="account",
+            email="me@example.com",
+            password="secret",
+            token_cache=self.cache,
+            use_cached_token=False,
+        )
+
+        # assert
+        self.assertEqual(self.logins(), 2)
+        self.assertNotEqual(client.token, cached)
+        self.assertEqual(
+            self.cache.get(self.server.hostname + "/api/", "account", "me@example.com").access_token, client.token
+        )
+
+    def test_expired_token_is_not_used(self):
+        self.cache.store(self.server.hostname + "/api/", "account", "me@example.com", "old", expires_in=1)
+
+        client = self.create_client()
+
+        self.assertNotEqual(client.token, "old")
+        self.assertEqual(self.logins(), 1)
+
+    def test_request_is_retried_once_after_login_on_401(self):
+        # arrange
+        client = self.create_client()
+        token = client.token
+        self.api.fail_next(401, count=1, path="/environments")
+
+        # act
+        SandboxesManager(client).list(filter_opt="all")
+
+        # assert
+        self.assertEqual(self.logins(), 2)
+        self.assertNotEqual(client.token, token)
+        listing = next(stats for stats in client.metrics.summary() if stats["endpoint"].endswith("/environments"))
+        self.assertEqual((listing["count"], listing["retries"]), (2, 1))
+
+    def test_rejected_streamed_response_is_closed(self):
+        # arrange
+        client = self.create_client()
+        self.api.fail_next(401, count=1, path="/environments")
+
+        # act
+        with patch.object(Response, "close", autospec=True, side_effect=Response.close) as close:
+            sandboxes = list(SandboxesManager(client).list_items(filter_opt="all"))
+
+        # assert
+        self.assertEqual(sandboxes, [])
+        statuses = [call.args[0].status_code for call in close.call_args_list]
+        self.assertEqual(statuses, [401, 200])
+
+    def test_second_401_fails(self):
+        client = self.create_client()
+        self.api.fail_next(401, count=2, path="/environments")
+
+        with self.assertRaises(Exception):
+            SandboxesManager(client).list(filter_opt="all")
+        self.assertEqual(self.logins(), 2)
+
+    def test_token_client_does_not_use_cache(self):
+        client = TorqueClient(torque_host=self.server.hostname, space="demo", token="token", token_cache=self.cache)
+        self.api.fail_next(401, count=1, path="/environments")
+
+        with self.assertRaises(Exception):
+            SandboxesManager(client).list(filter_opt="all")
+        self.assertEqual(self.logins(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
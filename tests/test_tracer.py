@@ -0,0 +1,76 @@
+import threading
+import unittest
+
+from torque.services.tracer import Tracer, traced, tracer
+
+
+class TestTracer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tracer = Tracer()
+        self.tracer.enable()
+
+    def test_disabled_tracer_records_nothing(self):
+        disabled = Tracer()
+
+        with disabled.span("root") as span:
+            self.assertIsNone(span)
+
+        self.assertEqual(disabled.roots, [])
+
+    def test_nested_spans(self):
+        with self.tracer.span("root"):
+            with self.tracer.span("child", url="x"):
+                pass
+            self.tracer.record("recorded", 1.0, 2.0)
+
+        root = self.tracer.roots[0]
+        self.assertEqual([child.name for child in root.children], ["child", "recorded"])
+        self.assertEqual(root.children[0].args, {"url": "x"})
+        self.assertEqual(root.children[1].duration, 1.0)
+
+    def test_spans_of_other_threads_are_separate_roots(self):
+        with self.tracer.span("root"):
+            thread = threading.Thread(target=lambda: self.tracer.record("worker", 1.0, 2.0))
+            thread.start()
+            thread.join()
+
+        self.assertEqual([root.name for root in self.tracer.roots], ["root", "worker"])
+        self.assertIn("[thread", self.tracer.render_tree())
+
+    def test_chrome_trace(self):
+        with self.tracer.span("root"):
+            with self.tracer.span("child"):
+                pass
+
+        events = self.tracer.to_chrome_trace()["traceEvents"]
+
+        self.assertEqual([event["name"] for event in events], ["root", "child"])
+        self.assertTrue(all(event["ph"] == "X" for event in events))
+        self.assertEqual(events[0]["ts"], 0)
+
+    def test_render_tree_indents_children(self):
+        with self.tracer.span("root"):
+            with self.tracer.span("child"):
+                pass
+
+        lines = self.tracer.render_tree().splitlines()
+
+        self.assertTrue(lines[0].startswith("root "))
+        self.assertTrue(lines[1].startswith("  child "))
+
+    def test_traced_decorator(self):
+        @traced("decorated")
+        def func():
+            return 42
+
+        tracer.enable()
+        try:
+            self.assertEqual(func(), 42)
+            self.assertEqual(tracer.roots[-1].name, "decorated")
+        finally:
+            tracer.enabled = False
+            tracer.reset()
+
+
+if __name__ == "__main__":
+    unittest.main()
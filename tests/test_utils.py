@@ -1,6 +1,17 @@
+import os
+import subprocess
+import sys
+import tempfile
 import unittest
+from pathlib import Path
+
+from git import Repo
 
 from torque import utils
+from torque.exceptions import BadBlueprintRepo
+from torque.services.git_refs import GitCommandRefs, GitRefs, open_refs
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
 class TestParseParamString(unittest.TestCase):
@@ -32,3 +43,254 @@ class TestParseParamString(unittest.TestCase):
         line = "key1:val1, key2:val2"
         with self.assertRaises(ValueError):
             self.parse_fun(line)
+
+
+class TestBlueprintContentHash(unittest.TestCase):
+    def setUp(self):
+        self.repo_dir = tempfile.TemporaryDirectory()
+        repo = Repo.init(self.repo_dir.name)
+        repo.create_remote("origin", "https://github.com/user/repo.git")
+        os.makedirs(os.path.join(self.repo_dir.name, "blueprints"))
+        os.makedirs(os.path.join(self.repo_dir.name, "terraform", "vpc"))
+        self._write("blueprints/bp.yaml", "grains:\n  vpc:\n    spec:\n      source:\n        path: terraform/vpc\n")
+        self._write("terraform/vpc/main.tf", "resource {}")
+
+    def tearDown(self):
+        self.repo_dir.cleanup()
+
+    def _write(self, path, content):
+        with open(os.path.join(self.repo_dir.name, path), "w") as f:
+            f.write(content)
+
+    def test_hash_is_stable(self):
+        repo = utils.BlueprintRepo(self.repo_dir.name)
+        self.assertEqual(repo.get_blueprint_content_hash("bp"), repo.get_blueprint_content_hash("bp"))
+
+    def test_hash_changes_with_referenced_file(self):
+        repo = utils.BlueprintRepo(self.repo_dir.name)
+        before = repo.get_blueprint_content_hash("bp")
+
+        self._write("terraform/vpc/main.tf", "resource { changed }")
+
+        self.assertNotEqual(before, repo.get_blueprint_content_hash("bp"))
+
+
+class TestBlueprintAtRevision(unittest.TestCase):
+    def setUp(self):
+        self.repo_dir = tempfile.TemporaryDirectory()
+        self.git = Repo.init(self.repo_dir.name)
+        self.git.create_remote("origin", "https://github.com/user/repo.git")
+        self.git.config_writer().set_value("user", "name", "test").release()
+        self.git.config_writer().set_value("user", "email", "test@test.io").release()
+        os.makedirs(os.path.join(self.repo_dir.name, "blueprints"))
+        self._commit("blueprints/web.yaml", "inputs:\n  - size:\n      default_value: small\n  - region: eu\n")
+        # what has been pushed
+        self.git.git.update_ref("refs/remotes/origin/master", "HEAD")
+        self._commit("blueprints/web.yaml", "inputs:\n  - size:\n      default_value: large\n")
+        self.repo = utils.BlueprintRepo(self.repo_dir.name)
+
+    def tearDown(self):
+        self.repo.close()
+        self.git.close()
+        self.repo_dir.cleanup()
+
+    def _commit(self, path, content):
+        with open(os.path.join(self.repo_dir.name, path), "w") as f:
+            f.write(content)
+        self.git.git.add(".")
+        self.git.git.commit("-m", f"Update {path}")
+
+    def test_defaults_at_revision(self):
+        # act
+        pushed = self.repo.get_blueprint_default_inputs("web", "refs/remotes/origin/master")
+        committed = self.repo.get_blueprint_default_inputs("web", "HEAD")
+
+        # assert
+        self.assertEqual(pushed, {"size": "small", "region": "eu"})
+        self.assertEqual(committed, {"size": "large"})
+
+    def test_working_tree_is_not_read(self):
+        with open(os.path.join(self.repo_dir.name, "blueprints", "web.yaml"), "w") as f:
+            f.write("inputs:\n  - size:\n      default_value: uncommitted\n")
+
+        self.assertEqual(self.repo.get_blueprint_default_inputs("web", "HEAD"), {"size": "large"})
+        self.assertEqual(self.repo.get_blueprint_default_inputs("web"), {"size": "uncommitted"})
+
+    def test_yml_extension(self):
+        self._commit("blueprints/db.yml", "inputs:\n  - engine: postgres\n")
+
+        self.assertEqual(self.repo.get_blueprint_default_inputs("db", "HEAD"), {"engine": "postgres"})
+
+    def test_missing_blueprint_or_revision(self):
+        for blueprint_name, revision in (("db", "HEAD"), ("web", "refs/remotes/origin/unknown")):
+            with self.subTest(revision=revision):
+                with self.assertRaises(BadBlueprintRepo):
+                    self.repo.get_blueprint_content(blueprint_name, revision)
+
+    def test_reads_share_one_git_process(self):
+        # act
+        self.repo.get_blueprint_content("web", "HEAD")
+        process = self.repo.objects._process
+        self.repo.get_blueprint_content("web", "HEAD~1")
+        missing = self.repo.objects.read("HEAD:blueprints/db.yaml")
+
+        # assert
+        self.assertIsNone(missing)
+        self.assertIs(self.repo.objects._process, process)
+        self.repo.close()
+        self.assertIsNotNone(process.poll())
+
+
+class TestBlueprintRepoRefs(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.root.name, "repo")
+        Repo.init(os.path.join(self.root.name, "origin.git"), bare=True)
+        self.git = Repo.init(self.path)
+        self.git.git.symbolic_ref("HEAD", "refs/heads/master")
+        self.git.config_writer().set_value("user", "name", "test").release()
+        self.git.config_writer().set_value("user", "email", "test@test.io").release()
+        self.git.create_remote("origin", os.path.join(self.root.name, "origin.git"))
+        os.makedirs(os.path.join(self.path, "blueprints"))
+        self._write("blueprints/web.yaml", "inputs: []\n")
+        self.git.git.add(".")
+        self.git.git.commit("-m", "Initial commit")
+        self.git.git.push("origin", "master")
+        self.repo = utils.BlueprintRepo(self.path)
+
+    def tearDown(self):
+        self.repo.close()
+        self.git.close()
+        self.root.cleanup()
+
+    def _write(self, path, content):
+        with open(os.path.join(self.path, path), "w") as f:
+            f.write(content)
+
+    def test_branches_and_remotes(self):
+        # act
+        branch = self.repo.active_branch
+        remote = self.repo.remote()
+
+        # assert
+        self.assertEqual(branch.name, "master")
+        self.assertEqual(branch.commit, self.git.head.commit.hexsha)
+        self.assertEqual([r.name for r in self.repo.remotes], ["origin"])
+        self.assertEqual([(ref.name, ref.commit) for ref in remote.refs], [("origin/master", branch.commit)])
+        self.assertFalse(self.repo.is_repo_detached())
+        self.assertTrue(self.repo.current_branch_exists_on_remote())
+        self.assertTrue(self.repo.is_current_branch_synced())
+
+    def test_refs_follow_git_commands(self):
+        self.git.git.pack_refs("--all")
+        self.assertTrue(self.repo.is_current_branch_synced())
+
+        self._write("blueprints/web.yaml", "inputs: [size]\n")
+        self.git.git.commit("-am", "Change web")
+        self.assertFalse(self.repo.is_current_branch_synced())
+
+        self.git.git.push("origin", "master")
+        self.assertTrue(self.repo.is_current_branch_synced())
+
+        self.git.git.checkout("-b", "feature")
+        self.assertEqual(self.repo.active_branch.name, "feature")
+        self.assertFalse(self.repo.current_branch_exists_on_remote())
+
+        self.git.git.checkout("--detach")
+        self.assertTrue(self.repo.is_repo_detached())
+        with self.assertRaises(TypeError):
+            self.repo.active_branch
+
+    def test_working_tree_status(self):
+        self.assertFalse(self.repo.is_dirty(untracked_files=True))
+        self.assertTrue(self.repo.is_current_state_synced_with_remote())
+
+        self._write("untracked.txt", "")
+        self.assertFalse(self.repo.is_dirty())
+        self.assertEqual(self.repo.untracked_files, ["untracked.txt"])
+        self.assertFalse(self.repo.is_current_state_synced_with_remote())
+
+        self._write("blueprints/web.yaml", "inputs: [size]\n")
+        self.assertTrue(self.repo.is_dirty(index=False))
+        self.assertFalse(self.repo.is_dirty(working_tree=False))
+
+        self.git.git.stash("push", "--include-untracked")
+        self.assertEqual(self.repo.refs.stash_count(), 1)
+        self.assertFalse(self.repo.is_dirty(untracked_files=True))
+
+    def test_linked_worktree(self):
+        worktree = os.path.join(self.root.name, "worktree")
+        self.git.git.worktree("add", "-b", "feature", worktree)
+
+        repo = utils.BlueprintRepo(os.path.join(worktree, "blueprints"))
+
+        self.assertEqual(repo.working_dir, worktree)
+        self.assertEqual(repo.active_branch.name, "feature")
+        self.assertEqual(repo.remote().refs[0].name, "origin/master")
+        self.assertEqual(list(repo.blueprints), ["web"])
+
+    def test_refs_not_stored_in_files_are_read_with_git(self):
+        git_dir = Path(self.root.name) / "reftable"
+        git_dir.mkdir()
+        for config, expected in (
+            ("[core]\n\tbare = false\n", GitRefs),
+            ("[extensions]\n\tobjectFormat = sha1\n\trefStorage = reftable\n", GitCommandRefs),
+            ('[Extensions]\nrefstorage = "files"\n', GitRefs),
+        ):
+            with self.subTest(config=config):
+                (git_dir / "config").write_text(config)
+                self.assertIsInstance(open_refs(str(git_dir), self.path), expected)
+
+    def test_git_commands_agree_with_ref_files(self):
+        self.git.git.checkout("-b", "feature")
+        self._write("untracked.txt", "")
+        self.git.git.stash("push", "--include-untracked")
+        self.git.git.pack_refs("--all")
+
+        for detached in (False, True):
+            if detached:
+                self.git.git.checkout("--detach")
+            files, commands = GitRefs(self.repo.git_dir), GitCommandRefs(self.path)
+            with self.subTest(detached=detached):
+                self.assertEqual(commands.head(), files.head())
+                self.assertEqual(commands.list("refs/remotes/origin/"), files.list("refs/remotes/origin/"))
+                self.assertEqual(commands.list("refs/heads/"), files.list("refs/heads/"))
+                self.assertEqual(
+                    commands.resolve("refs/remotes/origin/master"), files.resolve("refs/remotes/origin/master")
+                )
+                self.assertIsNone(commands.resolve("refs/heads/unknown"))
+                self.assertEqual(commands.remotes(), files.remotes())
+                self.assertEqual((commands.stash_count(), files.stash_count()), (1, 1))
+
+    def test_invalid_repos(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for setup in ("not a repo", "bare", "no remotes"):
+                with self.subTest(setup=setup):
+                    path = os.path.join(temp_dir, setup)
+                    os.makedirs(path)
+                    if setup != "not a repo":
+                        Repo.init(path, bare=setup == "bare").close()
+                        os.makedirs(os.path.join(path, "blueprints"))
+                    with self.assertRaises(BadBlueprintRepo):
+                        utils.BlueprintRepo(path)
+
+    def test_writes_go_through_git_python(self):
+        # act
+        self.repo.git.branch("feature")
+        head = self.repo.create_head("other")
+        self.repo.delete_head("feature", force=True)
+
+        # assert
+        self.assertEqual(head.name, "other")
+        self.assertEqual(sorted(self.repo.refs.list("refs/heads/")), ["refs/heads/master", "refs/heads/other"])
+
+    def test_reads_do_not_import_git_python(self):
+        code = (
+            "import sys; from torque.utils import BlueprintRepo; repo = BlueprintRepo(sys.argv[1]); "
+            "repo.is_current_branch_synced(); repo.is_repo_detached(); repo.is_dirty(); "
+            "print('git' in sys.modules)"
+        )
+
+        output = subprocess.check_output([sys.executable, "-c", code, self.path], cwd=ROOT_DIR)
+
+        self.assertEqual(output.strip(), b"False")
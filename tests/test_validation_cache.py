@@ -0,0 +1,57 @@
+import tempfile
+import unittest
+
+from torque.services.validation_cache import BlueprintValidationCache
+
+
+class TestBlueprintValidationCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cache_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.cache_dir.cleanup()
+
+    def test_empty_cache_is_miss(self):
+        cache = BlueprintValidationCache("space", self.cache_dir.name)
+
+        self.assertFalse(cache.is_valid("bp", "hash"))
+
+    def test_passed_validation_is_hit_after_reload(self):
+        # arrange
+        cache = BlueprintValidationCache("space", self.cache_dir.name)
+        cache.store("bp", "hash", [])
+        cache.save()
+
+        # act
+        reloaded = BlueprintValidationCache("space", self.cache_dir.name)
+
+        # assert
+        self.assertTrue(reloaded.is_valid("bp", "hash"))
+
+    def test_changed_hash_is_miss(self):
+        cache = BlueprintValidationCache("space", self.cache_dir.name)
+        cache.store("bp", "hash", [])
+
+        self.assertFalse(cache.is_valid("bp", "another_hash"))
+
+    def test_failed_validation_is_miss(self):
+        cache = BlueprintValidationCache("space", self.cache_dir.name)
+        cache.store("bp", "hash", ["some error"])
+
+        self.assertFalse(cache.is_valid("bp", "hash"))
+
+    def test_cache_is_per_space(self):
+        # arrange
+        cache = BlueprintValidationCache("space", self.cache_dir.name)
+        cache.store("bp", "hash", [])
+        cache.save()
+
+        # act
+        other_space_cache = BlueprintValidationCache("other_space", self.cache_dir.name)
+
+        # assert
+        self.assertFalse(other_space_cache.is_valid("bp", "hash"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,197 @@
+import os
+import stat
+import time
+import unittest
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from tests.helpers.fake_server import FakeTorqueServerTestCase
+from torque.client import TorqueClient
+from torque.commands.sb import SandboxesCommand
+from torque.models.connection import TorqueConnection
+from torque.sandboxes import SandboxesManager
+from torque.services.validator_cache import PersistentValidatorCache, ValidatorCache
+from torque.testing import FakeTorqueApi
+from torque.testing.fake_api import ACTIVE, LAUNCHING
+
+
+def make_response(status_code: int = 200, content: bytes = b"{}", headers: dict = None) -> Response:
+    response = Response()
+    response.status_code = status_code
+    response._content = content
+    response.headers = CaseInsensitiveDict(headers or {})
+    return response
+
+
+class TestValidatorCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cache = ValidatorCache(max_entries=2)
+
+    def test_store_and_get(self):
+        # act
+        self.cache.store("a", make_response(content=b'{"id": 1}', headers={"ETag": '"1"'}))
+
+        # assert
+        document = self.cache.get("a")
+        self.assertEqual(document.conditional_headers(), {"If-None-Match": '"1"'})
+        self.assertEqual(document.json(), {"id": 1})
+        self.assertIsNot(document.json(), document.json())
+
+    def test_last_modified(self):
+        self.cache.store("a", make_response(headers={"Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"}))
+
+        self.assertEqual(
+            self.cache.get("a").conditional_headers(), {"If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT"}
+        )
+
+    def test_response_without_validators_forgets_document(self):
+        # arrange
+        self.cache.store("a", make_response(headers={"ETag": '"1"'}))
+
+        # act
+        self.cache.store("a", make_response())
+
+        # assert
+        self.assertIsNone(self.cache.get("a"))
+
+    def test_least_recently_used_document_is_dropped(self):
+        # arrange
+        for url in ("a", "b"):
+            self.cache.store(url, make_response(headers={"ETag": url}))
+        self.cache.get("a")
+
+        # act
+        self.cache.store("c", make_response(headers={"ETag": "c"}))
+
+        # assert
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("a"))
+
+
+class TestPersistentValidatorCache(FakeTorqueServerTestCase):
+    def create_cache(self, **kwargs) -> PersistentValidatorCache:
+        return PersistentValidatorCache(self.cache_dir.name, **kwargs)
+
+    def test_documents_outlive_the_cache(self):
+        # arrange
+        self.create_cache().store("a", make_response(content=b'{"id": 1}', headers={"ETag": '"1"'}))
+
+        # act
+        document = self.create_cache().get("a")
+
+        # assert
+        self.assertEqual(document.conditional_headers(), {"If-None-Match": '"1"'})
+        self.assertEqual(document.json(), {"id": 1})
+
+    def test_files_are_private(self):
+        cache = self.create_cache()
+
+        cache.store("a", make_response(headers={"ETag": '"1"'}))
+
+        self.assertEqual(stat.S_IMODE(os.stat(cache._file("a")).st_mode), 0o600)
+
+    def test_outdated_document_is_removed(self):
+        # arrange
+        self.create_cache().store("a", make_response(headers={"ETag": '"1"'}))
+
+        # act
+        self.create_cache().store("a", make_response(status_code=404))
+
+        # assert
+        self.assertIsNone(self.create_cache().get("a"))
+
+    def test_least_recently_stored_files_are_dropped(self):
+        # arrange
+        cache = self.create_cache(max_files=2)
+        for index, url in enumerate(("a", "b", "c")):
+            cache.store(url, make_response(headers={"ETag": url}))
+            os.utime(cache._file(url), (index, index))
+
+        # act
+        cache.store("d", make_response(headers={"ETag": "d"}))
+
+        # assert
+        self.assertEqual(sorted(os.listdir(cache.path)), sorted(cache._file(url).name for url in ("c", "d")))
+
+    def test_repeated_status_commands_send_conditional_requests(self):
+        # arrange
+        self.api.add_blueprint("demo", "web")
+        sandbox = self.api.add_sandbox("demo", "web", status=ACTIVE)
+
+        def status_command():
+            command = SandboxesCommand(
+                command_args=f"sb status {sandbox.sandbox_id}".split(),
+                connection=TorqueConnection("demo", "token", None),
+            )
+            command.execute()
+            return [item for item in command.client.metrics.summary() if item["endpoint"].endswith("{id}")][0]
+
+        # act
+        first = status_command()
+        second = status_command()
+
+        # assert
+        self.assertEqual(first["status_codes"]["200"], 1)
+        self.assertEqual(second["status_codes"], {"304": 1})
+
+
+class TestConditionalGet(FakeTorqueServerTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.api.add_blueprint("demo", "web")
+        self.client = TorqueClient(space="demo", token="token")
+        self.manager = SandboxesManager(self.client)
+
+    def create_api(self) -> FakeTorqueApi:
+        return FakeTorqueApi(seed=0, launch_time=0.2)
+
+    def test_unchanged_sandbox_is_not_downloaded_again(self):
+        # arrange
+        sandbox_id = self.manager.start("sb", "web")
+
+        # act
+        first = self.manager.get(sandbox_id)
+        second = self.manager.get(sandbox_id)
+
+        # assert
+        self.assertEqual(second.raw, first.raw)
+        summary = {item["endpoint"]: item for item in self.client.metrics.summary()}
+        environment = summary["spaces/{space}/environments/{id}"]
+        self.assertEqual(environment["status_codes"], {"200": 1, "304": 1})
+        self.assertEqual(environment["not_modified"], 1)
+        self.assertEqual(environment["bytes_saved"], environment["bytes_received"])
+        self.assertNotIn("If-None-Match", self.client.session.headers)
+
+    def test_polling_a_launch(self):
+        # arrange
+        sandbox_id = self.manager.start("sb", "web")
+
+        # act
+        statuses = []
+        for _ in range(8):
+            statuses.append(self.manager.get(sandbox_id).sandbox_status)
+            time.sleep(0.05)
+
+        # assert
+        self.assertEqual(statuses[0], LAUNCHING)
+        self.assertEqual(statuses[-1], ACTIVE)
+        environment = [item for item in self.client.metrics.summary() if item["endpoint"].endswith("{id}")][0]
+        self.assertEqual(environment["status_codes"]["200"], 2)
+        self.assertEqual(environment["not_modified"], 6)
+        self.assertGreater(environment["bytes_saved"], environment["bytes_received"])
+
+    def test_server_without_etags(self):
+        self.api.etags = False
+        sandbox_id = self.manager.start("sb", "web")
+
+        self.manager.get(sandbox_id)
+        self.manager.get(sandbox_id)
+
+        self.assertEqual(len(self.client.validators), 0)
+        self.assertEqual(self.client.metrics.bytes_saved, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,11 @@
+from typing import Iterator, List
 from urllib.parse import urljoin
 
 from torque.client import TorqueClient
+from torque.services.json_codec import codec
+
+# bytes of a listing response read at once while its items are decoded
+LIST_CHUNK_SIZE = 16 * 1024
 
 # TODO(ddovbii): Make classes abstract
 
@@ -19,13 +24,22 @@ class ResourceManager(object):
         return url
 
     def _get(self, path: str, headers: dict = None):
-        if headers is None:
-            headers = {}
+        headers = dict(headers or {})
 
         url = urljoin(self.endpoint, path)
 
-        result = self.client.request(url, "GET", headers)
-        return result.json()
+        # the server answers 304 without a body when the document has not changed since the cached one
+        cached = self.client.validators.get(url)
+        if cached is not None:
+            headers.update(cached.conditional_headers())
+
+        result = self.client.request(url, "GET", headers=headers)
+        if result.status_code == 304 and cached is not None:
+            self.client.metrics.record_not_modified("GET", url, len(cached.content))
+            return cached.json()
+
+        self.client.validators.store(url, result)
+        return codec.loads(result.content)
 
     def _delete(self, path: str):
         url = urljoin(self.endpoint, path)
@@ -42,7 +56,18 @@ class ResourceManager(object):
 
         result = self.client.request(url, "GET", params=params)
 
-        return result.json()
+        return codec.loads(result.content)
+
+    def _list_items(self, path: str, filter_params: dict = None) -> Iterator[dict]:
+        """Lazily yields items of the list as soon as they are received, before the whole response arrives"""
+        url = urljoin(self.endpoint, path)
+        params = filter_params.copy() if filter_params else None
+
+        result = self.client.request(url, "GET", params=params, stream=True)
+        try:
+            yield from codec.iter_list(result.iter_content(LIST_CHUNK_SIZE))
+        finally:
+            result.close()
 
     def _post(self, path: str, params: dict = None, headers: dict = None):
         if headers is None:
@@ -53,15 +78,17 @@ class ResourceManager(object):
 
         url = urljoin(self.endpoint, path)
         result = self.client.request(url, "POST", params, headers)
-        return result.json()
+        return codec.loads(result.content)
 
 
 class Resource(object):
+    __slots__ = ("manager",)
+
     def __init__(self, manager: ResourceManager):
         self.manager = manager
 
     @classmethod
-    def json_deserialize(cls, manager: ResourceManager, json_obj: dict):
+    def json_deserialize(cls, manager: ResourceManager, json_obj: dict, fields: List[List[str]] = None):
         pass
 
     def json_serialize(self) -> dict:
@@ -6,6 +6,7 @@ import string
 from torque.constants import DONE_STATUS, UNCOMMITTED_BRANCH_NAME
 from torque.exceptions import BadBlueprintRepo
 from torque.sandboxes import Sandbox
+from torque.services.tracer import traced
 from torque.utils import BlueprintRepo
 
 logging.getLogger("git").setLevel(logging.WARNING)
@@ -13,7 +14,7 @@ logger = logging.getLogger(__name__)
 
 
 def debug_output_about_repo_examination(repo: BlueprintRepo, blueprint_name: str):
-    if not repo.repo_has_blueprint(blueprint_name):
+    if blueprint_name and not repo.repo_has_blueprint(blueprint_name):
         logger.debug(f"Current repo does not contain a definition for the blueprint '{blueprint_name}'.")
     if repo.is_dirty():
         logger.debug("You have uncommitted changes")
@@ -64,7 +65,7 @@ def create_temp_branch_and_stash_if_needed(repo: BlueprintRepo, working_branch:
     return temp_working_branch
 
 
-def get_and_check_folder_based_repo(blueprint_name: str) -> BlueprintRepo:
+def get_and_check_folder_based_repo(blueprint_name: str = None) -> BlueprintRepo:
     # Try to detect branch from current git-enabled folder
     logger.debug("Branch hasn't been specified. Trying to identify branch from current working directory")
     try:
@@ -125,17 +126,20 @@ def remove_gitkeep_in_branch() -> None:
         os.remove(file)
 
 
+@traced("git.push")
 def create_remote_branch(repo: BlueprintRepo, uncommitted_branch_name: str) -> None:
     logger.debug(f"[GIT] Push (origin) {uncommitted_branch_name}")
     repo.git.push("origin", uncommitted_branch_name)
 
 
+@traced("git.checkout")
 def create_local_temp_branch(repo: BlueprintRepo, uncommitted_branch_name: str) -> bool:
     logger.debug(f"[GIT] Checkout (-b) {uncommitted_branch_name}")
     repo.git.checkout("-b", uncommitted_branch_name)
     return True
 
 
+@traced("git.commit")
 def commit_to_local_temp_branch(repo: BlueprintRepo) -> None:
     logger.debug("[GIT] Add (.)")
     repo.git.add(".")
@@ -143,20 +147,22 @@ def commit_to_local_temp_branch(repo: BlueprintRepo) -> None:
     repo.git.commit("-m", "Uncommitted temp branch - temp commit for validation")
 
 
+@traced("git.stash_count")
 def count_stashed_items(repo: BlueprintRepo) -> int:
     if repo:
-        logger.info("[GIT] Stash(list)")
-        stash_list = repo.git.stash("list")
-        return stash_list.count("stash@")
+        logger.info("[GIT] Count stashed items (entries of the refs/stash reflog)")
+        return repo.refs.stash_count()
     else:
         return 0
 
 
+@traced("git.stash_push")
 def stash_local_changes(repo: BlueprintRepo):
     logger.debug("[GIT] Stash(Push --include-untracked)")
     repo.git.stash("push", "--include-untracked")
 
 
+@traced("git.stash_apply")
 def preserve_uncommitted_code(repo: BlueprintRepo) -> None:
     logger.debug("[GIT] Stash(APPLY)")
     repo.git.stash("apply")
@@ -171,17 +177,20 @@ def revert_from_local_temp_branch(repo: BlueprintRepo, active_branch: str, stash
         raise e
 
 
+@traced("git.stash_pop")
 def revert_from_uncommitted_code(repo: BlueprintRepo) -> None:
     logger.debug("[GIT] Stash(POP)")
     repo.git.stash("pop", "--index")
     remove_gitkeep_in_branch()
 
 
+@traced("git.delete_local_branch")
 def delete_temp_local_branch(repo: BlueprintRepo, temp_branch: str) -> None:
     logger.debug(f"[GIT] Deleting local branch {temp_branch}")
-    repo.delete_head("-D", temp_branch)
+    repo.delete_head(temp_branch, force=True)
 
 
+@traced("git.delete_remote_branch")
 def delete_temp_remote_branch(repo: BlueprintRepo, temp_branch: str) -> None:
     logger.debug(f"[GIT] Deleting remote branch {temp_branch}")
     repo.git.push("origin", "--delete", temp_branch)
@@ -205,6 +214,7 @@ def is_tf_blueprint(blueprint_name: str, repo: BlueprintRepo) -> bool:
     return tf_sandbox_flag
 
 
+@traced("git.checkout")
 def checkout_remote_branch(repo: BlueprintRepo, active_branch: str) -> None:
     logger.debug(f"[GIT] Checking out {active_branch}")
     repo.git.checkout(active_branch)
@@ -1,14 +1,26 @@
 import logging
 import os
+import threading
+import time
 from urllib.parse import urljoin
 
 import pkg_resources
 from requests import Response, Session
+from requests.utils import get_environ_proxies
 
 from .exceptions import Unauthorized
-from .session import TorqueSession
+from .services.cassette import Cassette
+from .services.metrics import RequestMetrics
+from .services.token_cache import CachedToken, TokenCache
+from .services.tracer import tracer
+from .services.validator_cache import ValidatorCache
+from .session import SessionRegistry, TorqueSession, session_registry
+
+# seconds to wait for the connection opened ahead of the first request
+WARM_UP_TIMEOUT = 10
 
 logging.getLogger("urllib3").setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
 
 
 class TorqueClient(object):
@@ -25,66 +37,170 @@ class TorqueClient(object):
         account: str = None,
         email: str = None,
         password: str = None,
-        session: TorqueSession = TorqueSession(),
+        session: TorqueSession = None,
+        metrics: RequestMetrics = None,
+        profile: str = None,
+        registry: SessionRegistry = None,
+        token_cache: TokenCache = None,
+        use_cached_token: bool = True,
+        validators: ValidatorCache = None,
     ):
+        """
+        Clients with a profile share the session of the profile and host kept in the session registry, other clients
+        get their own session unless one is provided. Only an own session is closed by close()
+
+        Access tokens of account/email/password logins are kept in the token cache, refreshed in background before
+        they expire and once more when a request is rejected with 401. With use_cached_token=False the client always
+        logs in, so the credentials are checked by the server, and the new token replaces the cached one
+
+        Validators of GET responses are kept in memory of the client unless another validator cache is provided
+        """
 
         if os.environ.get("TORQUE_HOSTNAME"):
             torque_host = os.environ["TORQUE_HOSTNAME"]
 
+        # host may contain a scheme, e.g. TORQUE_HOSTNAME=http://127.0.0.1:8765 for a local fake API server
+        if "://" in torque_host:
+            torque_host_prefix = ""
+
         self.base_url = urljoin(f"{torque_host_prefix}{torque_host}", self.API_URL)
 
+        self.profile = profile
+        self._owns_session = session is None and profile is None
+        if session is None:
+            if profile is None:
+                session = TorqueSession()
+            else:
+                registry = registry if registry is not None else session_registry
+                session = registry.get(self.base_url, profile)
         self.session = session
+        self.metrics = metrics or RequestMetrics()
+        self.validators = validators if validators is not None else ValidatorCache()
+        # records or replays requests when set
+        self.cassette: Cassette = None
         self.space = space
         self.account = account
 
-        if token:
-            self.token = token
+        self.token = token
+        self._credentials = None
+        self._cached_token: CachedToken = None
+        self._refresh_lock = threading.Lock()
+        self._refresh_thread: threading.Thread = None
+        self.token_cache = token_cache
+        if not token and all([account, email, password]):
+            self._credentials = (account, email, password)
+            self.token_cache = token_cache or TokenCache(os.environ.get("TORQUE_CACHE_DIR", ""))
+            self.token = self._get_cached_token() if use_cached_token else self._login_and_cache()
 
-        elif all([account, email, password]):
-            self.token = TorqueClient.login(account, email, password, self.session, self.base_url)
+        if self.token:
+            self.session.init_bearer_auth(self.token)
 
-        self.session.init_bearer_auth(token)
+    def close(self) -> None:
+        if self._owns_session:
+            self.session.close()
 
-    def __del__(self):
-        if self.session:
-            try:
-                self.session.close()
-            except Exception:
-                raise
-            finally:
-                self.session = None
+    def __enter__(self) -> "TorqueClient":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
 
     def login(
         self,
         account: str,
         email: str,
         password: str,
-        session: Session = TorqueSession(),
+        session: Session = None,
     ):
+        return self._login(account, email, password, session).get("access_token", "")
+
+    def _login(self, account: str, email: str, password: str, session: Session = None) -> dict:
         path = urljoin(self.base_url, f"accounts/{account}/login")
         payload = {"email": email, "password": password}
-        resp = session.post(url=path, json=payload)
+        resp = self._send(session or self.session, "POST", path, json=payload)
         if resp.status_code != 200:
             # TODO(ddovbii): implement exceptions and error handler
             raise Unauthorized("Login Failed")
 
-        return resp.json().get("access_token", "")
+        return resp.json()
+
+    def _get_cached_token(self) -> str:
+        account, email, _ = self._credentials
+        cached = self.token_cache.get(self.base_url, account, email)
+        if cached is None or not cached.usable:
+            return self._login_and_cache()
+
+        logger.debug(f"Using cached access token, expires in {int(cached.expires_in())} s")
+        self._cached_token = cached
+        if cached.expires_soon:
+            self._refresh_in_background()
+        return cached.access_token
+
+    def _login_and_cache(self, session: Session = None) -> str:
+        account, email, password = self._credentials
+        login_json = self._login(account, email, password, session)
+        self._cached_token = self.token_cache.store(
+            self.base_url, account, email, login_json.get("access_token", ""), login_json.get("expires_in")
+        )
+        return self._cached_token.access_token
+
+    def _refresh_in_background(self) -> None:
+        with self._refresh_lock:
+            if self._refresh_thread and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(target=self._refresh_token, name="token-refresh", daemon=True)
+            self._refresh_thread.start()
+
+    def _refresh_token(self) -> None:
+        try:
+            # own session, the login must not carry the current authorization
+            with TorqueSession() as session:
+                self._use_token(self._login_and_cache(session))
+        except Exception as e:
+            logger.debug(f"Background refresh of the access token failed. Details: {e}")
+
+    def _use_token(self, token: str) -> None:
+        self.token = token
+        self.session.init_bearer_auth(token)
+
+    def _ensure_token(self) -> None:
+        """Refresh an expiring cached token before it is rejected"""
+        if self._cached_token is None:
+            return
+        if not self._cached_token.usable:
+            self._use_token(self._login_and_cache())
+        elif self._cached_token.expires_soon:
+            self._refresh_in_background()
+
+    def warm_up(self) -> None:
+        """Log in if needed and open a connection to the API host ahead of the first request, so that the request
+        does not wait for TCP and TLS handshakes. The connection is opened by a HEAD request of the API root, whose
+        status does not matter, and kept in the pool of the session. A connection which can't be opened is left to
+        the request"""
+        self._ensure_token()
+        if self.cassette or get_environ_proxies(self.base_url):
+            return
+
+        with tracer.span("http.connect", url=self.base_url):
+            try:
+                self.session.head(self.base_url, timeout=WARM_UP_TIMEOUT, allow_redirects=False).close()
+            except Exception as e:
+                logger.debug(f"Unable to open a connection to {self.base_url} in advance. Details: {e}")
 
     def longtoken(self):
         url_longtoken = urljoin(self.base_url, "token/longtoken")
-        longtoken_resp = self.session.post(url_longtoken)
+        longtoken_resp = self._send(self.session, "POST", url_longtoken)
         return longtoken_resp.json().get("access_token", "")
 
-    def request(self, endpoint: str, method: str = "GET", params: dict = None, headers: dict = None) -> Response:
-        """Gets response as Json"""
+    def request(
+        self, endpoint: str, method: str = "GET", params: dict = None, headers: dict = None, stream: bool = False
+    ) -> Response:
+        """Gets response as Json. With `stream` the body is read by the caller, e.g. with Response.iter_content()"""
         method = method.upper()
 
         if method not in ("GET", "PUT", "POST", "DELETE"):
             raise ValueError("Method must be in [GET, POST, PUT, DELETE]")
 
-        if headers:
-            self.session.headers.update(headers)
-
         version = pkg_resources.get_distribution("torque-cli").version
         if version:
             self.session.headers.update({"User-Agent": f"Torque-CLI/{version}"})
@@ -101,12 +217,27 @@ class TorqueClient(object):
             "method": method,
             "url": url,
         }
+        if headers:
+            # headers of this request only, e.g. validators of a conditional GET must not stick to the session
+            request_args["headers"] = headers
         if method == "GET":
             request_args["params"] = params
         else:
             request_args["json"] = params
+        if stream:
+            request_args["stream"] = True
 
-        response = self.session.request(**request_args)
+        self._ensure_token()
+        response = self._send(self.session, **request_args)
+        if response.status_code == 401 and self._credentials:
+            logger.debug("Access token was rejected, logging in again")
+            # give the connection back to the pool, a streamed response is not read otherwise
+            response.close()
+            account, email, _ = self._credentials
+            self.token_cache.remove(self.base_url, account, email)
+            self._use_token(self._login_and_cache())
+            self.metrics.record_retry(method, url)
+            response = self._send(self.session, **request_args)
 
         if response.status_code >= 400:
             # TODO(ddovbii): implement exceptions and error handler
@@ -114,3 +245,31 @@ class TorqueClient(object):
             raise Exception(message)
 
         return response
+
+    def _send(self, session: Session, method: str, url: str, **kwargs) -> Response:
+        """Sends request recording its timing and size"""
+        with tracer.span(f"http.{method}", url=url) as span:
+            start_time = time.perf_counter()
+            if self.cassette:
+                response = self.cassette.send(session, method, url, **kwargs)
+            else:
+                response = session.request(method=method, url=url, **kwargs)
+            latency = time.perf_counter() - start_time
+            if span:
+                span.args["status"] = response.status_code
+
+        request_body = response.request.body if response.request is not None else None
+        if kwargs.get("stream") and not response.status_code >= 400:
+            # the body is not read yet, its size is known only when the server sends it
+            bytes_received = int(response.headers.get("Content-Length") or 0)
+        else:
+            bytes_received = len(response.content or b"")
+        self.metrics.record(
+            method,
+            url,
+            response.status_code,
+            latency,
+            bytes_received=bytes_received,
+            bytes_sent=len(request_body or b""),
+        )
+        return response
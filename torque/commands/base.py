@@ -1,14 +1,17 @@
-from typing import Any
+from typing import Any, List
 
 from colorama import Fore, Style
-from docopt import DocoptExit, docopt
+from docopt import DocoptExit
 
 from torque.base import ResourceManager
 from torque.client import TorqueClient
 from torque.models.connection import TorqueConnection
 from torque.parsers.command_input_parsers import CommandInputParser
 from torque.parsers.global_input_parser import GlobalInputParser
+from torque.parsers.grammar import docopt
 from torque.services.output_formatter import OutputFormatter
+from torque.services.tracer import tracer
+from torque.services.validator_cache import PersistentValidatorCache
 
 
 class BaseCommand(object):
@@ -18,16 +21,26 @@ class BaseCommand(object):
 
     RESOURCE_MANAGER = ResourceManager
     OUTPUT_FORMATTER = OutputFormatter
+    # actions which can't run against several profiles at once (they stream output or change the local git repo)
+    SINGLE_PROFILE_ACTIONS: List[str] = []
 
     def __init__(self, command_args: list, connection: TorqueConnection = None):
         if connection:
-            self.client = TorqueClient(space=connection.space, token=connection.token, account=connection.account)
+            self.client = TorqueClient(
+                space=connection.space,
+                token=connection.token,
+                account=connection.account,
+                profile=connection.profile,
+                # validators outlive the command, so the next command can send conditional requests too
+                validators=PersistentValidatorCache(GlobalInputParser.get_cache_dir()),
+            )
             self.manager = self.RESOURCE_MANAGER(client=self.client)
         else:
             self.client = None
             self.manager = None
 
-        self.args = docopt(self.__doc__, argv=command_args)
+        with tracer.span("command.parse_args"):
+            self.args = docopt(self.__doc__, argv=command_args)
         self.input_parser = CommandInputParser(self.args)
         self.global_input_parser = GlobalInputParser(self.args)
         self.output_formatter = self.OUTPUT_FORMATTER(self.global_input_parser)
@@ -36,18 +49,25 @@ class BaseCommand(object):
         """Finds a subcommand passed to with command in
         object actions table and executes mapped method"""
 
+        success, output = self.run_action()
+        if output:
+            self.output_formatter.yield_output(success, output)
+        return success
+
+    def run_action(self) -> (bool, Any):
+        """Executes the action passed with the command and returns its result and output without printing it"""
         actions_table = self.get_actions_table()
         for action in actions_table:
             if self.args.get(action, False):
                 # call action
-                success, output = actions_table[action]()
-                if output:
-                    self.output_formatter.yield_output(success, output)
-                return success
+                return actions_table[action]()
 
         # if subcommand was specified without args (actions), just show usage
         raise DocoptExit
 
+    def supports_multiple_profiles(self) -> bool:
+        return not any(self.args.get(action, False) for action in self.SINGLE_PROFILE_ACTIONS)
+
     def get_actions_table(self) -> dict:
         return {}
 
@@ -0,0 +1,104 @@
+import logging
+from typing import Any
+
+from docopt import DocoptExit
+
+from torque.client import TorqueClient
+from torque.commands.base import BaseCommand
+from torque.sandboxes import SandboxesManager
+from torque.services.load_generator import LoadGenerator
+
+logger = logging.getLogger(__name__)
+
+LOCAL_SPACE = "bench"
+
+
+class BenchCommand(BaseCommand):
+    """
+    usage:
+        torque bench [--mix=<mix>] [--concurrency=<N>] [--rate=<rps>] [--requests=<N> | --time=<seconds>]
+                     [--blueprint=<name>] [--local] [--output=json]
+        torque bench [--help]
+
+    options:
+       --mix=<mix>              Comma-separated weights of the operations to perform: list, get, start and end
+                                [default: list=80,get=20]
+
+       --concurrency=<N>        Number of concurrent workers [default: 4]
+
+       --rate=<rps>             Target total rate of operations per second. If not set, every worker starts the next
+                                operation as soon as the previous one is done
+
+       --requests=<N>           Total number of operations to perform [default: 100]
+
+       --time=<seconds>         Run for the given number of seconds instead of a fixed number of operations
+
+       --blueprint=<name>       Blueprint used by 'start' operations. Sandboxes started by the benchmark are the only
+                                ones it ends, the remaining ones are ended when it finishes
+
+       --local                  Run against a local fake Torque API server instead of the real service
+
+       -o --output=json         Yield output in JSON format
+
+       -h --help                Show this message
+    """
+
+    RESOURCE_MANAGER = SandboxesManager
+
+    def get_actions_table(self) -> dict:
+        return {"bench": self.do_bench}
+
+    def do_bench(self) -> (bool, Any):
+        bench_input = self.input_parser.bench
+        mix = bench_input.mix
+        blueprint = bench_input.blueprint
+
+        server = None
+        manager = self.manager
+        if bench_input.local:
+            # imported here to keep the http server machinery out of the CLI start up
+            from torque.testing import FakeTorqueApi, FakeTorqueServer
+
+            api = FakeTorqueApi(latency=(0.005, 0.02))
+            api.populate(LOCAL_SPACE, blueprints=5, sandboxes=50)
+            server = FakeTorqueServer(api).start()
+            manager = SandboxesManager(TorqueClient(torque_host=server.hostname, space=LOCAL_SPACE, token="local"))
+            blueprint = blueprint or next(iter(api.blueprints[LOCAL_SPACE]))
+            self.client = manager.client
+
+        if mix.get("start") and not blueprint:
+            raise DocoptExit("--blueprint is required when the mix contains 'start' operations")
+
+        generator = LoadGenerator(manager, mix, bench_input.concurrency, bench_input.rate, blueprint)
+        if not self.global_input_parser.output_json:
+            target = "local fake API" if server else f"space '{manager.client.space}'"
+            self.info(f"Running {', '.join(f'{op}={weight}' for op, weight in mix.items())} against {target}")
+
+        try:
+            report = generator.run(
+                requests=None if bench_input.time else bench_input.requests, duration=bench_input.time
+            )
+        except Exception as e:
+            logger.exception(e, exc_info=False)
+            return self.die()
+        finally:
+            if server:
+                server.stop()
+
+        summary = report.summary()
+        if self.global_input_parser.output_json:
+            return True, {"summary": summary, "operations": report.operations(), "errors": report.errors()}
+
+        self.info(
+            f"{summary['operations']} operations in {summary['elapsed_s']} s: {summary['throughput_ops']} ops/s, "
+            f"p50 {summary['p50_ms']} ms, p95 {summary['p95_ms']} ms, p99 {summary['p99_ms']} ms"
+        )
+        self.info(
+            f"Error rate: {summary['error_rate']:.2%}, throttled: {summary['throttled']} of "
+            f"{summary['http_requests']} HTTP requests ({summary['throttle_rate']:.2%})"
+        )
+        if summary["skipped"]:
+            self.fyi_info(f"{summary['skipped']} operations skipped: no sandbox to get or end")
+        for error, count in report.errors().items():
+            self.fyi_info(f"{count} x {error}")
+        return True, report.operations()
@@ -1,46 +1,79 @@
 import logging
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
 
 from torque.branch.branch_context import ContextBranch
 from torque.branch.branch_utils import get_and_check_folder_based_repo
 from torque.commands.base import BaseCommand
 from torque.models.blueprints import BlueprintsManager
 from torque.parsers.command_input_validators import CommandInputValidator
+from torque.parsers.global_input_parser import GlobalInputParser
+from torque.services.validation_cache import BlueprintValidationCache
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_VALIDATION_WORKERS = 8
+
 
 class BlueprintsCommand(BaseCommand):
     """
     usage:
-        torque (bp | blueprint) list [--output=json | --output=json --detail]
-        torque (bp | blueprint) get <name> [--output=json | --output=json --detail]
+        torque (bp | blueprint) list [--output=json | --output=json --detail] [--fields=<fields>] [--query=<query>]
+        torque (bp | blueprint) get <name> [--output=json | --output=json --detail] [--fields=<fields>]
+                                           [--query=<query>]
+        torque (bp | blueprint) validate (<blueprint_name>... | --all) [--branch <branch> [--commit <commitId>]]
+                                                                         [--parallel <N>] [--output=json]
+        torque (bp | blueprint) validate --changed [--parallel <N>] [--output=json]
         torque (bp | blueprint) [--help]
 
     options:
-       -o --output=json         Yield output in JSON format
+       -o --output=json         Yield output in JSON format. Use --output=ndjson to print one compact JSON
+                                object per line
 
        -d --detail              Obtain full blueprint data in JSON format
 
+       -b --branch <branch>     Run the Blueprint validation against a remote Git branch. If not provided,
+                                the CLI will attempt to automatically detect the current working branch.
+
+       -c --commit <commitId>   Specify a specific Commit ID. If this parameter is used, the Branch parameter
+                                must also be specified.
+
+       --all                    Validate all blueprints of the local repo (or of the space catalog if the local
+                                repo is not available or the branch is specified)
+
+       --parallel <N>           Max number of blueprints validated concurrently [default: 8]
+
+       --changed                Validate only blueprints of the local repo whose content or referenced files have
+                                changed since their last successful validation in the space
+
+       --fields=<fields>        Comma-separated list of (dotted) paths of the blueprint API document to keep in the
+                                output, e.g. --fields=details.blueprint_name,details.inputs
+
+       --query=<query>          JMESPath-like expression applied to the output,
+                                e.g. --query="[?enabled].name"
+
        -h --help                Show this message
     """
 
     RESOURCE_MANAGER = BlueprintsManager
 
+    SINGLE_PROFILE_ACTIONS = ["validate"]
+
     def get_actions_table(self) -> dict:
         return {
             "list": self.do_list,
-            # "validate": self.do_validate,
+            "validate": self.do_validate,
             "get": self.do_get,
         }
 
     def do_list(self) -> (bool, Any):
         detail = self.input_parser.blueprint_list.detail
+        fields = self.global_input_parser.fields
         try:
             if detail:
-                blueprint_list = self.manager.list_detailed()
+                blueprint_list = self.manager.list_detailed(fields=fields)
             else:
-                blueprint_list = self.manager.list()
+                blueprint_list = self.manager.list(fields=fields)
         except Exception as e:
             logger.exception(e, exc_info=False)
             return self.die()
@@ -50,12 +83,13 @@ class BlueprintsCommand(BaseCommand):
     def do_get(self) -> (bool, Any):
         detail = self.input_parser.blueprint_get.detail
         blueprint_name = self.input_parser.blueprint_get.blueprint_name
+        fields = self.global_input_parser.fields
 
         try:
             if detail:
-                bp = self.manager.get_detailed(blueprint_name)
+                bp = self.manager.get_detailed(blueprint_name, fields=fields)
             else:
-                bp = self.manager.get(blueprint_name)
+                bp = self.manager.get(blueprint_name, fields=fields)
         except Exception as e:
             logger.exception(e, exc_info=False)
             return self.die(f"Unable to get details of blueprint '{blueprint_name}'")
@@ -63,29 +97,126 @@ class BlueprintsCommand(BaseCommand):
         return True, bp
 
     def do_validate(self) -> (bool, Any):
-        blueprint_name = self.input_parser.blueprint_validate.blueprint_name
+        if self.input_parser.blueprint_validate.changed:
+            return self._validate_changed()
+
+        blueprint_names = self.input_parser.blueprint_validate.blueprint_names
+        validate_all = self.input_parser.blueprint_validate.all
         branch = self.input_parser.blueprint_validate.branch
         commit = self.input_parser.blueprint_validate.commit
+        parallel = self.input_parser.blueprint_validate.parallel
 
         CommandInputValidator.validate_commit_and_branch_specified(branch, commit)
 
-        repo = get_and_check_folder_based_repo(blueprint_name)
-        with ContextBranch(repo, branch) as context_branch:
-            if not context_branch:
-                return self.error("Unable to Validate BP")
+        repo = None
+        if not branch:
             try:
-                bp = self.manager.validate(
-                    blueprint=blueprint_name, branch=context_branch.validation_branch, commit=commit
-                )
+                repo = get_and_check_folder_based_repo(blueprint_names[0] if len(blueprint_names) == 1 else None)
+            except Exception as e:
+                logger.debug(f"Unable to use local blueprint repo, validating remote blueprints. Details: {e}")
+
+        if validate_all:
+            try:
+                blueprint_names = sorted(repo.blueprints) if repo else [bp.name for bp in self.manager.list()]
             except Exception as e:
                 logger.exception(e, exc_info=False)
+                return self.die("Unable to get the list of blueprints")
+
+        with ContextBranch(repo, branch) as context_branch:
+            if not context_branch:
+                return self.die("Unable to Validate BP")
+            results = self._validate_concurrently(blueprint_names, context_branch.validation_branch, commit, parallel)
+
+        if len(blueprint_names) == 1 and not validate_all and not self.global_input_parser.output_json:
+            errors = results[blueprint_names[0]]
+            if errors is None:
                 return self.die()
+            if errors:
+                logger.info("Blueprint validation failed")
+                return self.die("\n".join(errors))
+            return self.success("Blueprint is valid")
 
-        errors = getattr(bp, "errors")
+        return self._validation_report(results)
 
-        if errors:
-            logger.info("Blueprint validation failed")
-            return self.die(errors)
+    def _validate_changed(self) -> (bool, Any):
+        parallel = self.input_parser.blueprint_validate.parallel
+        try:
+            repo = get_and_check_folder_based_repo()
+            content_hashes = {name: repo.get_blueprint_content_hash(name) for name in sorted(repo.blueprints)}
+        except Exception as e:
+            logger.exception(e, exc_info=False)
+            return self.die("Unable to find blueprints in the local repo")
+
+        cache = BlueprintValidationCache(self.client.space, GlobalInputParser.get_cache_dir())
+        changed = [name for name, content_hash in content_hashes.items() if not cache.is_valid(name, content_hash)]
+
+        results = {}
+        if changed:
+            with ContextBranch(repo, None) as context_branch:
+                if not context_branch:
+                    return self.die("Unable to Validate BP")
+                results = self._validate_concurrently(changed, context_branch.validation_branch, parallel=parallel)
+
+        for name, errors in results.items():
+            if errors is not None:
+                cache.store(name, content_hashes[name], errors)
+        cache.save()
+
+        results.update({name: [] for name in content_hashes if name not in changed})
+        return self._validation_report(results, cached=[name for name in content_hashes if name not in changed])
+
+    def _validation_report(self, results: Dict[str, List[str]], cached: List[str] = None) -> (bool, Any):
+        """Collect results of validation of several blueprints into a single report"""
+        report = []
+        for name in sorted(results):
+            errors = results[name]
+            if errors is None:
+                errors = ["Validation request failed"]
+            item = {"name": name, "valid": not errors, "errors": errors}
+            if cached is not None:
+                item["cached"] = name in cached
+            report.append(item)
+
+        invalid = len([item for item in report if not item["valid"]])
+        summary = {"total": len(report), "valid": len(report) - invalid, "invalid": invalid}
+        if cached is not None:
+            summary["cache"] = {"hits": len(cached), "misses": len(report) - len(cached)}
+
+        if self.global_input_parser.output_json:
+            return not invalid, {"blueprints": report, "summary": summary}
+
+        self.info(f"Validated {summary['total']} blueprints: {summary['valid']} valid, {summary['invalid']} invalid")
+        if cached is not None:
+            self.info(f"Cache hits: {summary['cache']['hits']}, cache misses: {summary['cache']['misses']}")
+
+        table = []
+        for item in report:
+            row = dict(item)
+            row["errors"] = "; ".join(item["errors"])
+            table.append(row)
+        return not invalid, table
+
+    def _validate_concurrently(
+        self, blueprints: List[str], branch: str, commit: str = None, parallel: int = None
+    ) -> Dict[str, List[str]]:
+        """Validate blueprints in parallel. Maps blueprint name to its errors or None if validation call failed"""
+        if not blueprints:
+            return {}
+
+        workers = min(parallel or DEFAULT_VALIDATION_WORKERS, len(blueprints))
+        self.client.session.set_pool_size(workers)
+
+        def validate(blueprint_name: str):
+            try:
+                bp = self.manager.validate(blueprint=blueprint_name, branch=branch, commit=commit)
+                return self._format_validation_errors(getattr(bp, "errors"))
+            except Exception as e:
+                logger.error(f"Unable to validate blueprint '{blueprint_name}'. Details: {e}")
+                return None
 
-        else:
-            return self.success("Blueprint is valid")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(blueprints, executor.map(validate, blueprints)))
+
+    @staticmethod
+    def _format_validation_errors(errors: list) -> List[str]:
+        return [err.get("message", str(err)) if isinstance(err, dict) else str(err) for err in errors or []]
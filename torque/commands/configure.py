@@ -120,13 +120,14 @@ class ConfigureCommand(BaseCommand):
 
             # read password
             password = self.input_parser.configure_set.password or getpass.getpass("Password: ")
+            if not password:
+                return self.die("Password cannot be empty")
 
             # get token
             try:
-                client = TorqueClient()
-                access_token = client.login(account, email, password)
-                client.session.init_bearer_auth(access_token)
-                token = client.longtoken()
+                # an explicit login always checks the credentials, the cached token of the account is not used
+                with TorqueClient(account=account, email=email, password=password, use_cached_token=False) as client:
+                    token = client.longtoken()
             except Exception as e:
                 logger.exception(e, exc_info=False)
                 return self.die()
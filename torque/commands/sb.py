@@ -1,11 +1,26 @@
+import sqlite3
+import sys
+import time
+from itertools import chain
+from typing import Any, Callable, Optional
+
+from docopt import DocoptExit
+
 from torque.branch.branch_context import ContextBranch
 from torque.branch.branch_utils import get_and_check_folder_based_repo, logger
 from torque.commands.base import BaseCommand
+from torque.exceptions import AmbiguousSandboxError
 from torque.models.blueprints import BlueprintsManager
 from torque.parsers.command_input_validators import CommandInputValidator
-from torque.sandboxes import SandboxesManager
+from torque.parsers.global_input_parser import GlobalInputParser
+from torque.sandboxes import Sandbox, SandboxesManager
+from torque.services.sandbox_index import REFRESH_COUNT, SandboxIndex, looks_like_sandbox_id
+from torque.services.sandbox_watcher import SandboxWatcher
 from torque.services.sb_naming import generate_sandbox_name
+from torque.services.task_graph import TaskGraph
 from torque.services.waiter import Waiter
+from torque.utils import BlueprintRepo
+from torque.view.sandbox_watch_view import LiveTableView, TransitionsView
 
 
 class SandboxesCommand(BaseCommand):
@@ -13,9 +28,14 @@ class SandboxesCommand(BaseCommand):
     usage:
         torque (sb | sandbox) start <blueprint_name> [options] [--output=json]
         torque (sb | sandbox) status <sandbox_id> [--output=json]
-        torque (sb | sandbox) get <sandbox_id> [--output=json | --output=json --detail]
+        torque (sb | sandbox) get <sandbox_id> [--output=json | --output=json --detail] [--fields=<fields>]
+                                               [--query=<query>]
         torque (sb | sandbox) end <sandbox_id>
-        torque (sb | sandbox) list [--filter={all|my|auto}] [--show-ended] [--count=<N>] [--output=json]
+        torque (sb | sandbox) list [--filter={all|my|auto}] [--show-ended] [--status=<status>] [--count=<N>]
+                                   [--output=json] [--fields=<fields>] [--query=<query>] [--cached] [--since=<time>]
+        torque (sb | sandbox) search <text> [--show-ended] [--count=<N>] [--since=<time>] [--output=json]
+        torque (sb | sandbox) watch [<sandbox_ids>...] [--filter={all|my|auto}] [--show-ended] [--status=<status>]
+                                    [--count=<N>] [--interval=<seconds>] [--table] [--output=ndjson]
         torque (sb | sandbox) [--help]
 
     options:
@@ -52,13 +72,45 @@ class SandboxesCommand(BaseCommand):
                                         with an error) while the timeout is not reached. Default timeout is 30 minutes.
                                         The default timeout can be changed using the "timeout" flag.
 
-       -o --output=json                 Yield output in JSON format
+       -o --output=json                 Yield output in JSON format. Use --output=ndjson to stream one compact JSON
+                                        object per line as soon as items arrive
+
+       --detail                         Obtain full sandbox data in JSON format
+
+       --fields=<fields>                Comma-separated list of (dotted) paths of the sandbox API document to keep in
+                                        the output, e.g. --fields=details.id,details.computed_status
+
+       --query=<query>                  JMESPath-like expression applied to the output,
+                                        e.g. --query="[?blueprint_name=='web'].id"
+
+       --status=<status>                Only sandboxes in the given comma-separated statuses (case insensitive),
+                                        e.g. --status=Launching,"Active With Error". Ended sandboxes are listed only
+                                        if requested with --show-ended or --status
+
+       --cached                         List sandboxes from the local index instead of the API. The index is updated
+                                        by sandbox commands and refreshed in background when it is older than a minute
+
+       --since=<time>                   Only sandboxes started since the given time, relative (30m, 2h, 1d, 1w) or
+                                        ISO 8601 (2021-05-01T10:00). Answered from the local index
+
+       --interval=<seconds>             Seconds between refreshes of watched sandboxes [default: 5]
+
+       --table                          Keep a table of the watched sandboxes up to date in place instead of printing
+                                        a line for every status change (on terminals)
+
+       <sandbox_id>                     Sandbox id, a unique prefix of it or the sandbox name
+
+       <sandbox_ids>                    Sandboxes (given like <sandbox_id>) watched until none of them is launching or
+                                        terminating. Without them sandboxes matching the filters are watched until
+                                        interrupted
 
 
     """
 
     RESOURCE_MANAGER = SandboxesManager
 
+    SINGLE_PROFILE_ACTIONS = ["start", "watch"]
+
     def get_actions_table(self) -> dict:
         return {
             "status": self.do_status,
@@ -66,54 +118,126 @@ class SandboxesCommand(BaseCommand):
             "end": self.do_end,
             "list": self.do_list,
             "get": self.do_get,
+            "search": self.do_search,
+            "watch": self.do_watch,
         }
 
     def do_list(self):
         list_filter = self.input_parser.sandbox_list.filter
         show_ended = self.input_parser.sandbox_list.show_ended
+        statuses = self.input_parser.sandbox_list.statuses
         count = self.input_parser.sandbox_list.count
+        since = self.input_parser.sandbox_list.since
+        fields = self.global_input_parser.fields
+
+        if self.input_parser.sandbox_list.cached or since is not None:
+            if list_filter == "auto":
+                raise DocoptExit("--filter=auto is not supported for the local sandbox index")
+            return self._query_index(lambda index: index.list(list_filter, show_ended, count, since, statuses))
 
         try:
-            sandbox_list = self.manager.list(filter_opt=list_filter, count=count)
+            if self.global_input_parser.output_ndjson:
+                # the first sandbox is fetched right away to report request errors, the rest is streamed lazily
+                items = self.manager.list_items(
+                    filter_opt=list_filter, count=count, fields=fields, show_ended=show_ended, statuses=statuses
+                )
+                first = next(items, None)
+                sandbox_list = chain([first], items) if first is not None else []
+            else:
+                # a single request when the server filters by status, more pages only if it does not
+                pages = self.manager.list_pages(
+                    filter_opt=list_filter,
+                    count=count,
+                    page_size=count,
+                    fields=fields,
+                    show_ended=show_ended,
+                    statuses=statuses,
+                )
+                sandbox_list = list(chain.from_iterable(pages))
         except Exception as e:
             logger.exception(e, exc_info=False)
             return self.die()
 
-        if not show_ended:
-            sandbox_list = list(filter(lambda sb: sb.sandbox_status != "Ended", sandbox_list))
+        if not self.global_input_parser.output_ndjson:
+            self._update_index(lambda index: index.upsert(sandbox_list, mine=list_filter == "my"))
 
         return True, sandbox_list
 
+    def do_search(self):
+        text = self.input_parser.sandbox_search.text
+        show_ended = self.input_parser.sandbox_search.show_ended
+        count = self.input_parser.sandbox_search.count
+        since = self.input_parser.sandbox_search.since
+        return self._query_index(lambda index: index.search(text, show_ended, count, since))
+
+    def do_watch(self):
+        watch_input = self.input_parser.sandbox_watch
+        interval = watch_input.interval
+        try:
+            # resolved once, the same sandbox given twice is watched once
+            sandbox_ids = list(dict.fromkeys(self._resolve_sandbox_id(ref) for ref in watch_input.sandbox_ids))
+            watcher = SandboxWatcher(
+                self.manager,
+                sandbox_ids,
+                list_filter=watch_input.filter,
+                show_ended=watch_input.show_ended,
+                statuses=watch_input.statuses,
+                count=watch_input.count,
+            )
+            events = chain(watcher.poll(), watcher.follow(interval))
+        except Exception as e:
+            logger.exception(e, exc_info=False)
+            return self.die()
+
+        try:
+            if self.global_input_parser.output_json:
+                self.output_formatter.write_ndjson(events, sys.stdout)
+            else:
+                view = LiveTableView() if watch_input.table and sys.stdout.isatty() else TransitionsView()
+                for event in events:
+                    view.show(event)
+        except KeyboardInterrupt:
+            pass
+
+        self._update_index(lambda index: index.upsert(list(watcher.sandboxes.values())))
+        return True, None
+
     def do_status(self):
         try:
-            sandbox = self.manager.get(self.input_parser.sandbox_status.sandbox_id)
+            sandbox = self.manager.get(self._resolve_sandbox_id(self.input_parser.sandbox_status.sandbox_id))
         except Exception as e:
             logger.exception(e, exc_info=False)
             return self.die()
 
+        self._update_index(lambda index: index.upsert([sandbox]))
         status = getattr(sandbox, "sandbox_status")
         return True, status
 
     def do_get(self):
+        fields = self.global_input_parser.fields
         try:
-            detail = self.input_parser.blueprint_list.detail
-            if detail:
-                sandbox = self.manager.get_detailed(self.input_parser.sandbox_status.sandbox_id)
-            else:
-                sandbox = self.manager.get(self.input_parser.sandbox_status.sandbox_id)
+            sandbox_id = self._resolve_sandbox_id(self.input_parser.sandbox_status.sandbox_id)
+            sandbox = self.manager.get(sandbox_id, fields=fields)
         except Exception as e:
             logger.exception(e, exc_info=False)
             return self.die()
 
+        self._update_index(lambda index: index.upsert([sandbox]))
+
+        if self.input_parser.blueprint_list.detail:
+            return True, sandbox.detail_serialize()
         return True, sandbox
 
     def do_end(self):
         try:
-            self.manager.end(self.input_parser.sandbox_status.sandbox_id)
+            sandbox_id = self._resolve_sandbox_id(self.input_parser.sandbox_status.sandbox_id)
+            self.manager.end(sandbox_id)
         except Exception as e:
             logger.exception(e, exc_info=False)
             return self.die()
 
+        self._update_index(lambda index: index.set_status(sandbox_id, "Terminating"))
+
         return self.success("End request has been sent")
 
     def do_start(self):
@@ -133,24 +257,29 @@ class SandboxesCommand(BaseCommand):
         duration = self.input_parser.sandbox_start.duration
         inputs = self.input_parser.sandbox_start.inputs
 
-        if not branch:
-            try:
-                repo = get_and_check_folder_based_repo(blueprint_name)
-            except Exception:
-                # self.info(
-                #     "Since the blueprint repo was not found in the local working directory, trying to find blueprint "
-                #     "remotely and start it from the default branch."
-                # )
-                repo = None
-            try:
-                self._update_missing_inputs_with_default_values(blueprint_name, inputs, repo)
-            except Exception as e:
-                logger.exception(e, exc_info=False)
-                return self.die(f"Unable to start sandbox from blueprint '{blueprint_name}'")
-        else:
-            repo = None
+        stages = self._start_stages(blueprint_name, branch, commit)
+        try:
+            defaults = stages.result("local_defaults")
+            if defaults is None:
+                defaults = stages.result("remote_defaults")
+            if defaults is None:
+                # the blueprint can't be read from the local repo at the launched revision
+                defaults = self._get_remote_default_inputs(blueprint_name)
+            for name, value in defaults.items():
+                if name not in inputs:
+                    logger.debug(f"Parameter `{name}` has been set with default value `{value}`")
+                    inputs[name] = value
+            context_branch = stages.result("branch")
+        except Exception as e:
+            logger.exception(e, exc_info=False)
+            self._exit_branch(stages)
+            self._close_repo(stages)
+            return self.die(f"Unable to start sandbox from blueprint '{blueprint_name}'")
+        finally:
+            stages.close()
+            logger.debug(stages.breakdown())
 
-        with ContextBranch(repo, branch) as context_branch:
+        try:
             # TODO move error handling to exception catch (investigate best practices of error handling)
 
             if sandbox_name is None:
@@ -178,6 +307,7 @@ class SandboxesCommand(BaseCommand):
                 logger.exception(e, exc_info=False)
                 return self.die()
 
+            self._index_started_sandbox(sandbox_id, sandbox_name, blueprint_name)
             wait_timeout_reached = Waiter.wait_for_sandbox_to_launch(
                 self,
                 self.manager,
@@ -193,35 +323,210 @@ class SandboxesCommand(BaseCommand):
                 return True, sandbox_id
             else:
                 return self.success(sandbox_id)
+        finally:
+            context_branch.__exit__(None, None, None)
+            self._close_repo(stages)
+
+    @staticmethod
+    def _exit_branch(stages: TaskGraph) -> None:
+        """Revert the local changes and remove the temp branch, when it has been created"""
+        try:
+            context_branch = stages.result("branch")
+        except Exception:
+            return
+        context_branch.__exit__(None, None, None)
 
-    def _update_missing_inputs_with_default_values(self, blueprint_name, inputs, repo):
-        # TODO(ddovbii): This obtaining default values magic must be refactored
+    @staticmethod
+    def _close_repo(stages: TaskGraph) -> None:
+        try:
+            repo = stages.result("repo")
+        except Exception:
+            return
         if repo is not None:
-            logger.debug("Trying to obtain default values for inputs from local git blueprint repo")
+            repo.close()
+
+    def _start_stages(self, blueprint_name: str, branch: str, commit: str) -> TaskGraph:
+        """Stages preparing a sandbox start. Default inputs are read from git objects at the revision the sandbox is
+        launched from, so they come after the (temp) branch is prepared. The connection to the API is opened and the
+        blueprint is fetched (only when there is no local repo) at the same time. Stages after the branch one never
+        raise, so the temp branch is there to be removed whenever a stage fails:
+
+            connect ──────────────┬─> remote_defaults
+            repo ─┬───────────────┘
+                  └─> branch ─> local_defaults
+        """
+        stages = TaskGraph("sb.start")
+
+        def enter_branch() -> ContextBranch:
+            context_branch = ContextBranch(None if branch else stages.result("repo"), branch)
+            if context_branch.__enter__() is None:
+                raise Exception("Unable to create a temporary branch with the local changes")
+            return context_branch
+
+        def get_local_defaults() -> Optional[dict]:
+            repo = stages.result("repo")
+            if repo is None:
+                return None
             try:
-                if not repo.is_current_branch_synced():
-                    logger.debug("Skipping obtaining values since local branch is not synced with remote")
-                else:
-                    for input_name, input_value in repo.get_blueprint_default_inputs(blueprint_name).items():
-                        if input_name not in inputs and input_value is not None:
-                            logger.debug(f"Parameter `{input_name}` has been set with default value `{input_value}`")
-                            inputs[input_name] = input_value
-
+                revision = self._launched_revision(repo, stages.result("branch"), commit)
             except Exception as e:
-                logger.debug(f"Unable to obtain default values. Details: {e}")
-        else:
-            bp_manager = BlueprintsManager(client=self.client)
+                logger.debug(f"Unable to find the launched git revision. Details: {e}")
+                return None
+            return self._get_local_default_inputs(blueprint_name, repo, revision)
+
+        stages.add("connect", self.client.warm_up)
+        stages.add("repo", lambda: self._find_repo(blueprint_name))
+        stages.add(
+            "remote_defaults",
+            lambda: None if stages.result("repo") else self._get_remote_default_inputs(blueprint_name),
+            after=["repo", "connect"],
+        )
+        stages.add("branch", enter_branch, after=["repo"])
+        stages.add("local_defaults", get_local_defaults, after=["branch"])
+        return stages
+
+    def _open_index(self) -> SandboxIndex:
+        return SandboxIndex(self.client.space, GlobalInputParser.get_cache_dir())
+
+    def _query_index(self, query: Callable[[SandboxIndex], list]):
+        try:
+            index = self._open_index()
+        except (sqlite3.Error, OSError) as e:
+            logger.exception(e, exc_info=False)
+            return self.die("Unable to open the local sandbox index")
+
+        try:
+            if index.refreshed_at is None and not index.list(show_ended=True, count=1):
+                # the very first query has nothing to answer from
+                index.refresh(self.manager)
+            elif index.is_stale() and self.client.cassette is None and getattr(self.client, "token", None):
+                index.refresh_in_background(self.client.token, self.client.account)
+            return True, index.to_sandboxes(self.manager, query(index))
+        except Exception as e:
+            logger.exception(e, exc_info=False)
+            return self.die()
+        finally:
+            index.close()
+
+    def _update_index(self, update: Callable[[SandboxIndex], Any]) -> None:
+        """Keep the local index current, it is a cache so failures never affect the command"""
+        try:
+            index = self._open_index()
             try:
-                blueprint_object = bp_manager.get_detailed(blueprint_name)
-            except Exception as e:
-                raise Exception(f"Unable to get details of blueprint '{blueprint_name}'. Details: {e}")
-            bp_props = blueprint_object.get("details", None) or blueprint_object
+                update(index)
+            finally:
+                index.close()
+        except (sqlite3.Error, OSError) as e:
+            logger.debug(f"Unable to update the local sandbox index. Details: {e}")
+
+    def _resolve_sandbox_id(self, reference: str) -> str:
+        """Find the id of a sandbox given by its id, a unique id prefix or its name. The local index is consulted
+        first. When it knows nothing matching, a reference shaped like a whole id is requested directly, and
+        sandboxes are listed from the server only if there is no such sandbox. A name matched by a sandbox which was
+        not seen on the server recently is checked to still point at a live sandbox"""
+        try:
+            index = self._open_index()
+        except (sqlite3.Error, OSError) as e:
+            logger.debug(f"Unable to open the local sandbox index. Details: {e}")
+            return reference
+
+        try:
+            candidates = index.resolve(reference)
+            if not candidates and looks_like_sandbox_id(reference) and self._fetch_to_index(index, reference):
+                return reference
+            if self._is_outdated_name_match(index, reference, candidates):
+                candidates = []
+            if not candidates:
+                index.upsert(self.manager.list(count=REFRESH_COUNT, filter_opt="all"))
+                candidates = index.resolve(reference)
+        except sqlite3.Error as e:
+            logger.debug(f"Unable to resolve '{reference}' using the local sandbox index. Details: {e}")
+            return reference
+        finally:
+            index.close()
+
+        if not candidates:
+            # let the server decide, e.g. an id of a sandbox too old to be listed
+            return reference
+        if len(candidates) > 1:
+            matches = ", ".join(f"{sandbox_id} ({name})" for sandbox_id, name, *_ in candidates)
+            raise AmbiguousSandboxError(f"'{reference}' matches several sandboxes: {matches}. Use a longer id prefix")
+        if candidates[0][0] != reference:
+            logger.debug(f"Sandbox '{reference}' resolved to id '{candidates[0][0]}'")
+        return candidates[0][0]
+
+    def _fetch_to_index(self, index: SandboxIndex, sandbox_id: str) -> Optional[Sandbox]:
+        """Request the sandbox by its id and keep it in the index, None when the server does not know it"""
+        try:
+            sandbox = self.manager.get(sandbox_id)
+        except Exception as e:
+            logger.debug(f"Unable to get sandbox '{sandbox_id}'. Details: {e}")
+            return None
+        index.upsert([sandbox])
+        return sandbox
+
+    def _is_outdated_name_match(self, index: SandboxIndex, reference: str, candidates: list) -> bool:
+        if len(candidates) != 1:
+            return False
+        sandbox_id, name, _, status, *_ = candidates[0]
+        if name != reference or sandbox_id == reference or not index.is_outdated(sandbox_id):
+            return False
+
+        # the sandbox may be gone or ended meanwhile, and a newer one with the same name not indexed yet
+        sandbox = self._fetch_to_index(index, sandbox_id)
+        if sandbox is None:
+            index.set_status(sandbox_id, "Ended")
+            return True
+        return sandbox.sandbox_status == "Ended" and status != "Ended"
+
+    def _index_started_sandbox(self, sandbox_id: str, sandbox_name: str, blueprint_name: str) -> None:
+        sandbox = Sandbox(self.manager, sandbox_id, sandbox_name, blueprint_name)
+        sandbox.sandbox_status = "Launching"
+        sandbox.start_time = time.time()
+        self._update_index(lambda index: index.upsert([sandbox], mine=True))
+
+    @staticmethod
+    def _find_repo(blueprint_name: str) -> Optional[BlueprintRepo]:
+        try:
+            return get_and_check_folder_based_repo(blueprint_name)
+        except Exception:
+            # self.info(
+            #     "Since the blueprint repo was not found in the local working directory, trying to find blueprint "
+            #     "remotely and start it from the default branch."
+            # )
+            return None
+
+    @staticmethod
+    def _launched_revision(repo: BlueprintRepo, context_branch: ContextBranch, commit: Optional[str]) -> str:
+        """Git revision the sandbox is started from: the given commit, the temp branch with the local changes or the
+        remote branch (which the local one is synced with when there is no temp branch)"""
+        if commit:
+            return commit
+        if context_branch.temp_working_branch:
+            return f"refs/heads/{context_branch.temp_working_branch}"
+        return f"refs/remotes/{repo.remote().name}/{context_branch.working_branch}"
+
+    @staticmethod
+    def _get_local_default_inputs(blueprint_name: str, repo: BlueprintRepo, revision: str) -> Optional[dict]:
+        """Default inputs of the blueprint at the git revision, None when it can't be read from the local repo"""
+        logger.debug(f"Trying to obtain default values for inputs from git revision '{revision}'")
+        try:
+            defaults = repo.get_blueprint_default_inputs(blueprint_name, revision)
+            return {name: value for name, value in defaults.items() if value is not None}
+        except Exception as e:
+            logger.debug(f"Unable to obtain default values. Details: {e}")
+            return None
 
-            for inp in bp_props.get("inputs", []):
-                name = inp["name"]
-                default = inp.get("default_value", None)
-                if name not in inputs and default is not None:
-                    logger.debug(f"Parameter `{name}` has been set with default value `{default}")
-                    inputs[name] = default
+    def _get_remote_default_inputs(self, blueprint_name: str) -> dict:
+        bp_manager = BlueprintsManager(client=self.client)
+        try:
+            blueprint_object = bp_manager.get_detailed(blueprint_name)
+        except Exception as e:
+            raise Exception(f"Unable to get details of blueprint '{blueprint_name}'. Details: {e}")
+        bp_props = blueprint_object.get("details", None) or blueprint_object
 
-        return repo
+        return {
+            inp["name"]: inp["default_value"]
+            for inp in bp_props.get("inputs", [])
+            if inp.get("default_value") is not None
+        }
@@ -12,3 +12,15 @@ class ConfigFileMissingError(ConfigError):
 
 class BadBlueprintRepo(Exception):
     pass
+
+
+class QueryError(Exception):
+    pass
+
+
+class CassetteError(Exception):
+    pass
+
+
+class AmbiguousSandboxError(Exception):
+    pass
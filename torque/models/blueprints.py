@@ -1,37 +1,77 @@
 from typing import Any, List
 
 from torque.base import Resource, ResourceManager
+from torque.services.projection import flatten, project_fields
+
+# keys read by the attributes, at the top level or under "details" of spec2 documents
+_ATTRIBUTE_KEYS = ["blueprint_name", "name", "url", "enabled", "errors", "description"]
+_ATTRIBUTE_PATHS = [[key] for key in _ATTRIBUTE_KEYS] + [["details", key] for key in _ATTRIBUTE_KEYS]
 
 
 class Blueprint(Resource):
+    """Blueprint backed by the API document it was created from, attributes are read from it on access. When fields
+    are given, only those and the keys read by the attributes are kept"""
+
+    __slots__ = ("_raw", "fields")
+
     def __init__(self, manager: ResourceManager, name: str, url: str, enabled: bool):
         super(Blueprint, self).__init__(manager)
 
-        self.name = name
-        self.url = url
-        self.enabled = enabled
+        self._raw = {"name": name, "url": url, "enabled": enabled}
+        self.fields = None
 
     @classmethod
-    def json_deserialize(cls, manager: ResourceManager, json_obj: dict):
-        try:
-            # spec2 check
-            if "details" in json_obj:
-                json_obj = json_obj["details"]
-            bp = Blueprint(
-                manager,
-                json_obj.get("blueprint_name", None) or json_obj.get("name", None),
-                json_obj.get("url", None),
-                json_obj.get("enabled", True),
-            )
-        except KeyError as e:
-            raise NotImplementedError(f"unable to create object. Missing keys in Json. Details: {e}")
-
-        # TODO(ddovbii): set all needed attributes
-        bp.errors = json_obj.get("errors", [])
-        bp.description = json_obj.get("description", "")
+    def json_deserialize(cls, manager: ResourceManager, json_obj: dict, fields: List[List[str]] = None):
+        if not isinstance(json_obj, dict):
+            raise NotImplementedError(f"unable to create object. Unexpected Json: {json_obj}")
+
+        bp = cls.__new__(cls)
+        bp.manager = manager
+        bp._raw = project_fields(json_obj, fields + _ATTRIBUTE_PATHS) if fields else json_obj
+        bp.fields = fields or None
         return bp
 
+    @property
+    def _details(self) -> dict:
+        # spec2 documents keep blueprint data under "details"
+        return self._raw.get("details", self._raw)
+
+    @property
+    def name(self) -> str:
+        return self._details.get("blueprint_name", None) or self._details.get("name", None)
+
+    @property
+    def url(self) -> str:
+        return self._details.get("url", None)
+
+    @property
+    def enabled(self) -> bool:
+        return self._details.get("enabled", True)
+
+    @property
+    def errors(self) -> list:
+        return self._details.get("errors", [])
+
+    @property
+    def description(self) -> str:
+        return self._details.get("description", "")
+
+    @property
+    def raw(self) -> dict:
+        return self._raw
+
+    @property
+    def projected(self) -> Any:
+        return project_fields(self._raw, self.fields) if self.fields else None
+
+    def detail_serialize(self) -> Any:
+        """The whole API document, or the requested fields of it"""
+        return project_fields(self._raw, self.fields)
+
     def json_serialize(self) -> dict:
+        if self.fields:
+            return self.projected
+
         return {
             "name": self.name,
             "url": self.url,
@@ -39,6 +79,9 @@ class Blueprint(Resource):
         }
 
     def table_serialize(self) -> dict:
+        if self.fields:
+            return flatten(self.projected)
+
         return {
             "name": self.name,
             "enabled": self.enabled,
@@ -48,26 +91,24 @@ class Blueprint(Resource):
 class BlueprintsManager(ResourceManager):
     resource_obj = Blueprint
 
-    def get(self, blueprint_name: str) -> Blueprint:
+    def get(self, blueprint_name: str, fields: List[List[str]] = None) -> Blueprint:
         bp_json = self._get_blueprint(blueprint_name)
-        return Blueprint.json_deserialize(self, bp_json)
+        return Blueprint.json_deserialize(self, bp_json, fields)
 
-    def get_detailed(self, blueprint_name):
-        return self._get_blueprint(blueprint_name)
+    def get_detailed(self, blueprint_name, fields: List[List[str]] = None):
+        return self.get(blueprint_name, fields).detail_serialize()
 
     def _get_blueprint(self, blueprint_name):
         url = f"catalog/{blueprint_name}"
         return self._get(url)
 
-    def list(self) -> List[Blueprint]:
+    def list(self, fields: List[List[str]] = None) -> List[Blueprint]:
         url = "blueprints"
         result_json = self._list(path=url)
-        return [self.resource_obj.json_deserialize(self, obj) for obj in result_json]
+        return [self.resource_obj.json_deserialize(self, obj, fields) for obj in result_json]
 
-    def list_detailed(self) -> Any:
-        url = "blueprints"
-        result_json = self._list(path=url)
-        return result_json
+    def list_detailed(self, fields: List[List[str]] = None) -> Any:
+        return [bp.detail_serialize() for bp in self.list(fields)]
 
     def validate(self, blueprint: str, env_type: str = "sandbox", branch: str = None, commit: str = None) -> Blueprint:
         url = "validations/blueprints"
@@ -1,5 +1,6 @@
 class TorqueConnection(object):
-    def __init__(self, space: str, token: str, account: str):
+    def __init__(self, space: str, token: str, account: str, profile: str = None):
         self.space = space
         self.token = token
         self.account = account
+        self.profile = profile
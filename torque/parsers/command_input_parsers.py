@@ -1,7 +1,13 @@
 from abc import ABC
-from typing import Dict
-
-from torque.parsers.command_input_validators import SandboxListValidator, SandboxStartInputValidator
+from typing import Dict, List, Optional
+
+from torque.parsers.command_input_validators import (
+    BenchInputValidator,
+    BlueprintValidateInputValidator,
+    SandboxListValidator,
+    SandboxStartInputValidator,
+    SandboxWatchInputValidator,
+)
 from torque.utils import parse_comma_separated_string
 
 
@@ -13,6 +19,8 @@ class CommandInputParser:
         """
         self.sandbox_start = SandboxStartInputParser(command_args)
         self.sandbox_list = SandboxListInputParser(command_args)
+        self.sandbox_search = SandboxSearchInputParser(command_args)
+        self.sandbox_watch = SandboxWatchInputParser(command_args)
         self.sandbox_end = SandboxEndInputParser(command_args)
         self.sandbox_status = SandboxStatusInputParser(command_args)
         self.blueprint_list = BlueprintListInputParser(command_args)
@@ -20,6 +28,7 @@ class CommandInputParser:
         self.blueprint_get = BlueprintGetInputParser(command_args)
         self.configure_set = ConfigureSetInputParser(command_args)
         self.configure_remove = ConfigureRemoveInputParser(command_args)
+        self.bench = BenchInputParser(command_args)
 
 
 class InputParserBase(ABC):
@@ -77,8 +86,18 @@ class BlueprintGetInputParser(BlueprintListInputParser):
 
 class BlueprintValidateInputParser(InputParserBase):
     @property
-    def blueprint_name(self) -> str:
-        return self._args.get("<name>")
+    def blueprint_names(self) -> List[str]:
+        return self._args.get("<blueprint_name>") or []
+
+    @property
+    def all(self) -> bool:
+        return self._args.get("--all", False)
+
+    @property
+    def parallel(self) -> int:
+        parallel = self._args.get("--parallel")
+        BlueprintValidateInputValidator.validate_parallel(parallel)
+        return int(parallel) if parallel is not None else None
 
     @property
     def branch(self) -> str:
@@ -88,6 +107,10 @@ class BlueprintValidateInputParser(InputParserBase):
     def commit(self) -> str:
         return self._args.get("--commit")
 
+    @property
+    def changed(self) -> bool:
+        return self._args.get("--changed", False)
+
 
 class SandboxEndInputParser(InputParserBase):
     @property
@@ -116,13 +139,51 @@ class SandboxListInputParser(InputParserBase):
 
     @property
     def count(self) -> int:
-        return self._args.get("--count", 25)
+        count = self._args.get("--count")
+        SandboxListValidator.validate_count(count)
+        return int(count or 25)
+
+    @property
+    def statuses(self) -> List[str]:
+        statuses = self._args.get("--status")
+        return [status.strip() for status in statuses.split(",") if status.strip()] if statuses else []
+
+    @property
+    def cached(self) -> bool:
+        return self._args.get("--cached", False)
+
+    @property
+    def since(self) -> Optional[float]:
+        since = self._args.get("--since")
+        return SandboxListValidator.validate_since(since) if since is not None else None
 
     # @property
     # def sandbox_id(self) -> str:
     #     return self._args["<sandbox_id>"]
 
 
+class SandboxSearchInputParser(SandboxListInputParser):
+    @property
+    def text(self) -> str:
+        return self._args["<text>"]
+
+
+class SandboxWatchInputParser(SandboxListInputParser):
+    @property
+    def sandbox_ids(self) -> List[str]:
+        return self._args.get("<sandbox_ids>") or []
+
+    @property
+    def interval(self) -> float:
+        interval = self._args.get("--interval")
+        SandboxWatchInputValidator.validate_interval(interval)
+        return float(interval or 5)
+
+    @property
+    def table(self) -> bool:
+        return self._args.get("--table", False)
+
+
 class SandboxStartInputParser(InputParserBase):
     @property
     def blueprint_name(self) -> str:
@@ -159,3 +220,41 @@ class SandboxStartInputParser(InputParserBase):
     @property
     def inputs(self) -> dict:
         return parse_comma_separated_string(self._args["--inputs"])
+
+
+class BenchInputParser(InputParserBase):
+    @property
+    def mix(self) -> Dict[str, int]:
+        return BenchInputValidator.validate_mix(self._args.get("--mix") or "list=80,get=20")
+
+    @property
+    def concurrency(self) -> int:
+        concurrency = self._args.get("--concurrency")
+        BenchInputValidator.validate_positive_number("Concurrency", concurrency)
+        return int(concurrency or 4)
+
+    @property
+    def rate(self) -> float:
+        rate = self._args.get("--rate")
+        BenchInputValidator.validate_positive_number("Rate", rate, number_type=float)
+        return float(rate) if rate is not None else None
+
+    @property
+    def requests(self) -> int:
+        requests = self._args.get("--requests")
+        BenchInputValidator.validate_positive_number("Requests", requests)
+        return int(requests or 100)
+
+    @property
+    def time(self) -> float:
+        time = self._args.get("--time")
+        BenchInputValidator.validate_positive_number("Time", time, number_type=float)
+        return float(time) if time is not None else None
+
+    @property
+    def blueprint(self) -> str:
+        return self._args.get("--blueprint")
+
+    @property
+    def local(self) -> bool:
+        return self._args.get("--local", False)
@@ -1,5 +1,10 @@
+from typing import Callable, Dict
+
 from docopt import DocoptExit
 
+from torque.services.load_generator import parse_mix
+from torque.services.sandbox_index import parse_since
+
 
 # generic/shared validations
 class CommandInputValidator:
@@ -15,6 +20,50 @@ class SandboxListValidator:
         if value not in ["my", "all", "auto"]:
             raise DocoptExit("--filter value must be in [my, all, auto]")
 
+    @staticmethod
+    def validate_count(count: str):
+        if count is not None:
+            try:
+                count = int(count)
+            except ValueError:
+                raise DocoptExit("Count must be a number")
+
+            if count <= 0:
+                raise DocoptExit("Count must be positive")
+
+    @staticmethod
+    def validate_since(since: str) -> float:
+        try:
+            return parse_since(since)
+        except ValueError as e:
+            raise DocoptExit(str(e))
+
+
+class SandboxWatchInputValidator:
+    @staticmethod
+    def validate_interval(interval: str):
+        if interval is not None:
+            try:
+                interval = float(interval)
+            except ValueError:
+                raise DocoptExit("Interval must be a number")
+
+            if interval <= 0:
+                raise DocoptExit("Interval must be positive")
+
+
+class BlueprintValidateInputValidator:
+    @staticmethod
+    def validate_parallel(parallel: str):
+        if parallel is not None:
+            try:
+                parallel = int(parallel)
+            except ValueError:
+                raise DocoptExit("Parallel must be a number")
+
+            if parallel <= 0:
+                raise DocoptExit("Parallel must be positive")
+
 
 class SandboxStartInputValidator:
     @staticmethod
@@ -37,3 +86,23 @@ class SandboxStartInputValidator:
                     raise DocoptExit("Duration must be positive")
             except ValueError:
                 raise DocoptExit("Duration must be a number")
+
+
+class BenchInputValidator:
+    @staticmethod
+    def validate_mix(mix: str) -> Dict[str, int]:
+        try:
+            return parse_mix(mix)
+        except ValueError as e:
+            raise DocoptExit(f"Invalid --mix value. {e}")
+
+    @staticmethod
+    def validate_positive_number(name: str, value: str, number_type: Callable = int):
+        if value is not None:
+            try:
+                value = number_type(value)
+            except ValueError:
+                raise DocoptExit(f"{name} must be a number")
+
+            if value <= 0:
+                raise DocoptExit(f"{name} must be positive")
@@ -1,6 +1,11 @@
 import os
 from typing import Dict, List
 
+from docopt import DocoptExit
+
+from torque.exceptions import QueryError
+from torque.services.projection import Query, parse_fields
+
 
 class GlobalInputParser:
     def __init__(self, command_args: Dict):
@@ -26,6 +31,25 @@ class GlobalInputParser:
     def profile(self) -> str:
         return self._args.get("--profile", None)
 
+    @property
+    def profiles(self) -> List[str]:
+        """Profiles listed with --profiles, without duplicates"""
+        profiles = self._args.get("--profiles", None)
+        if not profiles:
+            return []
+        names = list(dict.fromkeys(name.strip() for name in profiles.split(",") if name.strip()))
+        if not names:
+            raise DocoptExit("--profiles must contain comma separated profile names")
+        return names
+
+    @property
+    def all_profiles(self) -> bool:
+        return self._args.get("--all-profiles", None)
+
+    @property
+    def multiple_profiles(self) -> bool:
+        return bool(self.all_profiles or self.profiles)
+
     @property
     def debug(self) -> str:
         return self._args.get("--debug", None)
@@ -34,6 +58,39 @@ class GlobalInputParser:
     def disable_version_check(self) -> str:
         return self._args.get("--disable-version-check", None)
 
+    @property
+    def trace(self) -> bool:
+        return self._args.get("--trace", None)
+
+    @property
+    def trace_file(self) -> str:
+        return self._args.get("--trace-file", None)
+
+    @property
+    def stats(self) -> bool:
+        return self._args.get("--stats", None)
+
+    @property
+    def record(self) -> str:
+        return self._args.get("--record", None)
+
+    @property
+    def replay(self) -> str:
+        return self._args.get("--replay", None)
+
+    @property
+    def replay_speed(self) -> float:
+        speed = self._args.get("--replay-speed", None)
+        if speed is None:
+            return 0
+        try:
+            speed = float(speed)
+        except ValueError:
+            raise DocoptExit("Replay speed must be a number")
+        if speed < 0:
+            raise DocoptExit("Replay speed must not be negative")
+        return speed
+
     @property
     def command(self) -> str:
         return self._args.get("<command>", None)
@@ -46,6 +103,31 @@ class GlobalInputParser:
     def get_config_path() -> str:
         return os.environ.get("TORQUE_CONFIG_PATH", None)
 
+    @staticmethod
+    def get_cache_dir() -> str:
+        return os.environ.get("TORQUE_CACHE_DIR", None)
+
     @property
     def output_json(self) -> bool:
-        return self._args.get("--output", None) == "json"
+        return self._args.get("--output", None) in ("json", "ndjson")
+
+    @property
+    def output_ndjson(self) -> bool:
+        return self._args.get("--output", None) == "ndjson"
+
+    @property
+    def fields(self) -> List[List[str]]:
+        try:
+            return parse_fields(self._args.get("--fields", None))
+        except QueryError as e:
+            raise DocoptExit(f"Invalid --fields value. {e}")
+
+    @property
+    def query(self) -> Query:
+        query = self._args.get("--query", None)
+        if not query:
+            return None
+        try:
+            return Query(query)
+        except QueryError as e:
+            raise DocoptExit(f"Invalid --query expression. {e}")
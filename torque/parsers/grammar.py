@@ -0,0 +1,292 @@
+"""
+Compiled docopt grammars.
+
+Parsing a usage docstring (and especially fixing up the resulting pattern) takes much longer than matching argv
+against it, yet docopt does both on every call. A Grammar keeps the parsed and fixed pattern in a JSON file keyed by
+the hash of the docstring in the user cache directory, so the docstring is only parsed again when it changes.
+
+Matching is short-circuited too: the outcome of docopt matching depends only on the "shape" of argv, i.e. which
+options are passed and which positional arguments are command names. The first match of every shape is recorded as a
+plan telling where each value of the result comes from; argv of a known shape is then answered from the plan without
+running the matcher. Plans are stored with the grammar, so common subcommands are fast from the second run on.
+
+Grammars precompiled next to the package are read as well, but never written by the CLI itself: their learned plans
+are saved to the user cache directory. Precompile the grammars of all commands, e.g. when building the package:
+
+    $ python -m torque.parsers.grammar
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import docopt as docopt_module
+from docopt import (
+    AnyOptions,
+    Argument,
+    Command,
+    DocoptExit,
+    Either,
+    OneOrMore,
+    Option,
+    Required,
+    TokenStream,
+    extras,
+    formal_usage,
+    parse_argv,
+    parse_defaults,
+    parse_pattern,
+    printable_usage,
+)
+
+GRAMMAR_FORMAT = 1
+GRAMMARS_DIR = Path(__file__).resolve().parent.parent / "_grammars"
+USER_GRAMMARS_DIR = "~/.torque/cache/grammars"
+# shapes of argv remembered per grammar
+MAX_PLANS = 256
+
+logger = logging.getLogger(__name__)
+
+_BRANCHES = {cls.__name__: cls for cls in (Required, docopt_module.Optional, AnyOptions, OneOrMore, Either)}
+_MARKER = "\0docopt-slot-{}\0"
+
+
+def grammar_key(doc: str) -> str:
+    content = f"{GRAMMAR_FORMAT}\n{docopt_module.__version__}\n{doc}"
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:24]
+
+
+def _option_to_json(option: Option) -> list:
+    return [option.short, option.long, option.argcount, option.value]
+
+
+def _compile(doc: str) -> dict:
+    """Parse the docstring the way docopt does and serialize the fixed pattern"""
+    usage = printable_usage(doc)
+    options = parse_defaults(doc)
+    pattern = parse_pattern(formal_usage(usage), options)
+    pattern_options = set(pattern.flat(Option))
+    for any_options in pattern.flat(AnyOptions):
+        any_options.children = sorted(set(parse_defaults(doc)) - pattern_options, key=lambda o: o.name)
+    pattern.fix()
+
+    # fixed pattern shares leaf objects between branches, the table keeps them shared after loading
+    leaves: List[list] = []
+    leaf_ids: Dict[int, int] = {}
+
+    def to_json(node):
+        if hasattr(node, "children"):
+            return {"branch": type(node).__name__, "children": [to_json(child) for child in node.children]}
+        if id(node) not in leaf_ids:
+            leaf_ids[id(node)] = len(leaves)
+            if type(node) is Option:
+                leaves.append(["Option"] + _option_to_json(node))
+            else:
+                leaves.append([type(node).__name__, node.name, node.value])
+        return leaf_ids[id(node)]
+
+    return {
+        "format": GRAMMAR_FORMAT,
+        "usage": usage,
+        "options": [_option_to_json(option) for option in options],
+        "commands": sorted({leaf.name for leaf in pattern.flat(Command)}),
+        "leaves": leaves,
+        "pattern": to_json(pattern),
+        "plans": {},
+    }
+
+
+class Grammar(object):
+    def __init__(self, doc: str, compiled: dict, path: Optional[Path] = None):
+        self.doc = doc
+        self.usage = compiled["usage"]
+        self.path = path
+        self._compiled = compiled
+        self._commands = set(compiled["commands"])
+        self._plans: Dict[str, list] = compiled["plans"]
+        self._pattern = None
+        self._lock = threading.Lock()
+
+    def parse(self, argv: List[str] = None, help: bool = True, version=None, options_first: bool = False) -> dict:
+        """Same as docopt.docopt() for the docstring of the grammar"""
+        if argv is None:
+            argv = sys.argv[1:]
+        DocoptExit.usage = self.usage
+        options = [Option(*option) for option in self._compiled["options"]]
+        parsed = parse_argv(TokenStream(argv, DocoptExit), options, options_first)
+        extras(help, version, parsed, self.doc)
+
+        shape = self._shape(parsed, options_first)
+        plan = self._plans.get(shape)
+        if plan is None:
+            plan = self._learn(parsed)
+            with self._lock:
+                if len(self._plans) < MAX_PLANS:
+                    self._plans[shape] = plan
+                    self._save()
+        return docopt_module.Dict((name, self._resolve(spec, parsed)) for name, spec in plan)
+
+    def _shape(self, parsed: list, options_first: bool) -> str:
+        parts = ["first" if options_first else "any"]
+        for item in parsed:
+            if type(item) is Option:
+                parts.append(f"{item.name}={item.argcount}")
+            elif item.value in self._commands:
+                parts.append(f"cmd:{item.value}")
+            else:
+                parts.append("arg")
+        return " ".join(parts)
+
+    def _learn(self, parsed: list) -> list:
+        """Match argv with values replaced by markers and record where each value of the result comes from"""
+        marked = []
+        for index, item in enumerate(parsed):
+            if type(item) is Option:
+                value = _MARKER.format(index) if item.argcount else item.value
+                marked.append(Option(item.short, item.long, item.argcount, value))
+            elif item.value in self._commands:
+                marked.append(Argument(None, item.value))
+            else:
+                marked.append(Argument(None, _MARKER.format(index)))
+
+        pattern = self._get_pattern()
+        matched, left, collected = pattern.match(marked)
+        if not matched or left:
+            raise DocoptExit()
+
+        markers = {_MARKER.format(index): index for index in range(len(parsed))}
+
+        def to_spec(value):
+            if isinstance(value, list):
+                return ["list", [to_spec(item) for item in value]]
+            if isinstance(value, str) and value in markers:
+                return ["slot", markers[value]]
+            return ["const", value]
+
+        result = docopt_module.Dict((leaf.name, leaf.value) for leaf in pattern.flat() + collected)
+        return [[name, to_spec(value)] for name, value in result.items()]
+
+    def _resolve(self, spec: list, parsed: list):
+        kind, value = spec
+        if kind == "slot":
+            return parsed[value].value
+        if kind == "list":
+            return [self._resolve(item, parsed) for item in value]
+        return value
+
+    def _get_pattern(self):
+        if self._pattern is None:
+            leaves = [_leaf_from_json(leaf) for leaf in self._compiled["leaves"]]
+
+            def from_json(node):
+                if isinstance(node, int):
+                    return leaves[node]
+                return _BRANCHES[node["branch"]](*[from_json(child) for child in node["children"]])
+
+            self._pattern = from_json(self._compiled["pattern"])
+        return self._pattern
+
+    def _save(self) -> None:
+        if self.path is not None:
+            _write(self.path, self._compiled)
+
+
+def _leaf_from_json(leaf: list):
+    kind, *args = leaf
+    if kind == "Option":
+        return Option(*args)
+    if kind == "Command":
+        return Command(*args)
+    return Argument(*args)
+
+
+def _write(path: Path, compiled: dict) -> bool:
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(temp_path, "w") as grammar_file:
+            json.dump(compiled, grammar_file, separators=(",", ":"))
+        os.replace(temp_path, path)
+        return True
+    except OSError as e:
+        logger.debug(f"Unable to save grammar to {path}. Details: {e}")
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        return False
+
+
+class GrammarStore(object):
+    """Grammars in memory and on disk. Grammars and their plans are saved to the first directory only, the others
+    (the precompiled grammars of the package) are read-only"""
+
+    def __init__(self, directories: List[Path] = None):
+        self.directories = directories
+        self._grammars: Dict[str, Grammar] = {}
+        self._lock = threading.Lock()
+
+    def _get_directories(self) -> List[Path]:
+        if self.directories is not None:
+            return self.directories
+        user_dir = os.path.join(os.environ["TORQUE_CACHE_DIR"], "grammars") if "TORQUE_CACHE_DIR" in os.environ else ""
+        return [Path(user_dir or USER_GRAMMARS_DIR).expanduser(), GRAMMARS_DIR]
+
+    def get(self, doc: str) -> Grammar:
+        key = grammar_key(doc)
+        with self._lock:
+            grammar = self._grammars.get(key)
+            if grammar is None:
+                grammar = self._grammars[key] = self._load(key, doc)
+            return grammar
+
+    def _load(self, key: str, doc: str) -> Grammar:
+        directories = self._get_directories()
+        save_path = directories[0] / f"{key}.json"
+        for directory in directories:
+            try:
+                with open(directory / f"{key}.json") as grammar_file:
+                    compiled = json.load(grammar_file)
+                if compiled.get("format") == GRAMMAR_FORMAT:
+                    return Grammar(doc, compiled, save_path)
+            except (OSError, ValueError):
+                continue
+
+        compiled = _compile(doc)
+        if _write(save_path, compiled):
+            return Grammar(doc, compiled, save_path)
+        return Grammar(doc, compiled)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._grammars.clear()
+
+
+grammar_store = GrammarStore()
+
+
+def docopt(doc: str, argv: List[str] = None, help: bool = True, version=None, options_first: bool = False) -> dict:
+    """Drop-in replacement of docopt.docopt() using the compiled grammar of the docstring"""
+    return grammar_store.get(doc).parse(argv, help, version, options_first)
+
+
+def _command_docs() -> List[Tuple[str, str]]:
+    from torque import shell
+
+    return [("torque", shell.__doc__)] + [(name, command.__doc__) for name, command in shell.commands_table.items()]
+
+
+def main() -> None:
+    store = GrammarStore([GRAMMARS_DIR])
+    for name, doc in _command_docs():
+        grammar = store.get(doc)
+        print(f"{name}: {grammar.path or 'not stored'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,99 @@
-from typing import List
+from typing import Callable, Iterator, List, Optional
 from urllib.parse import urlparse
 
 from .base import Resource, ResourceManager
+from .services.projection import flatten, project_fields
+
+
+def _json_field(*path: str) -> property:
+    """Attribute read from (and written to) the sandbox API document on access"""
+
+    def getter(self):
+        node = self._raw
+        for key in path[:-1]:
+            node = node[key]
+        return node.get(path[-1])
+
+    def setter(self, value):
+        node = self._raw
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = value
+
+    return property(getter, setter)
+
+
+# paths of the document read by the attributes, kept next to the --fields projection
+_ATTRIBUTE_PATHS = [
+    ["details", "id"],
+    ["details", "computed_status"],
+    ["details", "definition", "metadata", "name"],
+    ["details", "definition", "metadata", "blueprint_name"],
+    ["details", "definition", "metadata", "owner_email"],
+    ["details", "definition", "metadata", "start_time"],
+]
 
 
 class Sandbox(Resource):
+    """Sandbox backed by the API document it was created from. Nothing is copied out of the document, so the same
+    object serves table, JSON and detailed output. When fields are given, only those and the paths read by the
+    attributes are kept"""
+
+    __slots__ = ("_raw", "fields")
+
+    sandbox_id = _json_field("details", "id")
+    sandbox_status = _json_field("details", "computed_status")
+    name = _json_field("details", "definition", "metadata", "name")
+    blueprint_name = _json_field("details", "definition", "metadata", "blueprint_name")
+    owner = _json_field("details", "definition", "metadata", "owner_email")
+    start_time = _json_field("details", "definition", "metadata", "start_time")
+
     def __init__(self, manager: ResourceManager, sandbox_id: str, name: str, blueprint_name: str):
         super(Sandbox, self).__init__(manager)
 
-        self.sandbox_id = sandbox_id
-        self.name = name
-        self.blueprint_name = blueprint_name
+        self._raw = {
+            "details": {
+                "id": sandbox_id,
+                "computed_status": None,
+                "definition": {"metadata": {"name": name, "blueprint_name": blueprint_name}},
+            }
+        }
+        self.fields = None
 
     @classmethod
-    def json_deserialize(cls, manager: ResourceManager, json_obj: dict):
+    def json_deserialize(cls, manager: ResourceManager, json_obj: dict, fields: List[List[str]] = None):
         try:
-            sandbox_id = json_obj["details"]["id"]
-            sb_details = json_obj["details"]["definition"]
-            sb = Sandbox(
-                manager,
-                sandbox_id,
-                sb_details["metadata"]["name"],
-                sb_details["metadata"]["blueprint_name"],
-            )
-            sb.sandbox_status = json_obj["details"]["computed_status"]
-        except KeyError as e:
+            details = json_obj["details"]
+            metadata = details["definition"]["metadata"]
+            missing = [key for key in ("id", "computed_status") if key not in details]
+            missing += [key for key in ("name", "blueprint_name") if key not in metadata]
+        except (KeyError, TypeError) as e:
             raise NotImplementedError(f"unable to create object. Missing keys in Json. Details: {e}")
+        if missing:
+            raise NotImplementedError(f"unable to create object. Missing keys in Json. Details: {missing}")
 
-        # for attr in ["description", "errors", "sandbox_status", "launching_progress"]:
-        #     sb.__dict__[attr] = json_obj.get(attr, "")
-        # TODO(ddovbii): set all needed attributes
-        # sb.errors = json_obj.get("errors", [])
-        # sb.description = json_obj.get("description", "")
-        # sb.status = json_obj.get("sandbox_status", "")
-        # sb.launching_progress = json_obj.get("launching_progress", {})
-        # sb.__dict__ = json_obj.copy()
+        sb = cls.__new__(cls)
+        sb.manager = manager
+        sb._raw = project_fields(json_obj, fields + _ATTRIBUTE_PATHS) if fields else json_obj
+        sb.fields = fields or None
         return sb
 
+    @property
+    def raw(self) -> dict:
+        return self._raw
+
+    @property
+    def projected(self):
+        return project_fields(self._raw, self.fields) if self.fields else None
+
+    def detail_serialize(self):
+        """The whole API document, or the requested fields of it"""
+        return project_fields(self._raw, self.fields)
+
     def json_serialize(self) -> dict:
+        if self.fields:
+            return self.projected
+
         return {
             "id": self.sandbox_id,
             "name": self.name,
@@ -45,13 +101,26 @@ class Sandbox(Resource):
         }
 
     def table_serialize(self) -> dict:
+        if self.fields:
+            return flatten(self.projected)
+
         return self.json_serialize()
 
 
+def _status_filter(show_ended: bool, statuses: Optional[List[str]]) -> Optional[Callable[[Sandbox], bool]]:
+    if statuses:
+        wanted = {status.lower() for status in statuses}
+        return lambda sb: (sb.sandbox_status or "").lower() in wanted
+    if not show_ended:
+        return lambda sb: sb.sandbox_status != "Ended"
+    return None
+
+
 class SandboxesManager(ResourceManager):
     resource_obj = Sandbox
     SANDBOXES_PATH = "environments"
     SANDBOXES_LINK = "sandboxes"
+    PAGE_SIZE = 25
 
     # SPECIFIC_SANDBOX_PATH = "sandboxes"
 
@@ -63,24 +132,104 @@ class SandboxesManager(ResourceManager):
         space = url.path.split("/")[3]
         return f"https://{url.hostname}/{space}/{self.SANDBOXES_LINK}/{sandbox_id}"
 
-    def get(self, sandbox_id: str) -> Sandbox:
+    def get(self, sandbox_id: str, fields: List[List[str]] = None) -> Sandbox:
         url = f"{self.SANDBOXES_PATH}/{sandbox_id}"
         sb_json = self._get(url)
 
-        return self.resource_obj.json_deserialize(self, sb_json)
-
-    def get_detailed(self, sandbox_id: str) -> dict:
-        url = f"{self.SANDBOXES_PATH}/{sandbox_id}"
-        sb_json = self._get(url)
+        return self.resource_obj.json_deserialize(self, sb_json, fields)
 
-        return sb_json
+    def get_detailed(self, sandbox_id: str, fields: List[List[str]] = None) -> dict:
+        return self.get(sandbox_id, fields).detail_serialize()
 
-    def list(self, count: int = 25, filter_opt: str = "my") -> List[Sandbox]:
+    def list(self, count: int = 25, filter_opt: str = "my", fields: List[List[str]] = None) -> List[Sandbox]:
 
         filter_params = {"count": count, "filter": filter_opt}
         list_json = self._list(path=self.SANDBOXES_PATH, filter_params=filter_params)
 
-        return [self.resource_obj.json_deserialize(self, obj) for obj in list_json]
+        return [self.resource_obj.json_deserialize(self, obj, fields) for obj in list_json]
+
+    def list_pages(
+        self,
+        count: int = 25,
+        filter_opt: str = "my",
+        page_size: int = None,
+        fields: List[List[str]] = None,
+        show_ended: bool = True,
+        statuses: List[str] = None,
+    ) -> Iterator[List[Sandbox]]:
+        """Lazily requests sandboxes page by page until `count` sandboxes are fetched or there are no more.
+
+        Status filters are sent with the request and applied to the received pages too, so when the server does not
+        support them pages are requested until `count` matching sandboxes are found
+        """
+        page_size = page_size or self.PAGE_SIZE
+        filter_params = self._list_filter_params(filter_opt, show_ended, statuses)
+        matches = _status_filter(show_ended, statuses)
+
+        skip = 0
+        found = 0
+        while found < count:
+            page_count = min(page_size, count - found)
+            list_json = self._list(
+                path=self.SANDBOXES_PATH, filter_params=dict(filter_params, count=page_count, skip=skip)
+            )
+
+            page = [self.resource_obj.json_deserialize(self, obj, fields) for obj in list_json]
+            if matches:
+                page = [sb for sb in page if matches(sb)][: count - found]
+            found += len(page)
+            yield page
+
+            if len(list_json) < page_count:
+                return
+            skip += len(list_json)
+
+    def list_items(
+        self,
+        count: int = 25,
+        filter_opt: str = "my",
+        page_size: int = None,
+        fields: List[List[str]] = None,
+        show_ended: bool = True,
+        statuses: List[str] = None,
+    ) -> Iterator[Sandbox]:
+        """Like list_pages, but every sandbox is yielded as soon as it is decoded from the response, so the first
+        sandboxes of a page can be processed before the rest of the page arrives"""
+        page_size = page_size or self.PAGE_SIZE
+        filter_params = self._list_filter_params(filter_opt, show_ended, statuses)
+        matches = _status_filter(show_ended, statuses)
+
+        skip = 0
+        found = 0
+        while found < count:
+            page_count = min(page_size, count - found)
+            received = 0
+            items = self._list_items(
+                path=self.SANDBOXES_PATH, filter_params=dict(filter_params, count=page_count, skip=skip)
+            )
+            for obj in items:
+                received += 1
+                sandbox = self.resource_obj.json_deserialize(self, obj, fields)
+                if matches and not matches(sandbox):
+                    continue
+                found += 1
+                yield sandbox
+                if found == count:
+                    items.close()
+                    return
+
+            if received < page_count:
+                return
+            skip += received
+
+    @staticmethod
+    def _list_filter_params(filter_opt: str, show_ended: bool, statuses: Optional[List[str]]) -> dict:
+        filter_params = {"filter": filter_opt}
+        if statuses:
+            filter_params["status"] = ",".join(statuses)
+        elif not show_ended:
+            filter_params["show_ended"] = "false"
+        return filter_params
 
     def start(
         self,
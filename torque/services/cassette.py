@@ -0,0 +1,197 @@
+"""
+Record/replay of TorqueClient HTTP interactions.
+
+A cassette is a (optionally gzipped) file with one compact JSON document per line: a header followed by the recorded
+interactions in the order they were completed. Secrets (authorization headers, passwords, access tokens) are never
+written to the file.
+"""
+
+import gzip
+import json
+import threading
+import time
+from collections import deque
+from io import BytesIO
+from typing import IO, Deque, Dict, Optional, Tuple, Union
+from urllib.parse import urlencode, urlparse
+
+from requests import Response, Session
+from requests.structures import CaseInsensitiveDict
+
+from torque.exceptions import CassetteError
+
+CASSETTE_VERSION = 1
+# response headers worth keeping for replay
+RECORDED_HEADERS = ("Content-Type", "ETag", "Retry-After", "Last-Modified", "Cache-Control")
+REDACTED_FIELDS = ("password", "access_token", "token")
+REDACTED = "***"
+
+
+def _open(path: str, mode: str) -> IO:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _redact(data):
+    if isinstance(data, dict):
+        return {key: REDACTED if key in REDACTED_FIELDS else _redact(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_redact(item) for item in data]
+    return data
+
+
+def request_key(method: str, url: str, params: dict = None, body=None) -> Tuple[str, str, str]:
+    """Host independent identity of a request: method, path with sorted query and canonical json body"""
+    parsed = urlparse(url)
+    query = sorted(parsed.query.split("&")) if parsed.query else []
+    if params:
+        query = sorted(query + urlencode(params, doseq=True).split("&"))
+    path = parsed.path + ("?" + "&".join(query) if query else "")
+    return method, path, json.dumps(_redact(body), sort_keys=True, separators=(",", ":")) if body is not None else ""
+
+
+class CassetteRecorder(object):
+    """Appends every completed interaction to the cassette file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = _open(path, "w")
+        self._write({"cassette_version": CASSETTE_VERSION, "recorded_at": time.time()})
+
+    def send(self, session: Session, method: str, url: str, **kwargs) -> Response:
+        """Sends request with the session and records the interaction"""
+        start_time = time.perf_counter()
+        response = session.request(method=method, url=url, **kwargs)
+        self.record(method, url, kwargs.get("params"), kwargs.get("json"), response, time.perf_counter() - start_time)
+        return response
+
+    def record(self, method: str, url: str, params: Optional[dict], body, response: Response, latency: float) -> None:
+        _, path, body_key = request_key(method, url, params, body)
+        try:
+            response_body = _redact(response.json()) if response.content else None
+            body_kind = "json"
+        except ValueError:
+            response_body = response.text
+            body_kind = "text"
+
+        self._write(
+            {
+                "method": method,
+                "path": path,
+                "body": body_key or None,
+                "status": response.status_code,
+                "headers": {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers},
+                "response": response_body,
+                "response_type": body_kind,
+                "latency": round(latency, 6),
+            }
+        )
+
+    def _write(self, document: dict) -> None:
+        with self._lock:
+            self._file.write(json.dumps(document, separators=(",", ":")))
+            self._file.write("\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class CassettePlayer(object):
+    """Serves recorded responses. Requests are matched by method, path, query and body; when the body differs
+    (e.g. generated sandbox names) the next interaction with the same method and path is used. Repeated requests
+    (e.g. status polling) get recorded responses in order, the last one is repeated when the recording runs out.
+
+    :param speed: 0 replays instantly, 1 at the original speed, 2 twice as fast etc.
+    """
+
+    def __init__(self, path: str, speed: float = 0):
+        self.path = path
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._interactions = []
+        self._used = set()
+        self._exact: Dict[tuple, Deque[int]] = {}
+        self._by_path: Dict[tuple, Deque[int]] = {}
+        self._last: Dict[tuple, dict] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with _open(self.path, "r") as cassette_file:
+                lines = [line for line in cassette_file if line.strip()]
+                header = json.loads(lines[0]) if lines else {}
+                interactions = [json.loads(line) for line in lines[1:]]
+        except (OSError, ValueError) as e:
+            raise CassetteError(f"Unable to read cassette '{self.path}'. Details: {e}")
+
+        if header.get("cassette_version") != CASSETTE_VERSION:
+            raise CassetteError(f"Unsupported cassette format of '{self.path}'")
+
+        self._interactions = interactions
+        for index, interaction in enumerate(interactions):
+            path_key = (interaction["method"], interaction["path"])
+            self._exact.setdefault(path_key + (interaction["body"] or "",), deque()).append(index)
+            self._by_path.setdefault(path_key, deque()).append(index)
+
+    def send(self, session: Session, method: str, url: str, **kwargs) -> Response:
+        """Serves recorded response instead of sending the request"""
+        return self.play(method, url, kwargs.get("params"), kwargs.get("json"))
+
+    def play(self, method: str, url: str, params: dict = None, body=None) -> Response:
+        method, path, body_key = request_key(method, url, params, body)
+        interaction = self._next_interaction((method, path, body_key), (method, path))
+        if interaction is None:
+            raise CassetteError(f"No recorded interaction for {method} {path}")
+
+        if self.speed:
+            time.sleep(interaction["latency"] / self.speed)
+        return self._build_response(interaction, url)
+
+    def close(self) -> None:
+        pass
+
+    def _next_interaction(self, exact_key: tuple, path_key: tuple) -> Optional[dict]:
+        with self._lock:
+            index = self._pop_unused(self._exact.get(exact_key))
+            if index is None and exact_key in self._last:
+                return self._last[exact_key]
+            if index is None:
+                index = self._pop_unused(self._by_path.get(path_key))
+            if index is None:
+                return self._last.get(path_key)
+
+            self._used.add(index)
+            interaction = self._interactions[index]
+            self._last[exact_key] = self._last[path_key] = interaction
+            return interaction
+
+    def _pop_unused(self, queue: Optional[Deque[int]]) -> Optional[int]:
+        while queue:
+            index = queue.popleft()
+            if index not in self._used:
+                return index
+        return None
+
+    @staticmethod
+    def _build_response(interaction: dict, url: str) -> Response:
+        response = Response()
+        response.status_code = interaction["status"]
+        response.url = url
+        response.headers = CaseInsensitiveDict(interaction.get("headers") or {})
+        if interaction.get("response_type") == "text":
+            content = interaction["response"] or ""
+        else:
+            content = json.dumps(interaction["response"]) if interaction["response"] is not None else ""
+        response._content = content.encode("utf-8")
+        # the whole body is known, also for requests made with stream=True
+        response._content_consumed = True
+        response.raw = BytesIO(response._content)
+        response.encoding = "utf-8"
+        return response
+
+
+Cassette = Union[CassetteRecorder, CassettePlayer]
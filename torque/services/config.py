@@ -5,6 +5,7 @@ from pathlib import Path
 
 from torque.constants import TorqueConfigKeys
 from torque.exceptions import ConfigError, ConfigFileMissingError
+from torque.services.tracer import traced
 
 DEFAULT_CONFIG_PATH = "~/.torque/config"
 
@@ -81,6 +82,7 @@ class TorqueConfigProvider(object):
         if profile not in config:
             raise ConfigError("Provided profile does not exist in config file")
 
+    @traced("config.load")
     def _load_config_from_path(self):
         try:
             conf = ConfigParser()
@@ -1,4 +1,5 @@
 import logging
+from typing import List
 
 from docopt import DocoptExit
 
@@ -7,6 +8,7 @@ from torque.exceptions import ConfigError
 from torque.models.connection import TorqueConnection
 from torque.parsers.global_input_parser import GlobalInputParser
 from torque.services.config import TorqueConfigProvider
+from torque.services.tracer import traced
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +17,7 @@ class TorqueConnectionProvider:
     def __init__(self, args_parser: GlobalInputParser):
         self._args_parser = args_parser
 
+    @traced("connection.get_connection")
     def get_connection(self) -> TorqueConnection:
         # first try to get them as options or from env variable
         token = self._args_parser.token
@@ -36,4 +39,42 @@ class TorqueConnectionProvider:
             except ConfigError as e:
                 raise DocoptExit(f"Unable to read Torque credentials. Reason: {e}")
 
-        return TorqueConnection(token=token, space=space, account=account)
+        return TorqueConnection(token=token, space=space, account=account, profile=self._args_parser.profile)
+
+    @traced("connection.get_connections")
+    def get_connections(self) -> List[TorqueConnection]:
+        """Connections of the profiles selected with --profiles, or of all complete profiles with --all-profiles.
+
+        The config file is read once. Credentials come from the profiles only, --token/--space options and
+        environment variables are not applied to them.
+        """
+        config_file = self._args_parser.get_config_path()
+        try:
+            config = TorqueConfigProvider(config_file).load_all()
+        except ConfigError as e:
+            raise DocoptExit(f"Unable to read Torque credentials. Reason: {e}")
+
+        required = (TorqueConfigKeys.TOKEN, TorqueConfigKeys.SPACE)
+        if self._args_parser.all_profiles:
+            names = [name for name, profile in config.items() if all(key in profile for key in required)]
+            if not names:
+                raise DocoptExit("Unable to read Torque credentials. Reason: no profile contains `token` and `space`")
+        else:
+            names = self._args_parser.profiles
+            for name in names:
+                if name not in config:
+                    raise DocoptExit(f"Unable to read Torque credentials. Reason: profile '{name}' does not exist")
+                if not all(key in config[name] for key in required):
+                    raise DocoptExit(
+                        f"Unable to read Torque credentials. Reason: profile '{name}' must contain `token` and `space`"
+                    )
+
+        return [
+            TorqueConnection(
+                token=config[name][TorqueConfigKeys.TOKEN],
+                space=config[name][TorqueConfigKeys.SPACE],
+                account=config[name].get(TorqueConfigKeys.ACCOUNT),
+                profile=name,
+            )
+            for name in names
+        ]
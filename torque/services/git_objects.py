@@ -0,0 +1,84 @@
+import logging
+import subprocess
+import threading
+from typing import Optional
+
+from torque.exceptions import BadBlueprintRepo
+from torque.services.tracer import traced
+
+logger = logging.getLogger(__name__)
+
+
+class GitObjectReader(object):
+    """Reads git objects of a repository, e.g. a file at any revision ("origin/master:blueprints/web.yaml"), without
+    touching the working tree.
+
+    All reads go through a single `git cat-file --batch` process started on the first read and kept until the reader
+    is closed, so every further read costs a pipe round-trip instead of a new git process.
+    """
+
+    def __init__(self, repo_path: str):
+        self.repo_path = repo_path
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    @traced("git.cat_file")
+    def read(self, name: str) -> Optional[bytes]:
+        """Content of the object, None when there is no such object"""
+        if "\n" in name:
+            raise ValueError("Object name must not contain new lines")
+
+        with self._lock:
+            process = self._start()
+            process.stdin.write(name.encode() + b"\n")
+            process.stdin.flush()
+
+            header = process.stdout.readline()
+            if not header:
+                self._stop()
+                raise BadBlueprintRepo(f"Unable to read '{name}', git cat-file exited")
+            # "<sha> <type> <size>" or "<name> missing" / "<name> ambiguous"
+            fields = header.split()
+            if len(fields) != 3 or not fields[2].isdigit():
+                logger.debug(f"Git object '{name}' not found: {header.decode(errors='replace').strip()}")
+                return None
+
+            size = int(fields[2])
+            content = process.stdout.read(size)
+            # each object is followed by a new line
+            process.stdout.read(1)
+            return content
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop()
+
+    def _start(self) -> subprocess.Popen:
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=self.repo_path,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        return self._process
+
+    def _stop(self) -> None:
+        if self._process is None:
+            return
+        process, self._process = self._process, None
+        try:
+            process.stdin.close()
+            process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
+        finally:
+            process.stdout.close()
+
+    def __enter__(self) -> "GitObjectReader":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
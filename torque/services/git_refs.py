@@ -0,0 +1,289 @@
+import logging
+import os
+import re
+import subprocess
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from torque.exceptions import BadBlueprintRepo
+
+logger = logging.getLogger(__name__)
+
+_REMOTE_SECTION = re.compile(r'^\s*\[\s*remote\s+"(?P<name>(?:[^"\\]|\\.)+)"\s*]', re.MULTILINE)
+_SECTION = re.compile(r'^\s*\[\s*(?P<name>[A-Za-z0-9.-]+)(?:\s+"(?:[^"\\]|\\.)*")?\s*]')
+_VARIABLE = re.compile(r"^\s*(?P<key>[A-Za-z][A-Za-z0-9-]*)\s*(?:=\s*(?P<value>[^#;]*))?")
+_SYMBOLIC_PREFIX = "ref: "
+_MAX_SYMBOLIC_DEPTH = 5
+
+
+class Branch(NamedTuple):
+    """Local branch, `commit` is the hex sha it points to"""
+
+    name: str
+    commit: str
+
+
+class RemoteBranch(NamedTuple):
+    remote_name: str
+    remote_head: str
+    commit: str
+
+    @property
+    def name(self) -> str:
+        return f"{self.remote_name}/{self.remote_head}"
+
+
+class Remote(object):
+    def __init__(self, refs: "GitRefs", name: str):
+        self._refs = refs
+        self.name = name
+
+    @property
+    def refs(self) -> List[RemoteBranch]:
+        """Remote-tracking branches of the remote, as last fetched or pushed"""
+        prefix = f"refs/remotes/{self.name}/"
+        return [
+            RemoteBranch(self.name, ref[len(prefix) :], sha)
+            for ref, sha in self._refs.list(prefix).items()
+            if ref != f"{prefix}HEAD"
+        ]
+
+    def __repr__(self) -> str:
+        return f"<Remote {self.name}>"
+
+
+def find_git_dir(path: str) -> Tuple[str, str]:
+    """Working tree and git directory of the repository containing the path, looked up like git does it"""
+    current = os.path.abspath(path)
+    while True:
+        dot_git = os.path.join(current, ".git")
+        if os.path.isdir(dot_git):
+            return current, dot_git
+        if os.path.isfile(dot_git):
+            # worktrees and submodules: ".git" is a file pointing to the git directory
+            with open(dot_git) as f:
+                content = f.read().strip()
+            if content.startswith("gitdir:"):
+                return current, os.path.normpath(os.path.join(current, content[len("gitdir:") :].strip()))
+        if _is_git_dir(current):
+            raise BadBlueprintRepo("Cannot get folder tree structure. Repo is bare")
+
+        parent = os.path.dirname(current)
+        if parent == current:
+            raise BadBlueprintRepo("Not a git folder")
+        current = parent
+
+
+def _is_git_dir(path: str) -> bool:
+    return (
+        os.path.isfile(os.path.join(path, "HEAD"))
+        and os.path.isdir(os.path.join(path, "objects"))
+        and os.path.isdir(os.path.join(path, "refs"))
+    )
+
+
+class GitRefs(object):
+    """Read-only access to HEAD, branches and remotes of a repository.
+
+    Refs are read straight from the files of the git directory (HEAD, loose refs, packed-refs and config) on every
+    call, so they reflect what git commands changed meanwhile and no git process is needed to read them.
+    """
+
+    def __init__(self, git_dir: str):
+        self.git_dir = git_dir
+        # linked worktrees keep their own HEAD, but share refs and config with the main repository
+        self.common_dir = git_dir
+        commondir_file = os.path.join(git_dir, "commondir")
+        if os.path.isfile(commondir_file):
+            with open(commondir_file) as f:
+                self.common_dir = os.path.normpath(os.path.join(git_dir, f.read().strip()))
+
+    def head(self) -> Tuple[Optional[str], Optional[str]]:
+        """Name of the ref HEAD points to (None when detached) and the sha of its commit (None in a new repo)"""
+        content = self._read_ref_file(os.path.join(self.git_dir, "HEAD"))
+        if content is None:
+            raise BadBlueprintRepo(f"Unable to read HEAD of {self.git_dir}")
+        if content.startswith(_SYMBOLIC_PREFIX):
+            ref = content[len(_SYMBOLIC_PREFIX) :]
+            return ref, self.resolve(ref)
+        return None, content
+
+    def resolve(self, ref: str) -> Optional[str]:
+        """Sha of the commit the ref points to, following symbolic refs, None when there is no such ref"""
+        packed = None
+        for _ in range(_MAX_SYMBOLIC_DEPTH):
+            content = self._read_ref_file(os.path.join(self._ref_dir(ref), ref))
+            if content is None:
+                if packed is None:
+                    packed = self._packed_refs()
+                return packed.get(ref)
+            if not content.startswith(_SYMBOLIC_PREFIX):
+                return content
+            ref = content[len(_SYMBOLIC_PREFIX) :]
+        logger.debug(f"Too deeply nested symbolic ref '{ref}'")
+        return None
+
+    def list(self, prefix: str = "refs/") -> Dict[str, str]:
+        """Refs starting with the prefix, e.g. "refs/heads/", mapped to the sha of their commits"""
+        refs = {ref: sha for ref, sha in self._packed_refs().items() if ref.startswith(prefix)}
+        loose_dir = os.path.join(self.common_dir, *prefix.rstrip("/").split("/"))
+        for current_path, _, file_names in os.walk(loose_dir):
+            for file_name in file_names:
+                ref = os.path.relpath(os.path.join(current_path, file_name), self.common_dir).replace(os.sep, "/")
+                sha = self.resolve(ref)
+                if sha is not None:
+                    refs[ref] = sha
+        return refs
+
+    def remotes(self) -> List[str]:
+        """Names of the remotes configured in the repository"""
+        content = self._read_config()
+        names = [re.sub(r"\\(.)", r"\1", match.group("name")) for match in _REMOTE_SECTION.finditer(content)]
+        return list(dict.fromkeys(names))
+
+    def ref_storage(self) -> str:
+        """Format refs are stored in: "files" (loose refs and packed-refs) unless extensions.refStorage says else"""
+        return (_config_value(self._read_config(), "extensions", "refstorage") or "files").lower()
+
+    def _read_config(self) -> str:
+        try:
+            with open(os.path.join(self.common_dir, "config"), encoding="utf-8", errors="replace") as f:
+                return f.read()
+        except FileNotFoundError:
+            return ""
+
+    def stash_count(self) -> int:
+        """Number of stashed changes, which are the entries of the reflog of refs/stash"""
+        try:
+            with open(os.path.join(self.common_dir, "logs", "refs", "stash"), "rb") as f:
+                return sum(1 for line in f if line.strip())
+        except FileNotFoundError:
+            return 0
+
+    def _ref_dir(self, ref: str) -> str:
+        # HEAD and other pseudo refs are per worktree, refs/ are shared
+        return self.common_dir if ref.startswith("refs/") else self.git_dir
+
+    @staticmethod
+    def _read_ref_file(path: str) -> Optional[str]:
+        try:
+            with open(path) as f:
+                return f.read().strip()
+        except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+            return None
+
+    def _packed_refs(self) -> Dict[str, str]:
+        refs = {}
+        try:
+            with open(os.path.join(self.common_dir, "packed-refs")) as f:
+                for line in f:
+                    # "# pack-refs with: ..." header and "^<sha>" peeled tags
+                    if line.startswith(("#", "^")):
+                        continue
+                    sha, _, ref = line.strip().partition(" ")
+                    if ref:
+                        refs[ref] = sha
+        except FileNotFoundError:
+            pass
+        return refs
+
+
+class GitCommandRefs(object):
+    """Same as GitRefs, answered by git commands run through GitPython, for refs stored in a format other than files
+    (e.g. reftable), which neither GitRefs nor the ref parsing of GitPython can read"""
+
+    def __init__(self, working_dir: str):
+        from git import Git
+
+        self._git = Git(working_dir)
+
+    def head(self) -> Tuple[Optional[str], Optional[str]]:
+        status, ref, _ = self._run("symbolic-ref", "-q", "HEAD")
+        return (ref if status == 0 else None), self.resolve("HEAD")
+
+    def resolve(self, ref: str) -> Optional[str]:
+        status, sha, _ = self._run("rev-parse", "-q", "--verify", f"{ref}^{{commit}}")
+        return sha if status == 0 else None
+
+    def list(self, prefix: str = "refs/") -> Dict[str, str]:
+        _, output, _ = self._run("for-each-ref", "--format=%(objectname) %(refname)", prefix)
+        refs = {}
+        for line in output.splitlines():
+            sha, _, ref = line.partition(" ")
+            refs[ref] = sha
+        return refs
+
+    def remotes(self) -> List[str]:
+        _, output, _ = self._run("remote")
+        return output.split()
+
+    def stash_count(self) -> int:
+        _, output, _ = self._run("stash", "list")
+        return len(output.splitlines())
+
+    def _run(self, *args) -> Tuple[int, str, str]:
+        return self._git.execute(["git", *args], with_extended_output=True, with_exceptions=False)
+
+
+def open_refs(git_dir: str, working_dir: str) -> Union[GitRefs, GitCommandRefs]:
+    """Refs of the repository, read from the files of the git directory when they are stored there"""
+    refs = GitRefs(git_dir)
+    storage = refs.ref_storage()
+    if storage != "files":
+        logger.debug(f"Refs are stored as '{storage}', reading them with git")
+        return GitCommandRefs(working_dir)
+    return refs
+
+
+def _config_value(content: str, section: str, key: str) -> Optional[str]:
+    """Last value of the variable in the git config text, section and key are matched case-insensitively"""
+    current_section = None
+    value = None
+    for line in content.splitlines():
+        match = _SECTION.match(line)
+        if match:
+            current_section = match.group("name").lower()
+            line = line[match.end() :]
+        if current_section != section:
+            continue
+        match = _VARIABLE.match(line)
+        if match and match.group("key").lower() == key:
+            value = (match.group("value") or "true").strip().strip('"')
+    return value
+
+
+class GitStatus(NamedTuple):
+    """Changes of the working tree as reported by `git status`"""
+
+    staged: List[str]
+    modified: List[str]
+    untracked: List[str]
+
+
+def git_status(working_dir: str, untracked_files: bool = True) -> GitStatus:
+    """Staged, modified and untracked paths of the working tree.
+
+    Comparing the working tree to the index cannot be done from the refs, so this is the one read which runs git.
+    """
+    args = ["git", "--no-optional-locks", "status", "--porcelain", "-z"]
+    args.append("--untracked-files=all" if untracked_files else "--untracked-files=no")
+    result = subprocess.run(args, cwd=working_dir, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise BadBlueprintRepo(f"Unable to get status of the repo: {result.stderr.decode(errors='replace').strip()}")
+
+    status = GitStatus([], [], [])
+    entries = iter(result.stdout.decode(errors="surrogateescape").split("\0"))
+    for entry in entries:
+        if not entry:
+            continue
+        index, work_tree, path = entry[0], entry[1], entry[3:]
+        if index in "RC":
+            # renamed and copied entries are followed by the original path
+            next(entries, None)
+        if index == "?":
+            status.untracked.append(path)
+            continue
+        if index != " ":
+            status.staged.append(path)
+        if work_tree != " ":
+            status.modified.append(path)
+    return status
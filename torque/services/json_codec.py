@@ -0,0 +1,155 @@
+"""
+JSON decoding of API responses and encoding of the command output.
+
+Responses are decoded with the fastest installed JSON library: orjson, then ujson, then the json module of the standard
+library. Set TORQUE_JSON_CODEC=orjson|ujson|json to use a specific one. The output is always encoded by the standard
+library, so its bytes (indent, escaping of non-ASCII characters, numbers) don't depend on what is installed.
+"""
+
+import json
+import logging
+import os
+import re
+from codecs import getincrementaldecoder
+from typing import Any, Callable, Iterable, Iterator, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s*")
+
+
+class IncrementalListDecoder(object):
+    """Decodes a JSON list fed in chunks, returning every item as soon as it is complete.
+
+    Items are decoded by the C scanner of the standard library straight from the received text, so the whole list is
+    decoded in about the time of a single json.loads(). An item which is not complete yet is decoded again only when
+    the text after its start has at least doubled, which keeps the work linear when items span many chunks.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._position = 0
+        self._retry_at = 0
+        # "start" (before the list), "item" (after "[" or ","), "separator" (after an item) or "end"
+        self._expecting = "start"
+        self._empty = True
+
+    def feed(self, chunk: bytes, final: bool = False) -> Iterator[Any]:
+        if self._expecting == "end":
+            return
+        self._buffer = self._buffer[self._position :] + self._text_decoder.decode(chunk, final)
+        self._retry_at -= self._position
+        self._position = 0
+        if len(self._buffer) < self._retry_at and not final:
+            return
+
+        buffer = self._buffer
+        while True:
+            position = self._position = _WHITESPACE.match(buffer, self._position).end()
+            if position == len(buffer):
+                break
+            char = buffer[position]
+            if self._expecting == "start":
+                if char != "[":
+                    raise ValueError("JSON document is not a list")
+                self._position += 1
+                self._expecting = "item"
+            elif char == "]" and (self._expecting == "separator" or self._empty):
+                self._position += 1
+                self._expecting = "end"
+                return
+            elif self._expecting == "separator":
+                if char != ",":
+                    raise ValueError(f"Expected ',' or ']' in the JSON list, got '{char}'")
+                self._position += 1
+                self._expecting = "item"
+            else:
+                try:
+                    item, end = self._decoder.raw_decode(buffer, position)
+                except ValueError:
+                    if final:
+                        raise
+                    end = None
+                # not complete yet, or a number at the end of the text which may continue in the next chunk
+                if end is None or end == len(buffer) and not final:
+                    self._retry_at = position + 2 * (len(buffer) - position)
+                    break
+                self._position = end
+                self._expecting = "separator"
+                self._empty = False
+                yield item
+
+        if final:
+            raise ValueError("JSON document is empty" if self._expecting == "start" else "JSON list is incomplete")
+
+
+class JsonCodec(object):
+    """JSON codec of the standard library"""
+
+    name = "json"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any, default: Callable[[Any], Any] = None, pretty: bool = False) -> str:
+        """Compact JSON text, or indented when `pretty`. `default` converts objects which are not JSON types"""
+        if pretty:
+            return json.dumps(obj, default=default, indent=True)
+        return json.dumps(obj, default=default, separators=(",", ":"))
+
+    def iter_list(self, chunks: Iterable[bytes]) -> Iterator[Any]:
+        """Decodes items of a JSON list one by one as soon as the chunks containing them arrive"""
+        decoder = IncrementalListDecoder()
+        for chunk in chunks:
+            yield from decoder.feed(chunk)
+        yield from decoder.feed(b"", final=True)
+
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+
+class UjsonCodec(JsonCodec):
+    name = "ujson"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return ujson.loads(data)
+
+
+def available_codecs() -> dict:
+    """Codecs which can be used, the fastest first"""
+    codecs = {}
+    if orjson is not None:
+        codecs[OrjsonCodec.name] = OrjsonCodec()
+    if ujson is not None:
+        codecs[UjsonCodec.name] = UjsonCodec()
+    codecs[JsonCodec.name] = JsonCodec()
+    return codecs
+
+
+def get_codec(name: str = None) -> JsonCodec:
+    """The codec of the library with the given name, or the fastest one installed"""
+    codecs = available_codecs()
+    if name:
+        if name in codecs:
+            return codecs[name]
+        logger.warning(f"JSON library '{name}' is not available, using '{next(iter(codecs))}'")
+    return next(iter(codecs.values()))
+
+
+codec = get_codec(os.environ.get("TORQUE_JSON_CODEC", None))
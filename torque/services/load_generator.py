@@ -0,0 +1,257 @@
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from torque.sandboxes import SandboxesManager
+from torque.services.metrics import percentile
+
+OPERATIONS = ["list", "get", "start", "end"]
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    """Parse operation weights: "list=70,get=30" -> {"list": 70, "get": 30}"""
+    weights = {}
+    for item in mix.split(","):
+        operation, _, weight = item.strip().partition("=")
+        operation = operation.strip()
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{operation}', must be one of: {', '.join(OPERATIONS)}")
+        try:
+            weights[operation] = int(weight) if weight else 1
+        except ValueError:
+            raise ValueError(f"Weight of '{operation}' must be a number")
+        if weights[operation] < 0:
+            raise ValueError(f"Weight of '{operation}' must not be negative")
+
+    if not any(weights.values()):
+        raise ValueError("At least one operation must have positive weight")
+    return weights
+
+
+class OperationResult(object):
+    __slots__ = ("operation", "latency", "error")
+
+    def __init__(self, operation: str, latency: float, error: str = None):
+        self.operation = operation
+        self.latency = latency
+        self.error = error
+
+
+class LoadReport(object):
+    def __init__(self, results: List[OperationResult], elapsed: float, status_codes: Dict[int, int], skipped: int):
+        self.results = results
+        self.elapsed = elapsed
+        self.status_codes = status_codes
+        self.skipped = skipped
+
+    def summary(self) -> dict:
+        requests = sum(self.status_codes.values())
+        throttled = self.status_codes.get(429, 0)
+        errors = len([result for result in self.results if result.error])
+        latencies = sorted(result.latency for result in self.results)
+        return {
+            "operations": len(self.results),
+            "skipped": self.skipped,
+            "elapsed_s": round(self.elapsed, 3),
+            "throughput_ops": round(len(self.results) / self.elapsed, 2) if self.elapsed else 0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+            "error_rate": round(errors / len(self.results), 4) if self.results else 0,
+            "http_requests": requests,
+            "throttled": throttled,
+            "throttle_rate": round(throttled / requests, 4) if requests else 0,
+        }
+
+    def operations(self) -> List[dict]:
+        rows = []
+        for operation in OPERATIONS:
+            results = [result for result in self.results if result.operation == operation]
+            if not results:
+                continue
+            latencies = sorted(result.latency for result in results)
+            errors = len([result for result in results if result.error])
+            rows.append(
+                {
+                    "operation": operation,
+                    "count": len(results),
+                    "errors": errors,
+                    "error_rate": round(errors / len(results), 4),
+                    "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+                    "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+                    "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+                    "max_ms": round(latencies[-1] * 1000, 1),
+                }
+            )
+        return rows
+
+    def errors(self) -> Dict[str, int]:
+        """Distinct error messages with their counts"""
+        counts = {}
+        for result in self.results:
+            if result.error:
+                counts[result.error] = counts.get(result.error, 0) + 1
+        return counts
+
+
+class LoadGenerator(object):
+    """Drives a weighted mix of sandbox list/get/start/end operations with a number of concurrent workers,
+    optionally paced to a total request rate. Only sandboxes started by the generator itself are ended.
+    """
+
+    def __init__(
+        self,
+        manager: SandboxesManager,
+        mix: Dict[str, int],
+        concurrency: int = 4,
+        rate: float = None,
+        blueprint: str = None,
+        duration: int = 10,
+        seed: int = None,
+    ):
+        self.manager = manager
+        self.mix = {operation: weight for operation, weight in mix.items() if weight}
+        self.concurrency = concurrency
+        self.rate = rate
+        self.blueprint = blueprint
+        self.sandbox_duration = duration
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._known_ids: List[str] = []
+        self._started_ids: List[str] = []
+        # names of started sandboxes are unique across runs started in the same second and within a run
+        self._run_id = uuid.uuid4().hex[:8]
+        self._started_count = 0
+        self._issued = 0
+        self._skipped = 0
+        self._start_time = 0.0
+
+    def run(self, requests: int = None, duration: float = None) -> LoadReport:
+        """Run until `requests` operations are done or `duration` seconds passed"""
+        self.manager.client.session.set_pool_size(self.concurrency)
+        metrics_before = self._status_codes()
+        self._issued = 0
+        self._skipped = 0
+        self._start_time = time.perf_counter()
+        deadline = self._start_time + duration if duration else None
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = [executor.submit(self._worker, requests, deadline) for _ in range(self.concurrency)]
+            results = [result for future in futures for result in future.result()]
+        elapsed = time.perf_counter() - self._start_time
+
+        self.cleanup()
+
+        status_codes = self._status_codes()
+        for code, count in metrics_before.items():
+            status_codes[code] -= count
+        return LoadReport(results, elapsed, status_codes, self._skipped)
+
+    def cleanup(self) -> None:
+        """End sandboxes started by the generator which are still running"""
+        while self._started_ids:
+            sandbox_id = self._started_ids.pop()
+            try:
+                self.manager.end(sandbox_id)
+            except Exception:
+                pass
+
+    def _worker(self, requests: Optional[int], deadline: Optional[float]) -> List[OperationResult]:
+        results = []
+        while True:
+            slot = self._next_slot(requests, deadline)
+            if slot is None:
+                return results
+
+            delay = slot - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+            result = self._execute(self._choose_operation())
+            if result:
+                results.append(result)
+
+    def _next_slot(self, requests: Optional[int], deadline: Optional[float]) -> Optional[float]:
+        """Reserve the next operation. Returns the time it is scheduled at or None when the run is over"""
+        with self._lock:
+            now = time.perf_counter()
+            if (requests is not None and self._issued >= requests) or (deadline and now >= deadline):
+                return None
+            slot = self._start_time + self._issued / self.rate if self.rate else now
+            if deadline and slot >= deadline:
+                return None
+            self._issued += 1
+            return slot
+
+    def _choose_operation(self) -> str:
+        with self._lock:
+            operations = list(self.mix)
+            return self._random.choices(operations, weights=[self.mix[op] for op in operations])[0]
+
+    def _execute(self, operation: str) -> Optional[OperationResult]:
+        target = self._pick_target(operation)
+        if operation in ("get", "end") and not target:
+            if operation == "end" or not self._refresh_known_ids():
+                with self._lock:
+                    self._skipped += 1
+                return None
+            target = self._pick_target(operation)
+
+        start_time = time.perf_counter()
+        error = None
+        try:
+            if operation == "list":
+                sandboxes = self.manager.list(count=25, filter_opt="all")
+                self._remember([sb.sandbox_id for sb in sandboxes])
+            elif operation == "get":
+                self.manager.get(target)
+            elif operation == "start":
+                sandbox_id = self.manager.start(self._sandbox_name(), self.blueprint, self.sandbox_duration)
+                with self._lock:
+                    self._started_ids.append(sandbox_id)
+                self._remember([sandbox_id])
+            elif operation == "end":
+                self.manager.end(target)
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+            if operation == "end":
+                with self._lock:
+                    self._started_ids.append(target)
+
+        return OperationResult(operation, time.perf_counter() - start_time, error)
+
+    def _pick_target(self, operation: str) -> Optional[str]:
+        with self._lock:
+            if operation == "get" and self._known_ids:
+                return self._random.choice(self._known_ids)
+            if operation == "end" and self._started_ids:
+                return self._started_ids.pop(self._random.randrange(len(self._started_ids)))
+        return None
+
+    def _sandbox_name(self) -> str:
+        with self._lock:
+            self._started_count += 1
+            return f"bench-{int(time.time())}-{self._run_id}-{self._started_count}"
+
+    def _refresh_known_ids(self) -> bool:
+        try:
+            self._remember([sb.sandbox_id for sb in self.manager.list(count=25, filter_opt="all")])
+        except Exception:
+            return False
+        return bool(self._known_ids)
+
+    def _remember(self, sandbox_ids: List[str]) -> None:
+        with self._lock:
+            known = set(self._known_ids)
+            self._known_ids.extend(sandbox_id for sandbox_id in sandbox_ids if sandbox_id not in known)
+
+    def _status_codes(self) -> Dict[int, int]:
+        codes = {}
+        for item in self.manager.client.metrics.summary():
+            for code, count in item["status_codes"].items():
+                codes[int(code)] = codes.get(int(code), 0) + count
+        return codes
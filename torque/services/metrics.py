@@ -0,0 +1,159 @@
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, List
+from urllib.parse import urlparse
+
+from torque.view.table_renderer import TableRenderer
+
+# upper bounds (in ms) of latency histogram buckets, the last bucket is unbounded
+LATENCY_BUCKETS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+# path segments followed by an identifier which is replaced by a placeholder in endpoint templates
+_TEMPLATE_SEGMENTS = {
+    "spaces": "{space}",
+    "accounts": "{account}",
+    "environments": "{id}",
+    "catalog": "{name}",
+    "blueprints": "{name}",
+}
+_API_PREFIX = re.compile(r"^.*?/api/")
+
+
+def endpoint_template(url: str) -> str:
+    """Convert request url to endpoint template, e.g. spaces/{space}/environments/{id}"""
+    path = _API_PREFIX.sub("", urlparse(url).path)
+    segments = [segment for segment in path.split("/") if segment]
+    for i in range(1, len(segments)):
+        placeholder = _TEMPLATE_SEGMENTS.get(segments[i - 1])
+        if placeholder:
+            segments[i] = placeholder
+    return "/".join(segments)
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(percent / 100.0 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class EndpointStats(object):
+    def __init__(self, method: str, endpoint: str):
+        self.method = method
+        self.endpoint = endpoint
+        self.count = 0
+        self.retries = 0
+        self.latencies: List[float] = []
+        self.status_codes = Counter()
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        # conditional requests answered with 304 and the size of the documents not downloaded again
+        self.not_modified = 0
+        self.bytes_saved = 0
+
+    def histogram(self) -> Dict[str, int]:
+        buckets = Counter()
+        for latency in self.latencies:
+            bucket = next((f"<={bound}ms" for bound in LATENCY_BUCKETS_MS if latency * 1000 <= bound), None)
+            buckets[bucket or f">{LATENCY_BUCKETS_MS[-1]}ms"] += 1
+        return dict(buckets)
+
+    def summary(self) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "method": self.method,
+            "endpoint": self.endpoint,
+            "count": self.count,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+            "total_ms": round(sum(latencies) * 1000, 1),
+            "status_codes": {str(code): count for code, count in sorted(self.status_codes.items())},
+            "retries": self.retries,
+            "bytes_received": self.bytes_received,
+            "bytes_sent": self.bytes_sent,
+            "not_modified": self.not_modified,
+            "bytes_saved": self.bytes_saved,
+            "histogram": self.histogram(),
+        }
+
+
+class RequestMetrics(object):
+    """Thread-safe collector of request counts, latencies, status codes, retries and sizes per endpoint template"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[tuple, EndpointStats] = {}
+
+    def _get_stats(self, method: str, url: str) -> EndpointStats:
+        endpoint = endpoint_template(url)
+        key = (method, endpoint)
+        if key not in self._endpoints:
+            self._endpoints[key] = EndpointStats(method, endpoint)
+        return self._endpoints[key]
+
+    def record(
+        self, method: str, url: str, status_code: int, latency: float, bytes_received: int = 0, bytes_sent: int = 0
+    ) -> None:
+        with self._lock:
+            stats = self._get_stats(method, url)
+            stats.count += 1
+            stats.latencies.append(latency)
+            stats.status_codes[status_code] += 1
+            stats.bytes_received += bytes_received
+            stats.bytes_sent += bytes_sent
+
+    def record_not_modified(self, method: str, url: str, bytes_saved: int) -> None:
+        with self._lock:
+            stats = self._get_stats(method, url)
+            stats.not_modified += 1
+            stats.bytes_saved += bytes_saved
+
+    def record_retry(self, method: str, url: str) -> None:
+        with self._lock:
+            self._get_stats(method, url).retries += 1
+
+    @property
+    def total_requests(self) -> int:
+        return sum(stats.count for stats in self._endpoints.values())
+
+    @property
+    def bytes_received(self) -> int:
+        return sum(stats.bytes_received for stats in self._endpoints.values())
+
+    @property
+    def bytes_saved(self) -> int:
+        return sum(stats.bytes_saved for stats in self._endpoints.values())
+
+    def summary(self) -> List[dict]:
+        with self._lock:
+            stats = sorted(self._endpoints.values(), key=lambda item: sum(item.latencies), reverse=True)
+            return [item.summary() for item in stats]
+
+    def render(self) -> str:
+        rows = []
+        for item in self.summary():
+            rows.append(
+                {
+                    "method": item["method"],
+                    "endpoint": item["endpoint"],
+                    "count": item["count"],
+                    "p50 ms": item["p50_ms"],
+                    "p95 ms": item["p95_ms"],
+                    "p99 ms": item["p99_ms"],
+                    "total ms": item["total_ms"],
+                    "statuses": " ".join(f"{code}:{count}" for code, count in item["status_codes"].items()),
+                    "retries": item["retries"],
+                    "received": item["bytes_received"],
+                    "sent": item["bytes_sent"],
+                    "saved": item["bytes_saved"],
+                }
+            )
+        return TableRenderer(fit_terminal=False).render(rows)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints = {}
@@ -1,15 +1,25 @@
-import json
 import sys
-from typing import Any
+from collections.abc import Iterable, Iterator
+from typing import Any, TextIO
 
 import tabulate
 from colorama import Style
 
 from torque.parsers.global_input_parser import GlobalInputParser
+from torque.services.json_codec import codec
+from torque.view.table_renderer import TableRenderer
+
+
+def _json_serialize(obj: Any) -> Any:
+    return obj.json_serialize()
 
 
 class OutputFormatter:
     def __init__(self, global_input_parser: GlobalInputParser):
+        self.streaming = global_input_parser.output_ndjson
+        self.query = global_input_parser.query
+        # messages are written to stdout unless redirected, e.g. to collect them per profile
+        self.message_stream: TextIO = None
         if global_input_parser.output_json:
             self.format_str = self.format_json_str
             self.format_list = self.format_json_list
@@ -22,30 +32,68 @@ class OutputFormatter:
             self.styled_text = self.styled_text_default
 
     def styled_text_default(self, style, message, newline):
+        stream = self.message_stream or sys.stdout
         if message:
-            sys.stdout.write(style + message)
-            sys.stdout.write(Style.RESET_ALL)
+            stream.write(style + message)
+            stream.write(Style.RESET_ALL)
         if newline:
-            sys.stdout.write("\n")
+            stream.write("\n")
 
     def yield_output(self, success: bool, output: Any):
         if not output:
             return
 
+        stream = sys.stdout if success else sys.stderr
+
+        if self.query and success:
+            output = self.query.search(self.to_json_data(output))
+            if output is None:
+                return
+
+        if self.streaming:
+            self.write_ndjson(output, stream)
+            return
+
+        if isinstance(output, Iterator) and self.format_list == self.format_table:
+            self.write_table(output, stream)
+            return
+
         output_str = self.format_output(output)
 
-        if success:
-            sys.stdout.write(output_str)
-            sys.stdout.write("\n")
-        else:
-            sys.stderr.write(output_str)
-            sys.stderr.write("\n")
+        stream.write(output_str)
+        stream.write("\n")
+
+    def write_ndjson(self, output: Any, stream: TextIO) -> None:
+        """Writes and flushes one compact json object per line as soon as items of the iterable arrive"""
+        if isinstance(output, (str, dict)) or not isinstance(output, Iterable):
+            output = [output]
+
+        for item in output:
+            stream.write(self.format_ndjson_item(item))
+            stream.write("\n")
+            stream.flush()
+
+    def write_table(self, output: Iterable, stream: TextIO) -> None:
+        """Writes table lines as soon as rows arrive. Column widths are fixed from the first page of rows"""
+        for line in TableRenderer().render_lines(output):
+            stream.write(line)
+            stream.write("\n")
+            stream.flush()
+
+    def to_json_data(self, output: Any) -> Any:
+        if callable(getattr(output, "json_serialize", None)):
+            return output.json_serialize()
+        elif isinstance(output, (list, Iterator)):
+            return [self.to_json_data(item) for item in output]
+        return output
 
     def format_output(self, output: Any) -> str:
         if isinstance(output, str):
             return self.format_str(output)
         elif isinstance(output, list):
             return self.format_list(output)
+        elif isinstance(output, Iterator):
+            return self.format_list(list(output))
         else:
             return self.format_object(output)
 
@@ -53,24 +101,29 @@ class OutputFormatter:
         return output
 
     def format_json_str(self, output):
-        return json.dumps(output, indent=True)
+        return codec.dumps(output, pretty=True)
 
     def format_json_list(self, output: list) -> str:
-        return json.dumps(output, default=lambda x: x.json_serialize(), indent=True)
+        return codec.dumps(output, default=_json_serialize, pretty=True)
+
+    def format_ndjson_item(self, output: Any) -> str:
+        return codec.dumps(output, default=_json_serialize)
 
     def format_json_object(self, output: Any) -> str:
-        return json.dumps(output, default=lambda x: x.json_serialize(), indent=True)
+        return codec.dumps(output, default=_json_serialize, pretty=True)
 
     def format_table(self, output: list) -> str:
-        result_table = []
-        for line in output:
-            result_table.append(line.table_serialize() if callable(getattr(line, "json_serialize", None)) else line)
+        if not all(isinstance(line, dict) or callable(getattr(line, "table_serialize", None)) for line in output):
+            return "\n".join(str(line) for line in output)
 
-        return tabulate.tabulate(result_table, headers="keys")
+        return TableRenderer().render(output)
 
     def format_object_default(self, output: Any) -> str:
+        if not isinstance(output, dict) and not callable(getattr(output, "table_serialize", None)):
+            return str(output)
+
         result_table = []
-        for (k, v) in output.table_serialize().items():
+        for k, v in (output if isinstance(output, dict) else output.table_serialize()).items():
             result_table.append([k, v])
 
         return tabulate.tabulate(result_table)
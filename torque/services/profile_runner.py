@@ -0,0 +1,148 @@
+import io
+import logging
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, List
+
+from docopt import DocoptExit
+
+from torque.services.task_graph import TaskGraph
+
+logger = logging.getLogger(__name__)
+
+# max number of profiles a command runs against at the same time
+MAX_CONCURRENT_PROFILES = 8
+
+
+class SpaceRow(object):
+    """Item of the output of a command run against one of several profiles, labeled with the space it comes from"""
+
+    __slots__ = ("space", "item")
+
+    def __init__(self, space: str, item: Any):
+        self.space = space
+        self.item = item
+
+    def json_serialize(self) -> dict:
+        item = self.item
+        if callable(getattr(item, "json_serialize", None)):
+            item = item.json_serialize()
+        return self._labeled(item)
+
+    def table_serialize(self) -> dict:
+        item = self.item
+        if callable(getattr(item, "table_serialize", None)):
+            item = item.table_serialize()
+        return self._labeled(item)
+
+    def _labeled(self, item: Any) -> dict:
+        if isinstance(item, dict):
+            return {"space": self.space, **item}
+        return {"space": self.space, "output": item}
+
+
+class ProfileResult(object):
+    __slots__ = ("profile", "space", "success", "output", "messages", "log_records", "error")
+
+    def __init__(self, profile: str, space: str):
+        self.profile = profile
+        self.space = space
+        self.success = False
+        self.output: Any = None
+        self.messages = ""
+        self.log_records: List[logging.LogRecord] = []
+        self.error: str = None
+
+
+class _LogCapture(logging.Filter):
+    """Filter of the log handlers holding back records logged by a thread running a command, so that they can be
+    reported together with the profile they belong to"""
+
+    def __init__(self):
+        super(_LogCapture, self).__init__()
+        self._local = threading.local()
+
+    @contextmanager
+    def collect(self, records: list):
+        self._local.records = records
+        try:
+            yield
+        finally:
+            self._local.records = None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        records = getattr(self._local, "records", None)
+        if records is None:
+            return True
+        # every handler asks about the same record
+        if not any(record is collected for collected in records):
+            records.append(record)
+        return False
+
+
+class ProfileRunner(object):
+    """Runs the same command against several profiles concurrently.
+
+    Every command has its own client (so its own session, token and connection pool). Messages the commands print
+    and log while running are collected per profile, and outputs are returned in the order of the commands so that
+    they can be merged into one output with a space column.
+    """
+
+    def __init__(self, commands: list, max_workers: int = MAX_CONCURRENT_PROFILES):
+        for command in commands:
+            if not command.supports_multiple_profiles():
+                raise DocoptExit("This command can't run against several profiles, use --profile instead")
+        self.commands = commands
+        self.max_workers = max(1, min(max_workers, len(commands)))
+
+    def run(self) -> List[ProfileResult]:
+        capture = _LogCapture()
+        handlers = list(logging.getLogger().handlers)
+        for handler in handlers:
+            handler.addFilter(capture)
+        try:
+            with TaskGraph("profiles", max_workers=self.max_workers) as graph:
+                for index, command in enumerate(self.commands):
+                    graph.add(
+                        f"{index}:{command.client.profile}",
+                        lambda command=command: self._run_command(command, capture),
+                    )
+                # usage errors are the same for every profile, the first one is reported as in a single profile run
+                return [
+                    graph.result(f"{index}:{command.client.profile}") for index, command in enumerate(self.commands)
+                ]
+        finally:
+            for handler in handlers:
+                handler.removeFilter(capture)
+
+    @staticmethod
+    def _run_command(command, capture: _LogCapture) -> ProfileResult:
+        result = ProfileResult(command.client.profile, command.client.space)
+        messages = command.output_formatter.message_stream = io.StringIO()
+        try:
+            with capture.collect(result.log_records):
+                result.success, result.output = command.run_action()
+                # pages of streamed outputs are fetched here, concurrently with the other profiles
+                if isinstance(result.output, Iterator):
+                    result.output = list(result.output)
+        except DocoptExit:
+            raise
+        except Exception as e:
+            logger.debug(f"Command failed for profile '{result.profile}'", exc_info=True)
+            result.success = False
+            result.error = str(e)
+        finally:
+            result.messages = messages.getvalue()
+        return result
+
+    @staticmethod
+    def merge(results: List[ProfileResult]) -> List[SpaceRow]:
+        """Outputs of the successful runs as one list of rows labeled with their space"""
+        rows = []
+        for result in results:
+            if not result.success or not result.output:
+                continue
+            items = result.output if isinstance(result.output, list) else [result.output]
+            rows.extend(SpaceRow(result.space, item) for item in items)
+        return rows
@@ -0,0 +1,308 @@
+"""
+Field projection (--fields) and a JMESPath-like query language (--query) for command outputs.
+
+Supported query syntax:
+    a.b.c                   sub-expressions
+    a[0], a[-1]             index expressions
+    a[*].b                  list projections
+    a[?b=='x'].c            filter projections (==, !=, <, <=, >, >= with 'raw', `json` or number literals)
+    a[?b].c                 filter projections keeping items whose b is truthy (not false, null or empty)
+    a[].b                   flatten projections
+    {x: a.b, y: c}          multi-select hashes
+    [a, b.c]                multi-select lists
+    a | b                   pipes (stop projections)
+    @                       current node
+"""
+
+import json
+import re
+from typing import Any, Callable, List
+
+from torque.exceptions import QueryError
+
+
+def parse_fields(fields: str) -> List[List[str]]:
+    """Parse comma-separated list of dotted paths: "a,b.c" -> [["a"], ["b", "c"]]"""
+    if not fields:
+        return []
+
+    paths = []
+    for field in fields.split(","):
+        path = [key.strip() for key in field.strip().split(".")]
+        if not all(path):
+            raise QueryError(f"Invalid field '{field.strip()}'")
+        paths.append(path)
+    return paths
+
+
+def project_fields(json_obj: Any, paths: List[List[str]]) -> Any:
+    """Keep only provided paths of json object. Lists on the way are projected element-wise"""
+    if not paths:
+        return json_obj
+
+    if isinstance(json_obj, list):
+        return [project_fields(item, paths) for item in json_obj]
+
+    if not isinstance(json_obj, dict):
+        return None
+
+    grouped = {}
+    for path in paths:
+        grouped.setdefault(path[0], []).append(path[1:])
+
+    result = {}
+    for key, sub_paths in grouped.items():
+        if key not in json_obj:
+            continue
+        if not all(sub_paths):
+            result[key] = json_obj[key]
+        else:
+            result[key] = project_fields(json_obj[key], sub_paths)
+    return result
+
+
+def flatten(json_obj: dict, prefix: str = "") -> dict:
+    """Flatten nested dicts to a single level dict with dotted keys (used for table output)"""
+    result = {}
+    for key, value in json_obj.items():
+        full_key = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            result.update(flatten(value, f"{full_key}."))
+        else:
+            result[full_key] = value
+    return result
+
+
+class Query:
+    """Compiled --query expression"""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self._evaluate = _QueryParser(expression).parse()
+
+    def search(self, document: Any) -> Any:
+        return self._evaluate(document)
+
+
+_TOKEN_REGEX = re.compile(
+    r"""
+    (?P<ws>\s+)
+    |(?P<number>-?\d+)
+    |(?P<identifier>[A-Za-z_][A-Za-z0-9_]*)
+    |(?P<quoted>"(?:[^"\\]|\\.)*")
+    |(?P<raw>'(?:[^'\\]|\\.)*')
+    |(?P<json>`(?:[^`\\]|\\.)*`)
+    |(?P<op>==|!=|<=|>=|<|>)
+    |(?P<punct>[.\[\]{}:,*?@|])
+    """,
+    re.VERBOSE,
+)
+
+_COMPARATORS = {
+    "==": lambda left, right: left == right,
+    "!=": lambda left, right: left != right,
+    "<": lambda left, right: _comparable(left, right) and left < right,
+    "<=": lambda left, right: _comparable(left, right) and left <= right,
+    ">": lambda left, right: _comparable(left, right) and left > right,
+    ">=": lambda left, right: _comparable(left, right) and left >= right,
+}
+
+
+def _comparable(left: Any, right: Any) -> bool:
+    numbers = (int, float)
+    return (isinstance(left, numbers) and isinstance(right, numbers)) or (
+        isinstance(left, str) and isinstance(right, str)
+    )
+
+
+def _is_truthy(value: Any) -> bool:
+    """JMESPath truthiness: false, null and empty strings, lists and objects are false, anything else (0 too) true"""
+    return not (value is None or value is False or (isinstance(value, (str, list, dict)) and not value))
+
+
+def _tokenize(expression: str) -> list:
+    tokens = []
+    position = 0
+    while position < len(expression):
+        match = _TOKEN_REGEX.match(expression, position)
+        if not match:
+            raise QueryError(f"Unexpected character '{expression[position]}' at position {position}")
+        position = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "ws":
+            continue
+        if kind == "quoted":
+            kind, value = "identifier", json.loads(value)
+        elif kind == "raw":
+            kind, value = "literal", value[1:-1].replace("\\'", "'")
+        elif kind == "json":
+            try:
+                kind, value = "literal", json.loads(value[1:-1].replace("\\`", "`"))
+            except ValueError:
+                raise QueryError(f"Invalid JSON literal {value}")
+        elif kind == "number":
+            value = int(value)
+        tokens.append((kind, value))
+    tokens.append(("eof", None))
+    return tokens
+
+
+class _QueryParser:
+    """Recursive descent parser compiling expression into a chain of closures"""
+
+    def __init__(self, expression: str):
+        self.tokens = _tokenize(expression)
+        self.position = 0
+
+    def parse(self) -> Callable:
+        node = self._expression()
+        self._expect("eof")
+        return node
+
+    def _peek(self, value=None, offset: int = 0) -> bool:
+        kind, token = self.tokens[self.position + offset]
+        return token == value if value is not None else kind
+
+    def _next(self):
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def _accept(self, value) -> bool:
+        if self.tokens[self.position][1] == value and self.tokens[self.position][0] in ("punct", "op"):
+            self.position += 1
+            return True
+        return False
+
+    def _expect(self, kind_or_value):
+        kind, value = self._next()
+        if kind_or_value not in (kind, value):
+            raise QueryError(f"Expected '{kind_or_value}' but got '{value if value is not None else kind}'")
+        return value
+
+    def _expression(self) -> Callable:
+        node = self._chain()
+        while self._accept("|"):
+            left, right = node, self._chain()
+            node = lambda data, left=left, right=right: right(left(data))  # noqa: E731
+        return node
+
+    def _chain(self) -> Callable:
+        return self._postfix(self._primary())
+
+    def _primary(self) -> Callable:
+        kind, value = self.tokens[self.position]
+        if kind == "identifier":
+            self._next()
+            return lambda data: data.get(value) if isinstance(data, dict) else None
+        if self._accept("@"):
+            return lambda data: data
+        if self._accept("{"):
+            return self._multi_select_hash()
+        if self._peek("[") and self._is_multi_select_list():
+            self._next()
+            return self._multi_select_list()
+        if self._peek("["):
+            return lambda data: data
+        if kind in ("literal", "number"):
+            self._next()
+            return lambda data: value
+        raise QueryError(f"Unexpected token '{value if value is not None else kind}'")
+
+    def _is_multi_select_list(self) -> bool:
+        next_kind, next_value = self.tokens[self.position + 1]
+        return next_value not in ("*", "?", "]") and next_kind != "number"
+
+    def _postfix(self, node: Callable) -> Callable:
+        while True:
+            if self._accept("."):
+                right = self._dot_target()
+                node = lambda data, left=node, right=right: right(left(data))  # noqa: E731
+            elif self._peek("["):
+                self._next()
+                if self._peek() == "number":
+                    index = self._next()[1]
+                    self._expect("]")
+                    node = lambda data, left=node, index=index: self._index(left(data), index)  # noqa: E731
+                    continue
+                return self._projection(node)
+            else:
+                return node
+
+    def _dot_target(self) -> Callable:
+        if self._accept("{"):
+            return self._multi_select_hash()
+        if self._accept("["):
+            return self._multi_select_list()
+        if self._accept("*"):
+            return lambda data: list(data.values()) if isinstance(data, dict) else None
+        name = self._expect("identifier")
+        return lambda data: data.get(name) if isinstance(data, dict) else None
+
+    def _projection(self, left: Callable) -> Callable:
+        condition = None
+        flatten_list = False
+        if self._accept("*"):
+            pass
+        elif self._accept("?"):
+            condition = self._comparison()
+        else:
+            flatten_list = True
+        self._expect("]")
+
+        right = self._postfix(lambda data: data)
+
+        def project(data):
+            items = left(data)
+            if not isinstance(items, list):
+                return None
+            if flatten_list:
+                items = [sub for item in items for sub in (item if isinstance(item, list) else [item])]
+            if condition:
+                items = [item for item in items if condition(item)]
+            result = (right(item) for item in items)
+            return [item for item in result if item is not None]
+
+        return project
+
+    def _comparison(self) -> Callable:
+        left = self._chain()
+        if self.tokens[self.position] == ("punct", "]"):
+            # bare filter: keep items for which the expression is truthy
+            return lambda data: _is_truthy(left(data))
+        kind, op = self._next()
+        if kind != "op":
+            raise QueryError(f"Expected comparison operator but got '{op}'")
+        right = self._chain()
+        compare = _COMPARATORS[op]
+        return lambda data: compare(left(data), right(data))
+
+    def _multi_select_hash(self) -> Callable:
+        pairs = []
+        while True:
+            key = self._expect("identifier")
+            self._expect(":")
+            pairs.append((key, self._expression()))
+            if self._accept("}"):
+                break
+            self._expect(",")
+        return lambda data: None if data is None else {key: value(data) for key, value in pairs}
+
+    def _multi_select_list(self) -> Callable:
+        items = []
+        while True:
+            items.append(self._expression())
+            if self._accept("]"):
+                break
+            self._expect(",")
+        return lambda data: None if data is None else [item(data) for item in items]
+
+    @staticmethod
+    def _index(data: Any, index: int) -> Any:
+        if not isinstance(data, list):
+            return None
+        try:
+            return data[index]
+        except IndexError:
+            return None
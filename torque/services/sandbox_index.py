@@ -0,0 +1,279 @@
+"""
+Local SQLite index of sandboxes, per space, answering `sb list --cached`, `sb search` and `--since` queries without
+API calls. The index is updated from every listing and by start/end/get/status commands and refreshed in a background
+process when it gets stale:
+
+    $ python -m torque.services.sandbox_index     # refresh using TORQUE_SPACE/TORQUE_TOKEN/TORQUE_HOSTNAME
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from torque.sandboxes import Sandbox, SandboxesManager
+from torque.services.validation_cache import DEFAULT_CACHE_DIR
+
+INDEX_FILE = "sandboxes.db"
+# index older than this (in seconds) is refreshed in background
+REFRESH_INTERVAL = 60
+REFRESH_COUNT = 200
+# maximum number of candidates reported for an ambiguous reference
+RESOLVE_LIMIT = 10
+# references of this shape may be whole sandbox ids, which can be requested directly
+_SANDBOX_ID = re.compile(r"[A-Za-z0-9]{12,}")
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sandboxes (
+    space TEXT NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT,
+    blueprint_name TEXT,
+    status TEXT,
+    owner TEXT,
+    mine INTEGER NOT NULL DEFAULT 0,
+    start_time REAL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (space, id)
+);
+CREATE INDEX IF NOT EXISTS sandboxes_start_time ON sandboxes (space, start_time);
+CREATE TABLE IF NOT EXISTS refreshes (
+    space TEXT PRIMARY KEY,
+    refreshed_at REAL,
+    started_at REAL
+);
+"""
+
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def parse_since(value: str, now: float = None) -> float:
+    """Convert relative ('30m', '2h', '1d', '1w') or ISO 8601 time to a unix timestamp"""
+    match = re.fullmatch(r"\s*(\d+)\s*([smhdw])\s*", value)
+    if match:
+        return (now or time.time()) - int(match.group(1)) * _DURATION_UNITS[match.group(2)]
+    return _parse_timestamp(value)
+
+
+def _parse_timestamp(value: str) -> float:
+    try:
+        moment = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Unable to parse time '{value}', use e.g. 30m, 2h, 1d or 2021-05-01T10:00")
+    if moment.tzinfo is None:
+        moment = moment.astimezone()
+    return moment.timestamp()
+
+
+def looks_like_sandbox_id(reference: str) -> bool:
+    return bool(_SANDBOX_ID.fullmatch(reference))
+
+
+def _escape_like(text: str) -> str:
+    return re.sub(r"([%_\\])", r"\\\1", text)
+
+
+def _to_timestamp(value) -> Optional[float]:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and value:
+        try:
+            return _parse_timestamp(value)
+        except ValueError:
+            return None
+    return None
+
+
+class SandboxIndex(object):
+    def __init__(self, space: str, cache_dir: str = ""):
+        self.space = space
+        self.path = Path(cache_dir or DEFAULT_CACHE_DIR).expanduser() / INDEX_FILE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.path), timeout=5)
+        self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def upsert(self, sandboxes: Iterable[Sandbox], mine: bool = False) -> int:
+        now = time.time()
+        rows = [
+            (
+                self.space,
+                sb.sandbox_id,
+                sb.name,
+                sb.blueprint_name,
+                getattr(sb, "sandbox_status", None),
+                getattr(sb, "owner", None),
+                int(mine),
+                _to_timestamp(getattr(sb, "start_time", None)),
+                now,
+            )
+            for sb in sandboxes
+        ]
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO sandboxes (space, id, name, blueprint_name, status, owner, mine, start_time, updated_at) "
+                # sandboxes without known start time are ordered by the time they were first seen
+                "VALUES (?, ?, ?, ?, ?, ?, ?, COALESCE(?, ?), ?) "
+                "ON CONFLICT (space, id) DO UPDATE SET name = excluded.name, "
+                "blueprint_name = excluded.blueprint_name, status = COALESCE(excluded.status, status), "
+                "owner = COALESCE(excluded.owner, owner), mine = MAX(mine, excluded.mine), "
+                "start_time = COALESCE(start_time, excluded.start_time), updated_at = excluded.updated_at",
+                [row[:8] + (now,) + row[8:] for row in rows],
+            )
+        return len(rows)
+
+    def set_status(self, sandbox_id: str, status: str) -> None:
+        with self._connection:
+            self._connection.execute(
+                "UPDATE sandboxes SET status = ?, updated_at = ? WHERE space = ? AND id = ?",
+                (status, time.time(), self.space, sandbox_id),
+            )
+
+    def list(
+        self,
+        list_filter: str = "all",
+        show_ended: bool = False,
+        count: int = 25,
+        since: float = None,
+        statuses: List[str] = None,
+    ) -> list:
+        if statuses:
+            condition = f"AND LOWER(status) IN ({', '.join('?' * len(statuses))})"
+            return self._select(condition, [status.lower() for status in statuses], list_filter, True, count, since)
+        return self._select("", [], list_filter, show_ended, count, since)
+
+    def search(self, text: str, show_ended: bool = True, count: int = 25, since: float = None) -> list:
+        """Case insensitive search of the text in sandbox ids, names and blueprint names"""
+        pattern = "%" + _escape_like(text) + "%"
+        condition = "AND (id LIKE ? ESCAPE '\\' OR name LIKE ? ESCAPE '\\' OR blueprint_name LIKE ? ESCAPE '\\')"
+        return self._select(condition, [pattern] * 3, "all", show_ended, count, since)
+
+    def resolve(self, reference: str) -> list:
+        """Sandboxes a reference may point at: the one with exactly this id, otherwise the ones with exactly this
+        name (not ended ones are preferred), otherwise the ones which id starts with the reference"""
+        rows = self._select("AND id = ?", [reference], "all", True, 1, None)
+        if rows:
+            return rows
+
+        rows = self._select("AND name = ?", [reference], "all", True, RESOLVE_LIMIT, None)
+        if rows:
+            return [row for row in rows if row[3] != "Ended"] or rows
+
+        pattern = _escape_like(reference) + "%"
+        return self._select("AND id LIKE ? ESCAPE '\\'", [pattern], "all", True, RESOLVE_LIMIT, None)
+
+    def is_outdated(self, sandbox_id: str, max_age: float = REFRESH_INTERVAL) -> bool:
+        """Whether the sandbox was last seen on the server more than max_age seconds ago"""
+        row = self._connection.execute(
+            "SELECT updated_at FROM sandboxes WHERE space = ? AND id = ?", (self.space, sandbox_id)
+        ).fetchone()
+        return row is None or time.time() - row[0] > max_age
+
+    def _select(
+        self, condition: str, params: list, list_filter: str, show_ended: bool, count: int, since: Optional[float]
+    ) -> list:
+        query = "SELECT id, name, blueprint_name, status, owner, start_time FROM sandboxes WHERE space = ? " + condition
+        params = [self.space] + params
+        if list_filter == "my":
+            query += " AND mine = 1"
+        if not show_ended:
+            query += " AND (status IS NULL OR status != 'Ended')"
+        if since is not None:
+            query += " AND start_time >= ?"
+            params.append(since)
+        query += " ORDER BY start_time DESC LIMIT ?"
+        params.append(count)
+        return self._connection.execute(query, params).fetchall()
+
+    def to_sandboxes(self, manager: SandboxesManager, rows: list) -> List[Sandbox]:
+        sandboxes = []
+        for sandbox_id, name, blueprint_name, status, owner, start_time in rows:
+            sb = Sandbox(manager, sandbox_id, name, blueprint_name)
+            sb.sandbox_status = status
+            sb.owner = owner
+            sb.start_time = datetime.fromtimestamp(start_time, timezone.utc).isoformat() if start_time else None
+            sandboxes.append(sb)
+        return sandboxes
+
+    @property
+    def refreshed_at(self) -> Optional[float]:
+        row = self._connection.execute("SELECT refreshed_at FROM refreshes WHERE space = ?", (self.space,)).fetchone()
+        return row[0] if row else None
+
+    def is_stale(self, max_age: float = REFRESH_INTERVAL) -> bool:
+        return self.refreshed_at is None or time.time() - self.refreshed_at > max_age
+
+    def refresh(self, manager: SandboxesManager, count: int = REFRESH_COUNT) -> int:
+        """Fetch the latest sandboxes page by page, own sandboxes are requested separately to mark them"""
+        total = 0
+        for list_filter in ("my", "all"):
+            for page in manager.list_pages(count=count, filter_opt=list_filter):
+                total += self.upsert(page, mine=list_filter == "my")
+        self._mark_refreshed()
+        return total
+
+    def _mark_refreshed(self) -> None:
+        with self._connection:
+            self._connection.execute(
+                "INSERT INTO refreshes (space, refreshed_at) VALUES (?, ?) "
+                "ON CONFLICT (space) DO UPDATE SET refreshed_at = excluded.refreshed_at",
+                (self.space, time.time()),
+            )
+
+    def refresh_in_background(self, token: str, account: str = None) -> bool:
+        """Start a detached process refreshing the index unless one was started recently"""
+        now = time.time()
+        with self._connection:
+            started = self._connection.execute(
+                "UPDATE refreshes SET started_at = ? WHERE space = ? AND (started_at IS NULL OR started_at < ?)",
+                (now, self.space, now - REFRESH_INTERVAL),
+            ).rowcount
+            if not started:
+                started = self._connection.execute(
+                    "INSERT OR IGNORE INTO refreshes (space, started_at) VALUES (?, ?)", (self.space, now)
+                ).rowcount
+        if not started:
+            return False
+
+        env = dict(os.environ, TORQUE_SPACE=self.space, TORQUE_TOKEN=token, TORQUE_CACHE_DIR=str(self.path.parent))
+        if account:
+            env["TORQUE_ACCOUNT"] = account
+        try:
+            subprocess.Popen(
+                [sys.executable, "-m", __name__],
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+        except OSError as e:
+            logger.debug(f"Unable to start background refresh of the sandbox index. Details: {e}")
+            return False
+        return True
+
+
+def main() -> None:
+    from torque.client import TorqueClient
+
+    space = os.environ["TORQUE_SPACE"]
+    client = TorqueClient(space=space, token=os.environ["TORQUE_TOKEN"], account=os.environ.get("TORQUE_ACCOUNT"))
+    index = SandboxIndex(space, os.environ.get("TORQUE_CACHE_DIR", ""))
+    try:
+        index.refresh(SandboxesManager(client))
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
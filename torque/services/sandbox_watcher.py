@@ -0,0 +1,134 @@
+import logging
+import time
+from datetime import datetime, timezone
+from itertools import chain
+from typing import Callable, Dict, Iterator, List, Optional
+
+from torque.sandboxes import Sandbox, SandboxesManager
+
+# statuses a sandbox does not leave by itself, explicitly watched sandboxes are watched until all of them are settled
+SETTLED_STATUSES = ("Active", "Active With Error", "Ended", "Ended With Error", "Terminating Failed")
+# seconds between polls
+DEFAULT_INTERVAL = 5
+# latest sandboxes listed to find explicitly watched sandboxes in
+WATCH_LIST_COUNT = 25
+
+ADDED = "added"
+CHANGED = "changed"
+REMOVED = "removed"
+
+logger = logging.getLogger(__name__)
+
+
+class SandboxEvent(object):
+    """A sandbox seen for the first time, a change of its status or its disappearance from the watched listing"""
+
+    __slots__ = ("event", "sandbox_id", "name", "blueprint_name", "status", "previous_status", "time")
+
+    def __init__(self, event: str, sandbox: Sandbox, previous_status: Optional[str] = None, event_time: str = None):
+        self.event = event
+        self.sandbox_id = sandbox.sandbox_id
+        self.name = sandbox.name
+        self.blueprint_name = sandbox.blueprint_name
+        self.status = sandbox.sandbox_status
+        self.previous_status = previous_status
+        self.time = event_time or datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    def json_serialize(self) -> dict:
+        return {
+            "event": self.event,
+            "id": self.sandbox_id,
+            "name": self.name,
+            "blueprint_name": self.blueprint_name,
+            "status": self.status,
+            "previous_status": self.previous_status,
+            "time": self.time,
+        }
+
+
+class SandboxWatcher(object):
+    """Polls sandboxes and reports what changed since the previous poll.
+
+    Every poll is a single listing request: either the listing matching the filters, or, when sandbox ids are
+    given, a single page of the WATCH_LIST_COUNT latest sandboxes. Only watched sandboxes too old to be on that page
+    are requested one by one, so a poll of N ids makes at most 1 + N requests and just one when all of them are
+    recent.
+    """
+
+    def __init__(
+        self,
+        manager: SandboxesManager,
+        sandbox_ids: List[str] = None,
+        list_filter: str = "my",
+        show_ended: bool = False,
+        statuses: List[str] = None,
+        count: int = 25,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.manager = manager
+        self.sandbox_ids = sandbox_ids or []
+        self.list_filter = list_filter
+        self.show_ended = show_ended
+        self.statuses = statuses
+        self.count = count
+        self.sandboxes: Dict[str, Sandbox] = {}
+        self._sleep = sleep
+
+    @property
+    def settled(self) -> bool:
+        """Whether all explicitly watched sandboxes reached a status they don't leave by themselves"""
+        if not self.sandbox_ids:
+            return False
+        return all(sandbox.sandbox_status in SETTLED_STATUSES for sandbox in self.sandboxes.values())
+
+    def poll(self) -> List[SandboxEvent]:
+        current = {sandbox.sandbox_id: sandbox for sandbox in self._fetch()}
+        event_time = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+        events = []
+        for sandbox_id, sandbox in current.items():
+            previous = self.sandboxes.get(sandbox_id)
+            if previous is None:
+                events.append(SandboxEvent(ADDED, sandbox, event_time=event_time))
+            elif previous.sandbox_status != sandbox.sandbox_status:
+                events.append(SandboxEvent(CHANGED, sandbox, previous.sandbox_status, event_time))
+        for sandbox_id, sandbox in self.sandboxes.items():
+            if sandbox_id not in current:
+                events.append(SandboxEvent(REMOVED, sandbox, sandbox.sandbox_status, event_time))
+
+        self.sandboxes = current
+        return events
+
+    def follow(self, interval: float = DEFAULT_INTERVAL) -> Iterator[SandboxEvent]:
+        """Events of the next polls made every `interval` seconds, until the watched sandboxes are settled.
+        A failed poll is skipped, the next one reports all changes made in the meantime"""
+        while not self.settled:
+            self._sleep(interval)
+            try:
+                events = self.poll()
+            except Exception as e:
+                logger.warning(f"Unable to refresh sandboxes, trying again in {interval} seconds. Details: {e}")
+                continue
+            yield from events
+
+    def _fetch(self) -> List[Sandbox]:
+        if not self.sandbox_ids:
+            pages = self.manager.list_pages(
+                count=self.count,
+                filter_opt=self.list_filter,
+                page_size=self.count,
+                show_ended=self.show_ended,
+                statuses=self.statuses,
+            )
+            return list(chain.from_iterable(pages))
+
+        wanted = set(self.sandbox_ids)
+        found: Dict[str, Sandbox] = {
+            sandbox.sandbox_id: sandbox
+            for sandbox in self.manager.list(count=WATCH_LIST_COUNT, filter_opt="all")
+            if sandbox.sandbox_id in wanted
+        }
+
+        for sandbox_id in wanted - found.keys():
+            found[sandbox_id] = self.manager.get(sandbox_id)
+        return [found[sandbox_id] for sandbox_id in self.sandbox_ids]
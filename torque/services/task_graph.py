@@ -0,0 +1,67 @@
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from torque.services.tracer import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class TaskGraph(object):
+    """Runs named tasks in background threads, each one as soon as the tasks it depends on are done.
+
+    Tasks are started in the order they are added and may only depend on tasks added before them, so the graph is
+    acyclic and a task never waits for one which has not been started yet. A failure of a task is raised again by
+    the tasks depending on it, they don't run at all.
+    """
+
+    def __init__(self, name: str, max_workers: int = 4):
+        self.name = name
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._futures: Dict[str, Future] = {}
+        self._timings: Dict[str, Tuple[float, float]] = {}
+        self._start_time = time.perf_counter()
+
+    def add(self, name: str, func: Callable, after: Iterable[str] = ()) -> None:
+        dependencies = [self._futures[dependency] for dependency in after]
+        self._futures[name] = self._executor.submit(self._run, name, func, dependencies)
+
+    def _run(self, name: str, func: Callable, dependencies: List[Future]):
+        for dependency in dependencies:
+            dependency.result()
+        start_time = time.perf_counter()
+        try:
+            with tracer.span(f"{self.name}.{name}"):
+                return func()
+        finally:
+            self._timings[name] = (start_time, time.perf_counter())
+
+    def result(self, name: str):
+        """Waits for the task and returns its result or raises its exception"""
+        return self._futures[name].result()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "TaskGraph":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def breakdown(self) -> str:
+        """Start and duration of every task which has run, and the wall-clock saved by running them concurrently"""
+        if not self._timings:
+            return f"{self.name}: no tasks run"
+
+        lines = []
+        for name, (start, end) in sorted(self._timings.items(), key=lambda item: item[1][0]):
+            lines.append(f"  {name:<20} +{(start - self._start_time) * 1000:8.1f} ms {(end - start) * 1000:10.1f} ms")
+        serial = sum(end - start for start, end in self._timings.values())
+        elapsed = max(end for _, end in self._timings.values()) - self._start_time
+        summary = (
+            f"{self.name}: {serial * 1000:.1f} ms of work done in {elapsed * 1000:.1f} ms, "
+            f"{max(serial - elapsed, 0) * 1000:.1f} ms saved"
+        )
+        return "\n".join([summary] + lines)
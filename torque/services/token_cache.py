@@ -0,0 +1,99 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from torque.services.validation_cache import DEFAULT_CACHE_DIR
+
+TOKENS_CACHE_FILE = "tokens.json"
+# lifetime assumed when the login response does not tell it
+DEFAULT_TOKEN_LIFETIME = 3600
+# tokens closer than this (in seconds) to expiry are refreshed in background
+REFRESH_MARGIN = 300
+# tokens closer than this to expiry are not used at all
+EXPIRY_MARGIN = 30
+
+logger = logging.getLogger(__name__)
+
+
+class CachedToken(object):
+    __slots__ = ("access_token", "expires_at")
+
+    def __init__(self, access_token: str, expires_at: float):
+        self.access_token = access_token
+        self.expires_at = expires_at
+
+    def expires_in(self) -> float:
+        return self.expires_at - time.time()
+
+    @property
+    def usable(self) -> bool:
+        return self.expires_in() > EXPIRY_MARGIN
+
+    @property
+    def expires_soon(self) -> bool:
+        return self.expires_in() <= REFRESH_MARGIN
+
+
+class TokenCache(object):
+    """Access tokens of account/email/password logins, keyed by host, account and email.
+    The file is readable and writable by the user only and keeps no credentials"""
+
+    def __init__(self, cache_dir: str = ""):
+        self.path = Path(cache_dir or DEFAULT_CACHE_DIR).expanduser() / TOKENS_CACHE_FILE
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(host: str, account: str, email: str) -> str:
+        return hashlib.sha256(f"{host}\n{account}\n{email.lower()}".encode("utf-8")).hexdigest()
+
+    def get(self, host: str, account: str, email: str) -> Optional[CachedToken]:
+        entry = self._load().get(self._key(host, account, email))
+        if not entry:
+            return None
+        return CachedToken(entry["access_token"], entry["expires_at"])
+
+    def store(self, host: str, account: str, email: str, access_token: str, expires_in: float = None) -> CachedToken:
+        token = CachedToken(access_token, time.time() + (expires_in or DEFAULT_TOKEN_LIFETIME))
+        with self._lock:
+            tokens = self._load()
+            tokens[self._key(host, account, email)] = {
+                "access_token": token.access_token,
+                "expires_at": token.expires_at,
+            }
+            # expired tokens are of no use to anybody
+            self._save({key: entry for key, entry in tokens.items() if entry["expires_at"] > time.time()})
+        return token
+
+    def remove(self, host: str, account: str, email: str) -> None:
+        with self._lock:
+            tokens = self._load()
+            if tokens.pop(self._key(host, account, email), None):
+                self._save(tokens)
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path) as cache_file:
+                return json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, tokens: dict) -> None:
+        temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # created with user only permissions, the file is never readable by others even for a moment
+            descriptor = os.open(str(temp_path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(descriptor, "w") as cache_file:
+                json.dump(tokens, cache_file)
+            os.replace(str(temp_path), str(self.path))
+        except OSError as e:
+            logger.debug(f"Unable to save token cache to {self.path}. Details: {e}")
+            try:
+                os.unlink(str(temp_path))
+            except OSError:
+                pass
@@ -0,0 +1,146 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, List
+
+
+class Span(object):
+    __slots__ = ("name", "start", "end", "args", "children", "thread_id", "thread_name")
+
+    def __init__(self, name: str, start: float, args: dict = None):
+        self.name = name
+        self.start = start
+        self.end = None
+        self.args = args or {}
+        self.children = []
+        current_thread = threading.current_thread()
+        self.thread_id = current_thread.ident
+        self.thread_name = current_thread.name
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+
+
+class Tracer(object):
+    """Lightweight span/timer instrumentation. Does nothing (apart from a flag check) until enabled"""
+
+    def __init__(self):
+        self.enabled = False
+        self.roots: List[Span] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def reset(self) -> None:
+        self.roots = []
+        self._local = threading.local()
+
+    @contextmanager
+    def span(self, name: str, start_time: float = None, **args):
+        if not self.enabled:
+            yield None
+            return
+
+        span = self._start(Span(name, start_time or time.perf_counter(), args))
+        try:
+            yield span
+        finally:
+            span.end = time.perf_counter()
+            self._stack.pop()
+
+    def record(self, name: str, start_time: float, end_time: float, **args) -> None:
+        """Add already finished span to the current one"""
+        if not self.enabled:
+            return
+
+        span = Span(name, start_time, args)
+        span.end = end_time
+        self._start(span)
+        self._stack.pop()
+
+    @property
+    def _stack(self) -> List[Span]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _start(self, span: Span) -> Span:
+        if self._stack:
+            self._stack[-1].children.append(span)
+        else:
+            with self._lock:
+                self.roots.append(span)
+        self._stack.append(span)
+        return span
+
+    def render_tree(self) -> str:
+        lines = []
+        main_thread_id = threading.main_thread().ident
+        for root in self.roots:
+            if root.thread_id != main_thread_id:
+                lines.append(f"[thread {root.thread_name}]")
+            self._render_span(root, 0, lines)
+        return "\n".join(lines)
+
+    def _render_span(self, span: Span, depth: int, lines: List[str]) -> None:
+        args = " ".join(f"{key}={value}" for key, value in span.args.items())
+        label = f"{'  ' * depth}{span.name}"
+        lines.append(f"{label:<70} {span.duration * 1000:10.1f} ms  {args}".rstrip())
+        for child in span.children:
+            self._render_span(child, depth + 1, lines)
+
+    def to_chrome_trace(self) -> dict:
+        """Trace in Chrome 'Trace Event Format' which can be loaded into chrome://tracing or Perfetto"""
+        events = []
+        origin = min((root.start for root in self.roots), default=0)
+        pid = os.getpid()
+
+        def add_events(span: Span):
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": "torque",
+                    "ph": "X",
+                    "ts": round((span.start - origin) * 1e6, 1),
+                    "dur": round(span.duration * 1e6, 1),
+                    "pid": pid,
+                    "tid": span.thread_id,
+                    "args": {key: str(value) for key, value in span.args.items()},
+                }
+            )
+            for child in span.children:
+                add_events(child)
+
+        for root in self.roots:
+            add_events(root)
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, filename: str) -> None:
+        with open(filename, "w") as trace_file:
+            json.dump(self.to_chrome_trace(), trace_file)
+
+
+tracer = Tracer()
+
+
+def traced(name: str) -> Callable:
+    """Decorator wrapping each call of the function into a span"""
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,51 @@
+import json
+import logging
+import time
+from pathlib import Path
+from typing import List
+
+DEFAULT_CACHE_DIR = "~/.torque/cache"
+VALIDATIONS_CACHE_FILE = "validations.json"
+
+logger = logging.getLogger(__name__)
+
+
+class BlueprintValidationCache(object):
+    """Local store of blueprint content hashes mapped to the last validation result, per space"""
+
+    def __init__(self, space: str, cache_dir: str = ""):
+        self.space = space
+        self.cache_path = Path(cache_dir or DEFAULT_CACHE_DIR).expanduser() / VALIDATIONS_CACHE_FILE
+        self._spaces = self._load()
+
+    @property
+    def _entries(self) -> dict:
+        return self._spaces.setdefault(self.space, {})
+
+    def is_valid(self, blueprint_name: str, content_hash: str) -> bool:
+        """Check if blueprint with the same content already passed validation"""
+        entry = self._entries.get(blueprint_name)
+        return bool(entry and entry.get("hash") == content_hash and entry.get("valid"))
+
+    def store(self, blueprint_name: str, content_hash: str, errors: List[str]) -> None:
+        self._entries[blueprint_name] = {
+            "hash": content_hash,
+            "valid": not errors,
+            "errors": errors,
+            "validated_at": int(time.time()),
+        }
+
+    def save(self) -> None:
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_path, "w") as cache_file:
+                json.dump(self._spaces, cache_file)
+        except OSError as e:
+            logger.debug(f"Unable to save validation cache to {self.cache_path}. Details: {e}")
+
+    def _load(self) -> dict:
+        try:
+            with open(self.cache_path) as cache_file:
+                return json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from requests import Response
+
+from torque.services.json_codec import codec
+from torque.services.validation_cache import DEFAULT_CACHE_DIR
+
+# documents kept per client, the least recently used ones are dropped first
+DEFAULT_MAX_ENTRIES = 64
+DOCUMENTS_CACHE_DIR = "documents"
+# documents kept on disk, the least recently stored ones are dropped first
+DEFAULT_MAX_FILES = 256
+
+logger = logging.getLogger(__name__)
+
+
+class CachedDocument(object):
+    __slots__ = ("etag", "last_modified", "content")
+
+    def __init__(self, etag: Optional[str], last_modified: Optional[str], content: bytes):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content = content
+
+    def conditional_headers(self) -> dict:
+        if self.etag:
+            return {"If-None-Match": self.etag}
+        return {"If-Modified-Since": self.last_modified}
+
+    def json(self):
+        # parsed again for every use, callers get their own copy of the document
+        return codec.loads(self.content)
+
+
+class ValidatorCache(object):
+    """Validators (ETag or Last-Modified) and bodies of the latest GET responses by url, so that the next request
+    of the same document can be conditional and an unchanged document is not downloaded again"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._documents: "OrderedDict[str, CachedDocument]" = OrderedDict()
+
+    def get(self, url: str) -> Optional[CachedDocument]:
+        with self._lock:
+            document = self._documents.get(url)
+            if document is not None:
+                self._documents.move_to_end(url)
+            return document
+
+    def store(self, url: str, response: Response) -> None:
+        """Keep the document of a successful response which has validators, forget an outdated one otherwise"""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code != 200 or not (etag or last_modified):
+            with self._lock:
+                self._documents.pop(url, None)
+            return
+
+        self._remember(url, CachedDocument(etag, last_modified, response.content))
+
+    def _remember(self, url: str, document: CachedDocument) -> None:
+        with self._lock:
+            self._documents[url] = document
+            self._documents.move_to_end(url)
+            while len(self._documents) > self.max_entries:
+                self._documents.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._documents)
+
+
+class PersistentValidatorCache(ValidatorCache):
+    """ValidatorCache which also keeps the documents in files under the cache directory, so that commands run one
+    after another (e.g. repeated `sb status`) send conditional requests too. Files are readable by the user only"""
+
+    def __init__(self, cache_dir: str = "", max_entries: int = DEFAULT_MAX_ENTRIES, max_files: int = DEFAULT_MAX_FILES):
+        super(PersistentValidatorCache, self).__init__(max_entries)
+        self.path = Path(cache_dir or DEFAULT_CACHE_DIR).expanduser() / DOCUMENTS_CACHE_DIR
+        self.max_files = max_files
+
+    def get(self, url: str) -> Optional[CachedDocument]:
+        document = super(PersistentValidatorCache, self).get(url)
+        if document is None:
+            document = self._load(url)
+            if document is not None:
+                self._remember(url, document)
+        return document
+
+    def store(self, url: str, response: Response) -> None:
+        super(PersistentValidatorCache, self).store(url, response)
+        with self._lock:
+            document = self._documents.get(url)
+        if document is None:
+            self._remove(url)
+        else:
+            self._save(url, document)
+
+    def _file(self, url: str) -> Path:
+        return self.path / hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _load(self, url: str) -> Optional[CachedDocument]:
+        # a line with the url and validators, followed by the body as received
+        try:
+            with open(self._file(url), "rb") as document_file:
+                header = json.loads(document_file.readline())
+                content = document_file.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.debug(f"Unable to read cached document of {url}. Details: {e}")
+            return None
+        if header.get("url") != url:
+            return None
+        return CachedDocument(header.get("etag"), header.get("last_modified"), content)
+
+    def _save(self, url: str, document: CachedDocument) -> None:
+        path = self._file(url)
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}")
+        header = {"url": url, "etag": document.etag, "last_modified": document.last_modified}
+        try:
+            self.path.mkdir(mode=0o700, parents=True, exist_ok=True)
+            descriptor = os.open(str(temp_path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(descriptor, "wb") as document_file:
+                document_file.write(json.dumps(header).encode("utf-8") + b"\n")
+                document_file.write(document.content)
+            os.replace(str(temp_path), str(path))
+        except OSError as e:
+            logger.debug(f"Unable to save cached document to {path}. Details: {e}")
+            try:
+                os.unlink(str(temp_path))
+            except OSError:
+                pass
+            return
+        self._prune()
+
+    def _remove(self, url: str) -> None:
+        try:
+            os.unlink(str(self._file(url)))
+        except OSError:
+            pass
+
+    def _prune(self) -> None:
+        try:
+            files = [entry for entry in os.scandir(str(self.path)) if entry.is_file()]
+            if len(files) <= self.max_files:
+                return
+            files.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in files[: len(files) - self.max_files]:
+                os.unlink(entry.path)
+        except OSError as e:
+            logger.debug(f"Unable to prune cached documents in {self.path}. Details: {e}")
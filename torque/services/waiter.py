@@ -8,9 +8,13 @@ from torque.branch.branch_utils import logger  # can_temp_branch_be_deleted, log
 from torque.commands.base import BaseCommand
 from torque.constants import DEFAULT_TIMEOUT, FINAL_SB_STATUSES
 from torque.sandboxes import SandboxesManager
+from torque.services.tracer import tracer
 
 
 class Waiter(object):
+    # seconds between sandbox status checks
+    POLL_INTERVAL = 5
+
     @staticmethod
     def wait_for_sandbox_to_launch(
         command: BaseCommand,
@@ -51,10 +55,13 @@ class Waiter(object):
                     #         spinner.green.ok("✔")
                     #         break
 
-                    time.sleep(5)
-                    spinner.text = f"[{int((datetime.datetime.now() - start_time).total_seconds())} sec]"
-                    sandbox = sb_manager.get(sandbox_id)
-                    status = getattr(sandbox, "sandbox_status")
+                    with tracer.span("waiter.tick") as span:
+                        time.sleep(Waiter.POLL_INTERVAL)
+                        spinner.text = f"[{int((datetime.datetime.now() - start_time).total_seconds())} sec]"
+                        sandbox = sb_manager.get(sandbox_id)
+                        status = getattr(sandbox, "sandbox_status")
+                        if span:
+                            span.args["status"] = status
                 else:
                     logger.error(f"Timeout Reached - Sandbox {sandbox_id} was not active after {timeout} minutes")
                     return True
@@ -1,4 +1,8 @@
+import threading
+from typing import Dict, Tuple
+
 from requests import Session
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 
 
 class TorqueSession(Session):
@@ -7,6 +11,17 @@ class TorqueSession(Session):
         super(TorqueSession, self).__init__()
 
         self.headers.update({"Accept": "application/json", "Accept-Charset": "utf-8"})
+        self.pool_size = DEFAULT_POOLSIZE
+        self.closed = False
+
+    def set_pool_size(self, pool_size: int) -> None:
+        """Makes the connection pool big enough to be shared by `pool_size` concurrent requests"""
+        if pool_size <= self.pool_size:
+            return
+
+        self.pool_size = pool_size
+        for prefix in ("https://", "http://"):
+            self.mount(prefix, HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size))
 
     def init_bearer_auth(self, token: str) -> None:
         """
@@ -14,3 +29,54 @@ class TorqueSession(Session):
         :rtype: object
         """
         self.headers.update({"Authorization": "Bearer {}".format(token)})
+
+    def close(self) -> None:
+        super(TorqueSession, self).close()
+        self.closed = True
+
+
+class SessionRegistry(object):
+    """Sessions shared by the clients of the same host and profile.
+
+    Every entry has its own connection pool and authorization header, so clients of different hosts or profiles
+    never affect each other. Sessions are closed by the registry, not by the clients using them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: Dict[Tuple[str, str], TorqueSession] = {}
+
+    def get(self, host: str, profile: str) -> TorqueSession:
+        """Session of the host and profile, a new one is created on first use or when the previous one was closed"""
+        key = (host, profile)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None or session.closed:
+                session = self._sessions[key] = TorqueSession()
+            return session
+
+    def close(self, host: str = None, profile: str = None) -> None:
+        """Close sessions of the host and/or profile, or all of them"""
+        with self._lock:
+            keys = [
+                key
+                for key in self._sessions
+                if (host is None or key[0] == host) and (profile is None or key[1] == profile)
+            ]
+            sessions = [self._sessions.pop(key) for key in keys]
+        for session in sessions:
+            session.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def __enter__(self) -> "SessionRegistry":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+# sessions of the clients created for profiles in this process
+session_registry = SessionRegistry()
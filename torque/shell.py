@@ -1,6 +1,8 @@
 """
-Usage: torque [--space=<space>] [--token=<token>] [--account=<account>] [--profile=<profile>] [--help] [--debug]
-               [--disable-version-check] <command> [<args>...]
+Usage: torque [--space=<space>] [--token=<token>] [--account=<account>]
+               [--profile=<profile> | --profiles=<profiles> | --all-profiles] [--help] [--debug]
+               [--disable-version-check] [--trace] [--trace-file=<file>] [--stats]
+               [--record=<file> | --replay=<file> [--replay-speed=<x>]] <command> [<args>...]
 
 Options:
   -h --help                 Show this screen.
@@ -18,24 +20,55 @@ Options:
   --profile=<profile>       Use a specific Profile section in the config file
                             You still can override config with --token/--space options.
 
+  --profiles=<profiles>     Run the command against each of the comma-separated Profiles concurrently and merge
+                            their outputs into one, with a space column. Credentials are taken from the Profiles
+                            only, --token/--space options and environment variables are not applied.
+
+  --all-profiles            Like --profiles, with all Profiles of the config file which have a token and a space
+
   --disable-version-check   Do not check whether a new version of torque is available for download.
 
+  --trace                   Print a timing tree of the CLI phases (arguments parsing, config loading, git
+                            operations, API requests, waiting) to stderr when the command completes.
+
+  --trace-file=<file>       Write timings of the CLI phases to the file in Chrome trace (JSON) format which
+                            can be loaded into chrome://tracing or https://ui.perfetto.dev
+
+  --stats                   Print statistics of the API requests made by the command (count, latency
+                            percentiles, status codes, retries and sizes per endpoint) to stderr on exit.
+
+  --record=<file>           Record API requests, responses and their timing to the file (gzipped if the name
+                            ends with .gz). Tokens and passwords are not recorded.
+
+  --replay=<file>           Serve API responses from the file recorded with --record instead of the network
+
+  --replay-speed=<x>        Replay with the original latencies (1), x times faster (x > 1) or instantly (0)
+                            [default: 0]
+
 Commands:
     bp, blueprint       validate torque blueprints
     sb, sandbox         start sandbox, end sandbox and get its status
     configure           set, list and remove connection profiles to torque
+    bench               generate load of sandbox operations and measure API throughput and latency
 """
 import logging
 import sys
+import time
+from typing import List
 
 import pkg_resources
 from colorama import init
-from docopt import DocoptExit, docopt
+from docopt import DocoptExit
 
-from torque.commands import bp, configure, sb
+from torque.commands import bench, bp, configure, sb
+from torque.exceptions import CassetteError
 from torque.models.connection import TorqueConnection
 from torque.parsers.global_input_parser import GlobalInputParser
+from torque.parsers.grammar import docopt
+from torque.services.cassette import Cassette, CassettePlayer, CassetteRecorder
 from torque.services.connection import TorqueConnectionProvider
+from torque.services.profile_runner import ProfileResult, ProfileRunner
+from torque.services.tracer import tracer
 from torque.services.version import VersionCheckService
 
 logger = logging.getLogger(__name__)
@@ -46,6 +79,7 @@ commands_table = {
     "sb": sb.SandboxesCommand,
     "sandbox": sb.SandboxesCommand,
     "configure": configure.ConfigureCommand,
+    "bench": bench.BenchCommand,
 }
 
 
@@ -70,49 +104,174 @@ class BootstrapHelper:
 
         return conn
 
+    @staticmethod
+    def get_cassette(input_parser: GlobalInputParser) -> Cassette:
+        try:
+            if input_parser.record:
+                return CassetteRecorder(input_parser.record)
+            if input_parser.replay:
+                return CassettePlayer(input_parser.replay, input_parser.replay_speed)
+        except (OSError, CassetteError) as e:
+            raise DocoptExit(f"Unable to use the cassette file. Details: {e}")
+        return None
+
     @staticmethod
     def validate_command(command_name: str) -> None:
         if command_name not in commands_table:
             raise DocoptExit("Invalid or unknown command. See usage instruction by running 'torque -h'")
 
+    @staticmethod
+    def validate_profiles(input_parser: GlobalInputParser) -> None:
+        if not input_parser.multiple_profiles:
+            return
+        if input_parser.command in ("configure", "bench"):
+            raise DocoptExit(f"'{input_parser.command}' can't run against several profiles")
+        if input_parser.record or input_parser.replay:
+            raise DocoptExit("--record and --replay can't be used with several profiles")
+
     @staticmethod
     def is_config_mode(input_parser: GlobalInputParser) -> bool:
         return input_parser.command == "configure"
 
+    @staticmethod
+    def is_local_bench_mode(input_parser: GlobalInputParser) -> bool:
+        return input_parser.command == "bench" and "--local" in input_parser.command_args
+
     @staticmethod
     def should_get_connection_params(input_parser: GlobalInputParser) -> bool:
-        return not BootstrapHelper.is_help_message_requested(input_parser) and not BootstrapHelper.is_config_mode(
-            input_parser
+        return (
+            not BootstrapHelper.is_help_message_requested(input_parser)
+            and not BootstrapHelper.is_config_mode(input_parser)
+            and not BootstrapHelper.is_local_bench_mode(input_parser)
         )
 
 
 def main():
+    start_time = time.perf_counter()
     # Colorama init for colored output
     init()
     version = pkg_resources.get_distribution("torque-cli").version
     args = docopt(__doc__, options_first=True, version=version)
     input_parser = GlobalInputParser(args)
 
+    if input_parser.trace or input_parser.trace_file:
+        tracer.enable()
+
+    try:
+        with tracer.span("shell.main", start_time=start_time, command=input_parser.command):
+            tracer.record("shell.parse_global_args", start_time, time.perf_counter())
+            result = run_command(input_parser, version)
+    finally:
+        report_trace(input_parser)
+
+    exit(result)
+
+
+def run_command(input_parser: GlobalInputParser, version: str) -> bool:
     # Check for new version
     if not input_parser.disable_version_check:
-        VersionCheckService(version).check_for_new_version_safely()
+        with tracer.span("shell.version_check"):
+            VersionCheckService(version).check_for_new_version_safely()
 
     level = logging.DEBUG if input_parser.debug else logging.WARNING
     logging.basicConfig(format="%(levelname)s - %(message)s", level=level)
 
     # Validate command
     BootstrapHelper.validate_command(input_parser.command)
+    BootstrapHelper.validate_profiles(input_parser)
+
+    argv = [input_parser.command] + input_parser.command_args
+
+    command_class = commands_table[input_parser.command]
+    if input_parser.multiple_profiles and BootstrapHelper.should_get_connection_params(input_parser):
+        return run_command_for_profiles(input_parser, command_class, argv)
 
     # Take auth parameters
     conn = BootstrapHelper.get_connection_params(input_parser)
 
-    argv = [input_parser.command] + input_parser.command_args
+    with tracer.span("command.init"):
+        command = command_class(argv, conn)
+
+    cassette = BootstrapHelper.get_cassette(input_parser)
+    if cassette and command.client:
+        command.client.cassette = cassette
+    with tracer.span("command.execute"):
+        try:
+            return command.execute()
+        finally:
+            if cassette:
+                cassette.close()
+            if input_parser.stats:
+                report_stats(command)
+            if command.client:
+                command.client.close()
+
+
+def run_command_for_profiles(input_parser: GlobalInputParser, command_class, argv: list) -> bool:
+    connections = TorqueConnectionProvider(input_parser).get_connections()
+    with tracer.span("command.init"):
+        commands = [command_class(argv, conn) for conn in connections]
+
+    with tracer.span("command.execute"):
+        try:
+            results = ProfileRunner(commands).run()
+            return report_profile_results(commands[0], results)
+        finally:
+            for command in commands:
+                if input_parser.stats:
+                    report_stats(command, title=f"Profile '{command.client.profile}' ({command.client.space}):")
+                command.client.close()
+
+
+def report_profile_results(command, results: List[ProfileResult]) -> bool:
+    """Prints messages and logs of every profile prefixed with its space, then the merged output of all of them"""
+    for result in results:
+        for line in filter(None, result.messages.splitlines()):
+            sys.stdout.write(f"[{result.space}] {line}\n")
+        for record in result.log_records:
+            record.msg, record.args = f"[{result.space}] {record.getMessage()}", None
+            logging.getLogger(record.name).handle(record)
+        if result.error:
+            sys.stderr.write(f"[{result.space}] {result.error}\n")
+        elif not result.success and result.output:
+            command.output_formatter.yield_output(False, f"[{result.space}] {result.output}")
+
+    command.output_formatter.yield_output(True, ProfileRunner.merge(results))
+
+    failed = [result.profile for result in results if not result.success]
+    if failed:
+        logger.error(f"The command failed for profiles: {', '.join(failed)}")
+    return not failed
+
+
+def report_stats(command, title: str = None) -> None:
+    if command.client is None or not command.client.metrics.total_requests:
+        return
+
+    metrics = command.client.metrics
+    if title:
+        sys.stderr.write(f"{title}\n")
+    sys.stderr.write(metrics.render())
+    sys.stderr.write("\n")
+    if metrics.bytes_saved:
+        sys.stderr.write(
+            f"Received {metrics.bytes_received} bytes, {metrics.bytes_saved} bytes of unchanged documents "
+            "were not downloaded again\n"
+        )
 
-    command_class = commands_table[input_parser.command]
-    command = command_class(argv, conn)
-    result = command.execute()
 
-    exit(result)
+def report_trace(input_parser: GlobalInputParser) -> None:
+    if not tracer.enabled:
+        return
+
+    if input_parser.trace:
+        sys.stderr.write(tracer.render_tree())
+        sys.stderr.write("\n")
+    if input_parser.trace_file:
+        try:
+            tracer.write_chrome_trace(input_parser.trace_file)
+        except OSError as e:
+            logger.error(f"Unable to write trace file. Details: {e}")
 
 
 def exit(run_result) -> None:
@@ -0,0 +1,3 @@
+from .fake_api import FakeTorqueApi, FakeTorqueServer
+
+__all__ = ["FakeTorqueApi", "FakeTorqueServer"]
@@ -0,0 +1,490 @@
+"""
+Local stand-in for the Torque REST API used by benchmarks and offline tests.
+
+It serves the endpoints used by SandboxesManager and BlueprintsManager (environments list/get/delete, sandbox start,
+catalog, blueprints and validations) plus account login, keeps sandboxes in memory and moves them through
+Launching -> Active (or Active With Error) -> Terminating -> Ended. Latency, errors and throttling can be simulated.
+
+Run it standalone and point the CLI at it:
+
+    $ python -m torque.testing.fake_api --port 8765 --sandboxes 200 --latency 0.05
+    $ TORQUE_HOSTNAME=http://127.0.0.1:8765 torque --space=demo --token=any --disable-version-check sb list
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from typing import Dict, List, Optional, Pattern, Tuple, Union
+from urllib.parse import parse_qs, urlparse
+
+LAUNCHING = "Launching"
+ACTIVE = "Active"
+ACTIVE_WITH_ERROR = "Active With Error"
+TERMINATING = "Terminating"
+ENDED = "Ended"
+
+
+class FakeSandbox(object):
+    def __init__(
+        self,
+        sandbox_id: str,
+        name: str,
+        blueprint_name: str,
+        owner: str,
+        launch_time: float,
+        end_time: float,
+        with_error: bool = False,
+        inputs: dict = None,
+        source: dict = None,
+    ):
+        self.sandbox_id = sandbox_id
+        self.name = name
+        self.blueprint_name = blueprint_name
+        self.owner = owner
+        self.inputs = inputs or {}
+        self.source = source
+        self.with_error = with_error
+        self.launch_time = launch_time
+        self.end_time = end_time
+        self.created_at = time.time()
+        self.ended_at: Optional[float] = None
+
+    @property
+    def status(self) -> str:
+        now = time.time()
+        if self.ended_at is not None:
+            return ENDED if now - self.ended_at >= self.end_time else TERMINATING
+        if now - self.created_at < self.launch_time:
+            return LAUNCHING
+        return ACTIVE_WITH_ERROR if self.with_error else ACTIVE
+
+    def to_json(self) -> dict:
+        return {
+            "details": {
+                "id": self.sandbox_id,
+                "computed_status": self.status,
+                "definition": {
+                    "metadata": {
+                        "name": self.name,
+                        "blueprint_name": self.blueprint_name,
+                        "owner_email": self.owner,
+                        "start_time": datetime.fromtimestamp(self.created_at, timezone.utc).isoformat(),
+                    },
+                    "inputs": [{"name": key, "value": value} for key, value in self.inputs.items()],
+                    "source": self.source,
+                },
+                "errors": [{"message": "Deployment failed"}] if self.status == ACTIVE_WITH_ERROR else [],
+            }
+        }
+
+
+class FakeBlueprint(object):
+    def __init__(self, name: str, inputs: dict = None, errors: List[str] = None, enabled: bool = True):
+        self.name = name
+        self.inputs = inputs or {}
+        self.errors = errors or []
+        self.enabled = enabled
+
+    def to_json(self) -> dict:
+        return {
+            "details": {
+                "blueprint_name": self.name,
+                "url": f"https://github.com/example/blueprints/blob/master/blueprints/{self.name}.yaml",
+                "enabled": self.enabled,
+                "description": f"{self.name} blueprint",
+                "inputs": [
+                    {"name": key, "default_value": value, "display_style": "normal", "optional": False}
+                    for key, value in self.inputs.items()
+                ],
+            }
+        }
+
+
+class FakeTorqueApi(object):
+    """In-memory state and behaviour of the fake API, shared by all handler threads.
+
+    :param latency: seconds added to every response, either fixed or a (min, max) range
+    :param error_rate: fraction of requests (0..1) failing with HTTP 500
+    :param rate_limit: max number of requests per second, exceeding requests get HTTP 429 with Retry-After header
+    :param launch_time: seconds a new sandbox stays in Launching status
+    :param end_time: seconds an ended sandbox stays in Terminating status
+    :param seed: seed of the random generator used for latency, errors and ids
+    :param status_filter: whether the sandbox list honours the show_ended and status parameters
+    :param etags: whether GET responses carry an ETag and If-None-Match requests of unchanged documents get HTTP 304
+    """
+
+    def __init__(
+        self,
+        latency: Union[float, Tuple[float, float]] = 0,
+        error_rate: float = 0,
+        rate_limit: float = 0,
+        launch_time: float = 0,
+        end_time: float = 0,
+        seed: int = None,
+        status_filter: bool = True,
+        etags: bool = True,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.launch_time = launch_time
+        self.end_time = end_time
+        self.status_filter = status_filter
+        self.etags = etags
+        self.owner = "user@example.com"
+
+        self.sandboxes: Dict[str, Dict[str, FakeSandbox]] = {}
+        self.blueprints: Dict[str, Dict[str, FakeBlueprint]] = {}
+        self.requests: List[Tuple[str, str]] = []
+        self.throttled = 0
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._scheduled_errors: List[Tuple[int, Optional[Pattern]]] = []
+        self._window_start = 0.0
+        self._window_requests = 0
+
+    def add_blueprint(self, space: str, name: str, inputs: dict = None, errors: List[str] = None) -> FakeBlueprint:
+        blueprint = FakeBlueprint(name, inputs, errors)
+        with self._lock:
+            self.blueprints.setdefault(space, {})[name] = blueprint
+        return blueprint
+
+    def add_sandbox(
+        self, space: str, blueprint_name: str, name: str = None, owner: str = None, status: str = None
+    ) -> FakeSandbox:
+        """Add sandbox to the space. If status is provided the sandbox is moved to it immediately"""
+        sandbox = self._create_sandbox(space, blueprint_name, name, owner=owner)
+        if status == LAUNCHING:
+            sandbox.launch_time = float("inf")
+        elif status:
+            sandbox.launch_time = 0
+            sandbox.with_error = status == ACTIVE_WITH_ERROR
+        if status in (TERMINATING, ENDED):
+            sandbox.ended_at = time.time()
+            sandbox.end_time = float("inf") if status == TERMINATING else 0
+        return sandbox
+
+    def populate(self, space: str, blueprints: int = 10, sandboxes: int = 50) -> None:
+        """Generate blueprints and sandboxes in various statuses"""
+        names = [f"blueprint-{i:03d}" for i in range(blueprints)]
+        for name in names:
+            self.add_blueprint(space, name, inputs={"size": "small", "region": "eu-west-1"})
+        statuses = [ACTIVE, ACTIVE, ACTIVE_WITH_ERROR, LAUNCHING, ENDED]
+        for i in range(sandboxes):
+            self.add_sandbox(space, names[i % len(names)], name=f"sandbox-{i:05d}", status=statuses[i % len(statuses)])
+
+    def fail_next(self, status_code: int = 500, count: int = 1, path: str = None) -> None:
+        """Make next `count` requests (matching `path` regex if provided) fail with status_code"""
+        pattern = re.compile(path) if path else None
+        with self._lock:
+            self._scheduled_errors.extend([(status_code, pattern)] * count)
+
+    def _create_sandbox(
+        self,
+        space: str,
+        blueprint_name: str,
+        name: str = None,
+        owner: str = None,
+        inputs: dict = None,
+        source: dict = None,
+    ) -> FakeSandbox:
+        blueprint = self.blueprints.get(space, {}).get(blueprint_name)
+        with self._lock:
+            sandbox = FakeSandbox(
+                sandbox_id="%012x" % self._random.getrandbits(48),
+                name=name or f"{blueprint_name}-{uuid.uuid4().hex[:6]}",
+                blueprint_name=blueprint_name,
+                owner=owner or self.owner,
+                launch_time=self.launch_time,
+                end_time=self.end_time,
+                with_error=bool(blueprint and blueprint.errors),
+                inputs=inputs,
+                source=source,
+            )
+            self.sandboxes.setdefault(space, {})[sandbox.sandbox_id] = sandbox
+        return sandbox
+
+    def _simulate_conditions(self, path: str) -> Optional[Tuple[int, dict, dict]]:
+        """Apply latency and decide whether the request is throttled or fails"""
+        latency = self._random.uniform(*self.latency) if isinstance(self.latency, tuple) else self.latency
+        if latency:
+            time.sleep(latency)
+
+        with self._lock:
+            if self.rate_limit:
+                now = time.time()
+                if now - self._window_start >= 1:
+                    self._window_start, self._window_requests = now, 0
+                self._window_requests += 1
+                if self._window_requests > self.rate_limit:
+                    self.throttled += 1
+                    return 429, error_body("TooManyRequests", "Rate limit exceeded"), {"Retry-After": "1"}
+
+            for i, (status_code, pattern) in enumerate(self._scheduled_errors):
+                if pattern is None or pattern.search(path):
+                    del self._scheduled_errors[i]
+                    return status_code, error_body("InjectedError", f"Injected error {status_code}"), {}
+
+            if self.error_rate and self._random.random() < self.error_rate:
+                return 500, error_body("InternalServerError", "Simulated server error"), {}
+        return None
+
+    def handle(self, method: str, url: str, body: Optional[dict], headers: dict) -> Tuple[int, object, dict]:
+        parsed = urlparse(url)
+        path = parsed.path
+        with self._lock:
+            self.requests.append((method, path))
+
+        failure = self._simulate_conditions(path)
+        if failure:
+            return failure
+
+        for route_method, pattern, handler_name in _ROUTES:
+            match = pattern.match(path)
+            if match and route_method == method:
+                if handler_name != "_login" and not headers.get("authorization"):
+                    return 401, error_body("Unauthorized", "Missing token"), {}
+                query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+                response = getattr(self, handler_name)(body=body or {}, query=query, **match.groupdict())
+                if method == "GET" and self.etags and response[0] == 200:
+                    return self._conditional(response, headers.get("if-none-match"))
+                return response
+
+        return 404, error_body("NotFound", f"Unknown endpoint {method} {path}"), {}
+
+    @staticmethod
+    def _conditional(response: Tuple[int, object, dict], if_none_match: Optional[str]) -> Tuple[int, object, dict]:
+        status_code, payload, headers = response
+        etag = '"{}"'.format(hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest())
+        if if_none_match == etag:
+            return 304, None, {"ETag": etag}
+        return status_code, payload, dict(headers, ETag=etag)
+
+    def _login(self, body: dict, query: dict, account: str) -> Tuple[int, object, dict]:
+        if not body.get("email") or not body.get("password"):
+            return 401, error_body("Unauthorized", "Wrong credentials"), {}
+        return 200, {"access_token": uuid.uuid4().hex, "expires_in": 3600}, {}
+
+    def _longtoken(self, body: dict, query: dict) -> Tuple[int, object, dict]:
+        return 200, {"access_token": uuid.uuid4().hex}, {}
+
+    def _list_sandboxes(self, body: dict, query: dict, space: str) -> Tuple[int, object, dict]:
+        sandboxes = sorted(self.sandboxes.get(space, {}).values(), key=lambda sb: sb.created_at, reverse=True)
+        if query.get("filter", "my") == "my":
+            sandboxes = [sb for sb in sandboxes if sb.owner == self.owner]
+        if self.status_filter and query.get("status"):
+            statuses = {status.lower() for status in query["status"].split(",")}
+            sandboxes = [sb for sb in sandboxes if sb.status.lower() in statuses]
+        elif self.status_filter and query.get("show_ended") == "false":
+            sandboxes = [sb for sb in sandboxes if sb.status != ENDED]
+        skip = int(query.get("skip", 0))
+        count = int(query.get("count", 25))
+        return 200, [sb.to_json() for sb in sandboxes[skip : skip + count]], {}
+
+    def _get_sandbox(self, body: dict, query: dict, space: str, sandbox_id: str) -> Tuple[int, object, dict]:
+        sandbox = self.sandboxes.get(space, {}).get(sandbox_id)
+        if not sandbox:
+            return 404, error_body("NotFound", f"Sandbox {sandbox_id} not found"), {}
+        return 200, sandbox.to_json(), {}
+
+    def _end_sandbox(self, body: dict, query: dict, space: str, sandbox_id: str) -> Tuple[int, object, dict]:
+        sandbox = self.sandboxes.get(space, {}).get(sandbox_id)
+        if not sandbox:
+            return 404, error_body("NotFound", f"Sandbox {sandbox_id} not found"), {}
+        if sandbox.ended_at is None:
+            sandbox.ended_at = time.time()
+        return 202, {}, {}
+
+    def _start_sandbox(self, body: dict, query: dict, space: str) -> Tuple[int, object, dict]:
+        blueprint_name = body.get("blueprint_name")
+        if blueprint_name not in self.blueprints.get(space, {}):
+            return 400, error_body("BlueprintNotFound", f"Blueprint {blueprint_name} not found"), {}
+        sandbox = self._create_sandbox(
+            space,
+            blueprint_name,
+            body.get("sandbox_name"),
+            inputs=body.get("inputs"),
+            source=body.get("source"),
+        )
+        return 200, {"id": sandbox.sandbox_id}, {}
+
+    def _list_blueprints(self, body: dict, query: dict, space: str) -> Tuple[int, object, dict]:
+        return 200, [bp.to_json() for bp in self.blueprints.get(space, {}).values()], {}
+
+    def _get_blueprint(self, body: dict, query: dict, space: str, name: str) -> Tuple[int, object, dict]:
+        blueprint = self.blueprints.get(space, {}).get(name)
+        if not blueprint:
+            return 404, error_body("NotFound", f"Blueprint {name} not found"), {}
+        return 200, blueprint.to_json(), {}
+
+    def _validate_blueprint(self, body: dict, query: dict, space: str) -> Tuple[int, object, dict]:
+        name = body.get("blueprint_name")
+        blueprint = self.blueprints.get(space, {}).get(name)
+        if not blueprint:
+            return 200, {"blueprint_name": name, "errors": [{"message": f"Blueprint {name} not found"}]}, {}
+        return 200, {"blueprint_name": name, "errors": [{"message": err} for err in blueprint.errors]}, {}
+
+
+def _route(path: str) -> Pattern:
+    return re.compile(f"^/api/{path}/?$")
+
+
+def error_body(name: str, message: str) -> dict:
+    return {"errors": [{"name": name, "message": message}]}
+
+
+_ROUTES = [
+    ("POST", _route("accounts/(?P<account>[^/]+)/login"), "_login"),
+    ("POST", _route("token/longtoken"), "_longtoken"),
+    ("GET", _route("spaces/(?P<space>[^/]+)/environments"), "_list_sandboxes"),
+    ("GET", _route("spaces/(?P<space>[^/]+)/environments/(?P<sandbox_id>[^/]+)"), "_get_sandbox"),
+    ("DELETE", _route("spaces/(?P<space>[^/]+)/environments/(?P<sandbox_id>[^/]+)"), "_end_sandbox"),
+    ("POST", _route("spaces/(?P<space>[^/]+)/(?:sandbox|environments)"), "_start_sandbox"),
+    ("GET", _route("spaces/(?P<space>[^/]+)/blueprints"), "_list_blueprints"),
+    ("GET", _route("spaces/(?P<space>[^/]+)/catalog/(?P<name>[^/]+)"), "_get_blueprint"),
+    ("POST", _route("spaces/(?P<space>[^/]+)/validations/blueprints"), "_validate_blueprint"),
+]
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _FakeApiRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # send headers and body in a single segment without Nagle delays, otherwise keep-alive requests wait for ACKs
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    api: FakeTorqueApi = None
+
+    def _handle(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw_body = self.rfile.read(length) if length else b""
+        try:
+            body = json.loads(raw_body) if raw_body else None
+        except ValueError:
+            body = None
+
+        request_headers = {key.lower(): value for key, value in self.headers.items()}
+        status_code, payload, headers = self.api.handle(self.command, self.path, body, request_headers)
+        # not modified responses have no body
+        content = json.dumps(payload).encode() if status_code != 304 else b""
+
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    def do_HEAD(self) -> None:
+        # connection warm up of the client, not an API request
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+class FakeTorqueServer(object):
+    """HTTP server exposing FakeTorqueApi on a local port in a background thread.
+
+    with FakeTorqueServer() as server:
+        server.api.populate("demo")
+        client = TorqueClient(torque_host=server.hostname, space="demo", token="any")
+    """
+
+    def __init__(self, api: FakeTorqueApi = None, host: str = "127.0.0.1", port: int = 0):
+        self.api = api or FakeTorqueApi()
+        handler = type("FakeApiRequestHandler", (_FakeApiRequestHandler,), {"api": self.api})
+        self._server = _ThreadingHTTPServer((host, port), handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    @property
+    def hostname(self) -> str:
+        """Value for TORQUE_HOSTNAME environment variable"""
+        return f"http://{self._server.server_address[0]}:{self.port}"
+
+    def start(self) -> "FakeTorqueServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), name="fake-torque-api", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve in the current thread until interrupted"""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeTorqueServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run local fake Torque API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--space", default="demo", help="space populated with generated data")
+    parser.add_argument("--blueprints", type=int, default=10, help="number of generated blueprints")
+    parser.add_argument("--sandboxes", type=int, default=50, help="number of generated sandboxes")
+    parser.add_argument("--latency", type=float, default=0, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0, help="fraction of requests failing with HTTP 500")
+    parser.add_argument("--rate-limit", type=float, default=0, help="max requests per second before HTTP 429")
+    parser.add_argument("--launch-time", type=float, default=10, help="seconds a new sandbox is launching")
+    parser.add_argument("--end-time", type=float, default=5, help="seconds an ended sandbox is terminating")
+    parser.add_argument(
+        "--no-status-filter", action="store_true", help="ignore status filters of the sandbox list like older servers"
+    )
+    parser.add_argument("--no-etags", action="store_true", help="send no ETags and ignore If-None-Match")
+    args = parser.parse_args(argv)
+
+    api = FakeTorqueApi(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        launch_time=args.launch_time,
+        end_time=args.end_time,
+        status_filter=not args.no_status_filter,
+        etags=not args.no_etags,
+    )
+    api.populate(args.space, args.blueprints, args.sandboxes)
+
+    server = FakeTorqueServer(api, args.host, args.port)
+    print(f"Fake Torque API is listening. Use: TORQUE_HOSTNAME={server.hostname} torque --space={args.space} ...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,115 @@
+import hashlib
 import logging
 import os
+from typing import List, Optional
 
 import yaml
-from git import InvalidGitRepositoryError, Repo
 
 from torque.exceptions import BadBlueprintRepo
+from torque.services.git_objects import GitObjectReader
+from torque.services.git_refs import Branch, Remote, find_git_dir, git_status, open_refs
+from torque.services.tracer import traced
 
 logging.getLogger("git").setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
 
-class BlueprintRepo(Repo):
+class BlueprintRepo(object):
+    """Blueprints repository in the local file system.
+
+    Branches, remotes and blueprints are read straight from the files of the repository. GitPython, whose import alone
+    takes a noticeable part of the CLI start, is loaded only for writes (`git`, `delete_head` and the rest of the
+    GitPython `Repo` API, which attributes not defined here fall back to).
+    """
+
     bp_file_extensions = [".yaml", ".yml"]
     bp_dir = "blueprints"
     _active_branch = ""
     _temp_branch = ""
+    _objects = None
+    _repo = None
 
+    @traced("git.open_repo")
     def __init__(self, path: str):
-        try:
-            super().__init__(path, search_parent_directories=True)
-        except InvalidGitRepositoryError:
-            raise BadBlueprintRepo("Not a git folder")
-        if self.bare:
-            raise BadBlueprintRepo("Cannot get folder tree structure. Repo is bare")
+        self.working_dir, self.git_dir = find_git_dir(path)
+        self.refs = open_refs(self.git_dir, self.working_dir)
 
         if not self.remotes:
             raise BadBlueprintRepo("Local repository not connected to the remote space repository")
 
         self.blueprints = self._fetch_blueprints_list()
 
+    @property
+    def objects(self) -> GitObjectReader:
+        """Reader of git objects, its git process is kept until the repo is closed"""
+        if self._objects is None:
+            self._objects = GitObjectReader(self.working_dir)
+        return self._objects
+
+    @property
+    def git_repo(self):
+        """GitPython repo of the same directory, opened on first use"""
+        if self._repo is None:
+            from git import Repo
+
+            self._repo = Repo(self.working_dir)
+        return self._repo
+
+    @property
+    def git(self):
+        """Runs git commands, e.g. `repo.git.push("origin", branch)`"""
+        return self.git_repo.git
+
+    def __getattr__(self, name: str):
+        # only called for attributes not found the usual way
+        if name.startswith("_") or "working_dir" not in self.__dict__:
+            raise AttributeError(name)
+        return getattr(self.git_repo, name)
+
+    def close(self) -> None:
+        if self._objects is not None:
+            self._objects.close()
+            self._objects = None
+        if self._repo is not None:
+            self._repo.close()
+            self._repo = None
+
+    @property
+    def remotes(self) -> List[Remote]:
+        return [Remote(self.refs, name) for name in self.refs.remotes()]
+
+    def remote(self, name: str = "origin") -> Remote:
+        if name not in self.refs.remotes():
+            raise ValueError(f"Remote named '{name}' didn't exist")
+        return Remote(self.refs, name)
+
+    @property
+    def active_branch(self) -> Branch:
+        ref, sha = self.refs.head()
+        if ref is None:
+            raise TypeError(f"HEAD is a detached symbolic reference as it points to '{sha}'")
+        return Branch(ref[len("refs/heads/") :] if ref.startswith("refs/heads/") else ref, sha)
+
+    def is_dirty(self, index: bool = True, working_tree: bool = True, untracked_files: bool = False) -> bool:
+        status = git_status(self.working_dir, untracked_files)
+        return bool(
+            (index and status.staged) or (working_tree and status.modified) or (untracked_files and status.untracked)
+        )
+
+    @property
+    def untracked_files(self) -> List[str]:
+        return git_status(self.working_dir).untracked
+
+    def delete_head(self, branch_name: str, force: bool = False) -> None:
+        self.git.branch("-D" if force else "-d", branch_name)
+
     def repo_has_blueprint(self, blueprint_name) -> bool:
         """Check if repo contains provided blueprint"""
         return blueprint_name in list(self.blueprints.keys())
 
-    def is_repo_detached(self):
-        return self.head.is_detached
+    def is_repo_detached(self) -> bool:
+        ref, _ = self.refs.head()
+        return ref is None
 
     def current_branch_exists_on_remote(self) -> bool:
         local_branch_name = self.active_branch.name
@@ -44,16 +119,13 @@ class BlueprintRepo(Repo):
     def is_current_branch_synced(self) -> bool:
         """Check if last commit in local and remote branch is the same"""
         local_branch = self.active_branch
-        if local_branch.name not in self._get_remote_branches_names():
-            return False
-
-        for remote in self.remote().refs:
-            if local_branch.name == remote.remote_head:
-                return local_branch.commit.__eq__(remote.commit)
+        remote_commit = self._get_remote_branch_commit(local_branch.name)
+        return remote_commit is not None and local_branch.commit == remote_commit
 
     # (TODO:ddovbii): must be moved to separated class (BlueprintYamlHandler or smth)
-    def get_blueprint_default_inputs(self, blueprint_name):
-        yaml_obj = self.get_blueprint_yaml(blueprint_name)
+    def get_blueprint_default_inputs(self, blueprint_name, revision: str = None):
+        """Default values of the blueprint inputs, as in the working tree or at the git revision"""
+        yaml_obj = self.get_blueprint_yaml(blueprint_name, revision)
         inputs = yaml_obj.get("inputs", None)
         if not inputs:
             return {}
@@ -68,7 +140,11 @@ class BlueprintRepo(Repo):
                             res[input_name] = specs.get("default_value", None)
             return res
 
-    def get_blueprint_yaml(self, blueprint_name: str) -> dict:
+    @traced("yaml.load_blueprint")
+    def get_blueprint_yaml(self, blueprint_name: str, revision: str = None) -> dict:
+        if revision is not None:
+            return yaml.full_load(self.get_blueprint_content(blueprint_name, revision))
+
         if not self.repo_has_blueprint(blueprint_name):
             raise BadBlueprintRepo(f"Blueprint Git repo does not contain blueprint {blueprint_name}")
 
@@ -77,6 +153,62 @@ class BlueprintRepo(Repo):
 
         return yaml_obj
 
+    def get_blueprint_content(self, blueprint_name: str, revision: str) -> bytes:
+        """Blueprint yaml as committed at the git revision, read from git objects regardless of the working tree"""
+        for extension in self.bp_file_extensions:
+            content = self.objects.read(f"{revision}:{self.bp_dir}/{blueprint_name}{extension}")
+            if content is not None:
+                return content
+
+        raise BadBlueprintRepo(f"Blueprint {blueprint_name} does not exist at git revision '{revision}'")
+
+    def get_blueprint_content_hash(self, blueprint_name: str) -> str:
+        """Hash of blueprint yaml content together with all local files referenced from it"""
+        if not self.repo_has_blueprint(blueprint_name):
+            raise BadBlueprintRepo(f"Blueprint Git repo does not contain blueprint {blueprint_name}")
+
+        with open(self.blueprints[blueprint_name], "rb") as bp_file:
+            content = bp_file.read()
+
+        digest = hashlib.sha256(content)
+        yaml_obj = yaml.safe_load(content) or {}
+        for ref_path in sorted(set(self._get_referenced_paths(yaml_obj))):
+            digest.update(ref_path.encode())
+            for file_path in self._walk_files(os.path.join(self.working_dir, ref_path)):
+                digest.update(os.path.relpath(file_path, self.working_dir).encode())
+                with open(file_path, "rb") as ref_file:
+                    digest.update(ref_file.read())
+
+        return digest.hexdigest()
+
+    def _get_referenced_paths(self, yaml_obj) -> list:
+        """Collect `path` values of the blueprint pointing to existing locations inside of the repo"""
+        paths = []
+        if isinstance(yaml_obj, dict):
+            for key, value in yaml_obj.items():
+                if key == "path" and isinstance(value, str):
+                    ref_path = os.path.normpath(value.strip("/"))
+                    if not ref_path.startswith("..") and os.path.exists(os.path.join(self.working_dir, ref_path)):
+                        paths.append(ref_path)
+                else:
+                    paths.extend(self._get_referenced_paths(value))
+        elif isinstance(yaml_obj, list):
+            for item in yaml_obj:
+                paths.extend(self._get_referenced_paths(item))
+
+        return paths
+
+    @staticmethod
+    def _walk_files(path: str) -> list:
+        if os.path.isfile(path):
+            return [path]
+
+        files = []
+        for current_path, folders, file_names in os.walk(path):
+            folders[:] = sorted(folder for folder in folders if folder != ".git")
+            files.extend(os.path.join(current_path, file_name) for file_name in sorted(file_names))
+        return files
+
     def _fetch_blueprints_list(self) -> dict:
         bps = {}
         work_dir = self.working_dir
@@ -98,6 +230,9 @@ class BlueprintRepo(Repo):
         else:
             return []
 
+    def _get_remote_branch_commit(self, branch_name: str) -> Optional[str]:
+        return self.refs.resolve(f"refs/remotes/{self.remote().name}/{branch_name}")
+
     def get_active_branch(self) -> str:
         return self._active_branch
 
@@ -116,7 +251,7 @@ class BlueprintRepo(Repo):
         # is_dirty() -> means there is *uncommitted* delta for tracked files between local and remote
         # untracked_files -> means there is a delta which are the untracked files (uncommitted)
         # is_current_branch_synced() -> means though current state *committed* there is a delta between local and remote
-        return not (self.is_dirty() or self.untracked_files or not self.is_current_branch_synced())
+        return not (self.is_dirty(untracked_files=True) or not self.is_current_branch_synced())
 
 
 def parse_comma_separated_string(params_string: str = None) -> dict:
@@ -1,8 +1,7 @@
 from collections import OrderedDict
 
-import tabulate
-
 from torque.constants import TorqueConfigKeys
+from torque.view.table_renderer import TableRenderer
 from torque.view.view_helper import mask_token
 
 
@@ -23,4 +22,4 @@ class ConfigureListView:
             item["Token"] = mask_token(self.config[profile].get(TorqueConfigKeys.TOKEN, None))
             result_table.append(item)
 
-        return tabulate.tabulate(result_table, headers="keys")
+        return TableRenderer().render(result_table)
@@ -0,0 +1,70 @@
+import sys
+from datetime import datetime
+from typing import Dict, List, TextIO
+
+from torque.services.sandbox_watcher import ADDED, REMOVED, SandboxEvent
+from torque.view.table_renderer import COLUMN_SEPARATOR, TRUNCATION_MARK
+
+
+def _local_time(event: SandboxEvent) -> str:
+    return datetime.fromisoformat(event.time).astimezone().strftime("%H:%M:%S")
+
+
+def _fit(text: str, width: int) -> str:
+    text = text or ""
+    if len(text) > width:
+        text = text[: width - len(TRUNCATION_MARK)] + TRUNCATION_MARK
+    return text.ljust(width)
+
+
+class TransitionsView(object):
+    """A line for every sandbox when it is first seen and for every change of its status"""
+
+    def __init__(self, stream: TextIO = None):
+        self.stream = stream or sys.stdout
+
+    def show(self, event: SandboxEvent) -> None:
+        if event.event == ADDED:
+            change = event.status
+        elif event.event == REMOVED:
+            change = f"{event.previous_status} -> (no longer listed)"
+        else:
+            change = f"{event.previous_status} -> {event.status}"
+        self.stream.write(f"{_local_time(event)}  {event.sandbox_id}  {event.name}  {change}\n")
+        self.stream.flush()
+
+
+class LiveTableView(object):
+    """Table of the watched sandboxes kept up to date in place: new sandboxes are appended and only the rows of
+    changed sandboxes are written again, using ANSI cursor movements. Works on terminals only"""
+
+    COLUMNS = [("id", 14), ("name", 30), ("blueprint", 24), ("status", 20), ("since", 8)]
+
+    def __init__(self, stream: TextIO = None):
+        self.stream = stream or sys.stdout
+        self._rows: Dict[str, int] = {}
+        self._lines = 0
+
+    def show(self, event: SandboxEvent) -> None:
+        status = "(no longer listed)" if event.event == REMOVED else event.status
+        line = self._format_row([event.sandbox_id, event.name, event.blueprint_name, status, _local_time(event)])
+
+        row = self._rows.get(event.sandbox_id)
+        if row is None:
+            if not self._lines:
+                self._write_line(self._format_row([name for name, _ in self.COLUMNS]))
+                self._write_line(COLUMN_SEPARATOR.join("-" * width for _, width in self.COLUMNS))
+            self._rows[event.sandbox_id] = self._lines
+            self._write_line(line)
+        else:
+            # up to the row, rewrite it and back below the table
+            distance = self._lines - row
+            self.stream.write(f"\x1b[{distance}A\r\x1b[2K{line}\x1b[{distance}B\r")
+        self.stream.flush()
+
+    def _write_line(self, line: str) -> None:
+        self.stream.write(line + "\n")
+        self._lines += 1
+
+    def _format_row(self, cells: List[str]) -> str:
+        return COLUMN_SEPARATOR.join(_fit(cell, width) for cell, (_, width) in zip(cells, self.COLUMNS)).rstrip()
@@ -0,0 +1,107 @@
+import shutil
+import sys
+from itertools import chain, islice
+from numbers import Number
+from typing import Any, Iterable, Iterator, List
+
+COLUMN_SEPARATOR = "  "
+HEADER_PADDING = 2
+TRUNCATION_MARK = "..."
+MIN_COLUMN_WIDTH = 5
+
+
+class TableRenderer:
+    """Single-pass fixed-width table renderer producing the same layout as tabulate's 'simple' format.
+
+    Unless given, columns are the keys of the rows of the first page, in the order they first appear (rows of
+    --fields projections may miss some keys), so there is no need to inspect the whole dataset to build the header.
+    """
+
+    def __init__(self, columns: List[str] = None, max_cell_width: int = 100, fit_terminal: bool = None):
+        self.columns = columns
+        self.max_cell_width = max_cell_width
+        self.fit_terminal = sys.stdout.isatty() if fit_terminal is None else fit_terminal
+
+    def render(self, rows: Iterable[Any]) -> str:
+        """Render the whole table with columns and their widths computed from all rows"""
+        rows = [self._serialize(row) for row in rows]
+        return "\n".join(self._render_lines(rows, len(rows)))
+
+    def render_lines(self, rows: Iterable[Any], page_size: int = 25) -> Iterator[str]:
+        """Lazily render table lines. Columns and their widths are fixed from the first page, longer cells are
+        truncated and keys which appear only in later rows are not shown"""
+        return self._render_lines((self._serialize(row) for row in rows), page_size)
+
+    def _render_lines(self, items: Iterator[dict], page_size: int) -> Iterator[str]:
+        items = iter(items)
+        first_page = list(islice(items, page_size))
+        if not first_page and not self.columns:
+            return
+
+        columns = self.columns or list(dict.fromkeys(key for item in first_page for key in item))
+        first_page = [self._to_row(item, columns) for item in first_page]
+        widths = [len(column) + HEADER_PADDING for column in columns]
+        # like tabulate, a column is right aligned if all its non-empty values are numbers
+        kinds = [set() for _ in columns]
+        for row in first_page:
+            for i, (text, is_numeric) in enumerate(row):
+                widths[i] = max(widths[i], len(text))
+                kinds[i].add(is_numeric)
+        numeric = [kind == {True} or kind == {True, None} for kind in kinds]
+
+        widths = self._fit_widths(widths)
+
+        yield self._format_line([(column, False) for column in columns], widths, numeric)
+        yield COLUMN_SEPARATOR.join("-" * width for width in widths)
+        for row in chain(first_page, (self._to_row(item, columns) for item in items)):
+            yield self._format_line(row, widths, numeric)
+
+    @staticmethod
+    def _serialize(item: Any) -> dict:
+        if callable(getattr(item, "table_serialize", None)):
+            return item.table_serialize()
+        return item
+
+    def _to_row(self, item: dict, columns: List[str]) -> list:
+        row = []
+        for column in columns:
+            value = item.get(column)
+            if value is None:
+                row.append(("", None))
+                continue
+
+            text = str(value)
+            if self.max_cell_width and len(text) > self.max_cell_width:
+                text = self._truncate(text, self.max_cell_width)
+            row.append((text, isinstance(value, Number) and not isinstance(value, bool)))
+        return row
+
+    def _fit_widths(self, widths: List[int]) -> List[int]:
+        if not self.fit_terminal:
+            return widths
+
+        terminal_width = shutil.get_terminal_size().columns
+        widths = list(widths)
+        overflow = sum(widths) + len(COLUMN_SEPARATOR) * (len(widths) - 1) - terminal_width
+        while overflow > 0:
+            widest = max(range(len(widths)), key=lambda i: widths[i])
+            if widths[widest] <= MIN_COLUMN_WIDTH:
+                break
+            shrink = min(overflow, widths[widest] - MIN_COLUMN_WIDTH)
+            widths[widest] -= shrink
+            overflow -= shrink
+        return widths
+
+    def _format_line(self, row: list, widths: List[int], numeric: List[bool]) -> str:
+        cells = []
+        for (text, _), width, is_numeric in zip(row, widths, numeric):
+            if len(text) > width:
+                text = self._truncate(text, width)
+            cells.append(text.rjust(width) if is_numeric else text.ljust(width))
+        return COLUMN_SEPARATOR.join(cells).rstrip()
+
+    @staticmethod
+    def _truncate(text: str, width: int) -> str:
+        if width <= len(TRUNCATION_MARK):
+            return text[:width]
+        return text[: width - len(TRUNCATION_MARK)] + TRUNCATION_MARK